@@ -1,72 +1,147 @@
 import os
+import hmac
 import json
-import requests
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+import aiohttp
+from typing import Optional, Dict, Any, Tuple
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from pymongo.database import Database
 from dotenv import load_dotenv
 from database import get_db
-from datetime import datetime
+from services.jwks import JWKSClient
+from services.cache import TTLCache
+from services.token_cache import VerifiedTokenCache
+from repositories.user_repository import UserRepository
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
 CLERK_JWT_ISSUER = os.getenv("CLERK_JWT_ISSUER")
 CLERK_JWT_JWKS_URL = os.getenv("CLERK_JWT_JWKS_URL")
+JWKS_TTL = float(os.getenv("JWKS_TTL", "3600"))
+JWKS_REFRESH_MARGIN = float(os.getenv("JWKS_REFRESH_MARGIN", "300"))
+JWKS_MIN_REFETCH_INTERVAL = float(os.getenv("JWKS_MIN_REFETCH_INTERVAL", "30"))
+JWKS_FETCH_TIMEOUT = float(os.getenv("JWKS_FETCH_TIMEOUT", "5"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+TOKEN_CACHE_MAX_TTL = float(os.getenv("TOKEN_CACHE_MAX_TTL", "3600"))
+KNOWN_USERS_MAX_ENTRIES = int(os.getenv("KNOWN_USERS_MAX_ENTRIES", "50000"))
+KNOWN_USERS_TTL = float(os.getenv("KNOWN_USERS_TTL", "3600"))
+# Shared secret accepted in the X-Metrics-Token header by /api/metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
 if not CLERK_JWT_ISSUER or not CLERK_JWT_JWKS_URL:
     logger.warning("Clerk JWT configuration missing: CLERK_JWT_ISSUER or CLERK_JWT_JWKS_URL not set")
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
-_jwks_cache = None
-_jwks_cache_expiry = 0
+NO_CREDENTIALS = "No credentials provided"
 
-def get_jwks():
+verified_tokens = VerifiedTokenCache(max_entries=TOKEN_CACHE_MAX_ENTRIES, max_ttl=TOKEN_CACHE_MAX_TTL)
+# IDs of users known to exist in the database, so provisioning is skipped
+known_users = TTLCache(max_entries=KNOWN_USERS_MAX_ENTRIES)
+# Requests whose principal was resolved, and auth dependency calls that reused it
+auth_counters = {"resolved": 0, "reused": 0}
+
+def create_jwks_client(session: aiohttp.ClientSession) -> JWKSClient:
     """
-    Fetch and cache JSON Web Key Set (JWKS) from Clerk.
-    Caches the keys to reduce API calls.
+    Create the app-scoped Clerk JWKS client on the pooled HTTP session.
+    """
+    return JWKSClient(
+        CLERK_JWT_JWKS_URL,
+        session=session,
+        ttl=JWKS_TTL,
+        refresh_margin=JWKS_REFRESH_MARGIN,
+        min_refetch_interval=JWKS_MIN_REFETCH_INTERVAL,
+        timeout=JWKS_FETCH_TIMEOUT
+    )
+
+def get_jwks_client(request: Request) -> JWKSClient:
+    """
+    Return the app-scoped JWKS client created in the lifespan handler.
+    """
+    return request.app.state.jwks_client
+
+async def get_key_from_jwks(jwks_client: JWKSClient, kid: str):
+    """
+    Get the parsed key with matching kid from JWKS.
     """
-    global _jwks_cache, _jwks_cache_expiry
-    import time
-    
-    current_time = time.time()
-    
-    if _jwks_cache and current_time < _jwks_cache_expiry:
-        return _jwks_cache
-    
     try:
-        logger.info(f"Fetching JWKS from {CLERK_JWT_JWKS_URL}")
-        response = requests.get(CLERK_JWT_JWKS_URL)
-        response.raise_for_status()
-        _jwks_cache = response.json()
-        _jwks_cache_expiry = current_time + 3600
-        return _jwks_cache
+        key = await jwks_client.get_key(kid)
     except Exception as e:
         logger.error(f"Failed to fetch JWKS: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch JWKS: {str(e)}"
         )
+    if key is None:
+        logger.warning(f"Unable to find key with kid: {kid}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unable to find appropriate key"
+        )
+    return key
 
-def get_key_from_jwks(kid: str):
+async def decode_token(token: str, jwks_client: JWKSClient) -> Dict[str, Any]:
     """
-    Get the key with matching kid from JWKS.
+    Verify a token and return its payload.
+
+    Payloads of tokens verified before are served from verified_tokens
+    until the token expires. Otherwise the RS256 signature is checked in
+    a worker thread so the event loop is not held up by the RSA math.
     """
-    jwks = get_jwks()
-    for key in jwks.get("keys", []):
-        if key.get("kid") == kid:
-            return key
-    logger.warning(f"Unable to find key with kid: {kid}")
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Unable to find appropriate key"
+    payload = verified_tokens.get(token)
+    if payload is not None:
+        return payload
+
+    header = jwt.get_unverified_header(token)
+    kid = header.get("kid")
+
+    if not kid:
+        logger.warning("No key ID found in token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No key ID found in token"
+        )
+
+    key = await get_key_from_jwks(jwks_client, kid)
+
+    payload = await asyncio.to_thread(
+        jwt.decode,
+        token,
+        key,
+        algorithms=["RS256"],
+        audience=None,
+        issuer=CLERK_JWT_ISSUER,
+        options={"verify_aud": False}
     )
+    verified_tokens.set(token, payload)
+    return payload
+
+async def provision_user(db: Database, payload: Dict[str, Any]) -> None:
+    """
+    Create the user from a verified token on first sight.
+
+    Users seen within KNOWN_USERS_TTL are skipped without touching the
+    database; otherwise one idempotent upsert creates the user if missing.
+    """
+    user_id = payload["sub"]
+    email = payload.get("email")
+    if not email or user_id in known_users:
+        return
+
+    username = payload.get("username", f"user_{user_id[:8]}")
+    created = await UserRepository(db).ensure_user(user_id, {
+        "username": username,
+        "email": email,
+        "is_admin": False
+    })
+    if created:
+        logger.info(f"Created new user: {username}, {email}")
+    known_users.set(user_id, True, ttl=KNOWN_USERS_TTL)
 
 async def extract_token_from_request(request: Request) -> Optional[str]:
     """
@@ -92,88 +167,96 @@ async def extract_token_from_request(request: Request) -> Optional[str]:
     
     return None
 
-async def verify_clerk_token(
+async def authenticate_request(
     request: Request,
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Database = Depends(get_db)
+    credentials: Optional[HTTPAuthorizationCredentials],
+    jwks_client: JWKSClient
 ) -> Dict[str, Any]:
     """
-    Verify the Clerk JWT token and extract user information.
-    Also ensures the user exists in our database.
+    Resolve the request's principal once per request.
+
+    The first call extracts and verifies the token and stores the outcome
+    on request.state; later calls in the same request, from any auth
+    dependency, reuse it.
+
+    Raises:
+        HTTPException: 401 if no token was sent or it is invalid, 500 if
+            it could not be verified
     """
-    token = None
+    outcome = getattr(request.state, "auth", None)
+    if outcome is None:
+        outcome = await _authenticate(request, credentials, jwks_client)
+        request.state.auth = outcome
+        auth_counters["resolved"] += 1
+    else:
+        auth_counters["reused"] += 1
 
-    if credentials:
-        token = credentials.credentials
+    payload, error = outcome
+    if error is not None:
+        raise error
+    return payload
 
+async def _authenticate(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials],
+    jwks_client: JWKSClient
+) -> Tuple[Optional[Dict[str, Any]], Optional[HTTPException]]:
+    token = credentials.credentials if credentials else None
     if not token:
         token = await extract_token_from_request(request)
-    
+
     if not token:
-        logger.warning("No auth token found in request")
-        logger.info(f"Request headers: {dict(request.headers)}")
-        raise HTTPException(
+        return None, HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="No credentials provided"
+            detail=NO_CREDENTIALS
         )
-    
+
     try:
-        header = jwt.get_unverified_header(token)
-        kid = header.get("kid")
-        
-        if not kid:
-            logger.warning("No key ID found in token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="No key ID found in token"
-            )
-        
-        key = get_key_from_jwks(kid)
-        
-        payload = jwt.decode(
-            token,
-            key,
-            algorithms=["RS256"],
-            audience=None,
-            issuer=CLERK_JWT_ISSUER,
-            options={"verify_aud": False}
-        )
-        
-        logger.info(f"Token validated successfully for user: {payload.get('sub')}")
-        
-        user_id = payload.get("sub")
-        if not user_id:
-            logger.warning("Invalid user ID in token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid user ID in token"
-            )
-        
-        users_collection = db.users
-        user = await users_collection.find_one({"id": user_id})
-        
-        if not user and payload.get("email"):
-            username = payload.get("username", f"user_{user_id[:8]}")
-            email = payload.get("email")
-            
-            logger.info(f"Creating new user: {username}, {email}")
-            new_user = {
-                "id": user_id,
-                "username": username,
-                "email": email,
-                "created_at": datetime.now(),
-                "is_admin": False
-            }
-            await users_collection.insert_one(new_user)
-        
-        return payload
-        
+        payload = await decode_token(token, jwks_client)
+    except HTTPException as e:
+        return None, e
     except JWTError as e:
         logger.error(f"Invalid authentication token: {str(e)}")
-        raise HTTPException(
+        return None, HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid authentication token: {str(e)}"
         )
+    except Exception as e:
+        logger.exception(f"Authentication error: {str(e)}")
+        return None, HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Authentication error: {str(e)}"
+        )
+
+    if not payload.get("sub"):
+        logger.warning("Invalid user ID in token")
+        return None, HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid user ID in token"
+        )
+
+    logger.info("Token validated", extra={"user_id": payload["sub"]})
+    return payload, None
+
+async def verify_clerk_token(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Database = Depends(get_db),
+    jwks_client: JWKSClient = Depends(get_jwks_client)
+) -> Dict[str, Any]:
+    """
+    Verify the Clerk JWT token and extract user information.
+    Also ensures the user exists in our database.
+    """
+    try:
+        payload = await authenticate_request(request, credentials, jwks_client)
+    except HTTPException as e:
+        if e.detail == NO_CREDENTIALS:
+            logger.warning("No auth token found in request", extra={"path": request.url.path})
+        raise
+
+    try:
+        await provision_user(db, payload)
     except Exception as e:
         logger.exception(f"Authentication error: {str(e)}")
         raise HTTPException(
@@ -181,6 +264,8 @@ async def verify_clerk_token(
             detail=f"Authentication error: {str(e)}"
         )
 
+    return payload
+
 def get_current_user_id(payload: Dict[str, Any] = Depends(verify_clerk_token)) -> str:
     """
     Extract and return only the user ID from the token payload.
@@ -196,34 +281,41 @@ def get_current_user_id(payload: Dict[str, Any] = Depends(verify_clerk_token)) -
 
 async def get_optional_current_user(
     request: Request,
-    db: Database = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    jwks_client: JWKSClient = Depends(get_jwks_client)
 ) -> Optional[Dict[str, Any]]:
     """
     Try to get the current user, but don't require authentication.
     Returns None if no valid authentication is provided.
     """
     try:
-        token = await extract_token_from_request(request)
-        if not token:
-            return None
-        
-        header = jwt.get_unverified_header(token)
-        kid = header.get("kid")
-        
-        if not kid:
-            return None
-        
-        key = get_key_from_jwks(kid)
-        payload = jwt.decode(
-            token,
-            key,
-            algorithms=["RS256"],
-            audience=None,
-            issuer=CLERK_JWT_ISSUER,
-            options={"verify_aud": False}
-        )
-        
-        return payload
-    except Exception:
+        return await authenticate_request(request, credentials, jwks_client)
+    except HTTPException:
         return None
 
+async def require_metrics_access(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Database = Depends(get_db),
+    jwks_client: JWKSClient = Depends(get_jwks_client)
+) -> None:
+    """
+    Allow the request if it carries METRICS_TOKEN in X-Metrics-Token or
+    is made by an admin user.
+
+    Raises:
+        HTTPException: 401 if the caller is not authenticated, 403 if the
+            authenticated user is not an admin
+    """
+    metrics_token = request.headers.get("X-Metrics-Token")
+    if METRICS_TOKEN and metrics_token and hmac.compare_digest(metrics_token.encode(), METRICS_TOKEN.encode()):
+        return
+
+    payload = await authenticate_request(request, credentials, jwks_client)
+    user = await UserRepository(db).get_user_by_id(payload["sub"])
+    if not user or not user.get("is_admin", False):
+        logger.warning("Non-admin user denied access to metrics", extra={"user_id": payload["sub"]})
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
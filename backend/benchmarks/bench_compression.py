@@ -0,0 +1,54 @@
+"""
+Measure bytes and CPU saved by compressing a 100-result /api/search payload,
+and the cost of serving a repeat hit from the compressed body cache.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_compression
+"""
+import timeit
+
+from benchmarks.bench_serialization import build_payload
+from responses import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_GZIP_LEVEL,
+    ResponseCompressor,
+    dumps,
+    etag_for
+)
+from services.cache import TTLCache
+
+ITERATIONS = 200
+
+
+def main() -> None:
+    body = dumps(build_payload())
+    etag = etag_for(body)
+
+    uncached = ResponseCompressor(gzip_level=COMPRESSION_GZIP_LEVEL, brotli_quality=COMPRESSION_BROTLI_QUALITY)
+    cached = ResponseCompressor(
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY,
+        cache=TTLCache()
+    )
+
+    print(f"uncompressed:                 {len(body)} bytes")
+    for encoding in uncached.encodings:
+        size = len(uncached.compress(body, encoding))
+        compress_time = min(timeit.repeat(
+            lambda: uncached.compress(body, encoding), number=ITERATIONS, repeat=3
+        )) / ITERATIONS
+
+        cached.compress(body, encoding, etag=etag)
+        hit_time = min(timeit.repeat(
+            lambda: cached.compress(body, encoding, etag=etag), number=ITERATIONS, repeat=3
+        )) / ITERATIONS
+
+        print(f"{encoding}:")
+        print(f"  size:                       {size} bytes ({size / len(body):.1%}, {len(body) - size} saved)")
+        print(f"  compress per response:      {compress_time * 1e6:8.1f} us")
+        print(f"  cached hit per response:    {hit_time * 1e6:8.1f} us ({compress_time / hit_time:.0f}x less CPU)")
+
+
+if __name__ == "__main__":
+    main()
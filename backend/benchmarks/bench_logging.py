@@ -0,0 +1,75 @@
+"""
+Compare the per-call cost of logging straight to a stream with the
+queue-based setup from logging_config, as seen by the calling coroutine.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_logging
+"""
+import logging
+import os
+import queue
+import tempfile
+import timeit
+from logging.handlers import QueueListener
+
+from logging_config import JSONFormatter, NonBlockingQueueHandler, SamplingFilter
+
+ITERATIONS = 20_000
+
+
+def measure(logger: logging.Logger, message: str) -> float:
+    return min(timeit.repeat(
+        lambda: logger.info(message, "user_1", extra={"path": "/api/search"}),
+        number=ITERATIONS,
+        repeat=3
+    )) / ITERATIONS
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        stream = open(os.path.join(directory, "log.jsonl"), "w")
+
+        direct_handler = logging.StreamHandler(stream)
+        direct_handler.setFormatter(JSONFormatter())
+        direct = logging.getLogger("bench.direct")
+        direct.addHandler(direct_handler)
+        direct.setLevel(logging.INFO)
+        direct.propagate = False
+
+        stream_handler = logging.StreamHandler(stream)
+        stream_handler.setFormatter(JSONFormatter())
+        queue_handler = NonBlockingQueueHandler(queue.Queue(ITERATIONS * 4))
+        listener = QueueListener(queue_handler.queue, stream_handler)
+        queued = logging.getLogger("bench.queued")
+        queued.addHandler(queue_handler)
+        queued.setLevel(logging.INFO)
+        queued.propagate = False
+
+        sampled_handler = NonBlockingQueueHandler(queue.Queue(ITERATIONS * 4))
+        sampled_handler.addFilter(SamplingFilter({"bench.sampled": 0.1}))
+        sampled_listener = QueueListener(sampled_handler.queue, stream_handler)
+        sampled = logging.getLogger("bench.sampled")
+        sampled.addHandler(sampled_handler)
+        sampled.setLevel(logging.INFO)
+        sampled.propagate = False
+
+        message = "Token validated successfully for user: %s"
+        direct_time = measure(direct, message)
+        # Each listener is drained before the next measurement so the
+        # writer threads do not compete with the caller being measured.
+        listener.start()
+        queued_time = measure(queued, message)
+        listener.stop()
+        sampled_listener.start()
+        sampled_time = measure(sampled, message)
+        sampled_listener.stop()
+        stream.close()
+
+    print(f"stream handler + JSON:        {direct_time * 1e6:8.2f} us/call")
+    print(f"queue handler:                {queued_time * 1e6:8.2f} us/call")
+    print(f"queue handler, 10% sampled:   {sampled_time * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare response serialization for a 100-result /api/search payload.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization
+"""
+import json
+import timeit
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from responses import dumps
+
+ITERATIONS = 500
+
+
+def build_payload(result_count: int = 100) -> dict:
+    """Build a search response shaped like a full Openverse results page."""
+    results = [
+        {
+            "id": f"f7c5c4b8-0000-4000-8000-{index:012d}",
+            "title": f"Sunset over the harbour {index}",
+            "indexed_on": datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat(),
+            "foreign_landing_url": f"https://www.flickr.com/photos/example/{index}",
+            "url": f"https://live.staticflickr.com/65535/{index}_b.jpg",
+            "creator": "Example Photographer",
+            "creator_url": "https://www.flickr.com/photos/example",
+            "license": "by",
+            "license_version": "2.0",
+            "license_url": "https://creativecommons.org/licenses/by/2.0/",
+            "provider": "flickr",
+            "source": "flickr",
+            "category": "photograph",
+            "filesize": 1048576 + index,
+            "filetype": "jpg",
+            "tags": [{"name": tag, "accuracy": None} for tag in ("sunset", "harbour", "boats", "sea", "evening")],
+            "attribution": f"\"Sunset over the harbour {index}\" by Example Photographer is licensed under CC BY 2.0.",
+            "mature": False,
+            "height": 683,
+            "width": 1024,
+            "thumbnail": f"https://api.openverse.org/v1/images/{index}/thumb/",
+            "detail_url": f"https://api.openverse.org/v1/images/{index}/",
+            "related_url": f"https://api.openverse.org/v1/images/{index}/related/",
+            "media_type": "image"
+        }
+        for index in range(result_count)
+    ]
+    return {
+        "result_count": 10000,
+        "page_count": 100,
+        "page_size": result_count,
+        "page": 1,
+        "results": results,
+        "search_info": {"query": "sunset", "media_type": "image"},
+        "auth_status": {"authenticated": True, "email": "user@example.com", "search_saved": True}
+    }
+
+
+def main() -> None:
+    payload = build_payload()
+
+    def stdlib() -> bytes:
+        return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def fast() -> bytes:
+        return dumps(payload)
+
+    assert json.loads(stdlib()) == json.loads(fast())
+
+    baseline = min(timeit.repeat(stdlib, number=ITERATIONS, repeat=3)) / ITERATIONS
+    optimized = min(timeit.repeat(fast, number=ITERATIONS, repeat=3)) / ITERATIONS
+
+    print(f"payload size:                 {len(fast())} bytes")
+    print(f"jsonable_encoder + json:      {baseline * 1e6:8.1f} us/response")
+    print(f"orjson:                       {optimized * 1e6:8.1f} us/response")
+    print(f"saved:                        {(baseline - optimized) * 1e6:8.1f} us/response ({baseline / optimized:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
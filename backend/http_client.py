@@ -0,0 +1,39 @@
+import os
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OPENVERSE_CONNECTION_LIMIT = int(os.getenv("OPENVERSE_CONNECTION_LIMIT", "100"))
+OPENVERSE_CONNECTION_LIMIT_PER_HOST = int(os.getenv("OPENVERSE_CONNECTION_LIMIT_PER_HOST", "50"))
+OPENVERSE_KEEPALIVE_TIMEOUT = float(os.getenv("OPENVERSE_KEEPALIVE_TIMEOUT", "30"))
+OPENVERSE_DNS_CACHE_TTL = int(os.getenv("OPENVERSE_DNS_CACHE_TTL", "300"))
+
+OPENVERSE_TOTAL_TIMEOUT = float(os.getenv("OPENVERSE_TOTAL_TIMEOUT", "10"))
+OPENVERSE_CONNECT_TIMEOUT = float(os.getenv("OPENVERSE_CONNECT_TIMEOUT", "3"))
+OPENVERSE_READ_TIMEOUT = float(os.getenv("OPENVERSE_READ_TIMEOUT", "8"))
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+    Create the pooled HTTP session used for all outbound Openverse calls.
+
+    A single session per process keeps TCP+TLS connections alive between
+    requests instead of paying a fresh handshake on every search.
+    Must be called from within a running event loop.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=OPENVERSE_CONNECTION_LIMIT,
+        limit_per_host=OPENVERSE_CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=OPENVERSE_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=OPENVERSE_DNS_CACHE_TTL,
+        use_dns_cache=True
+    )
+
+    timeout = aiohttp.ClientTimeout(
+        total=OPENVERSE_TOTAL_TIMEOUT,
+        connect=OPENVERSE_CONNECT_TIMEOUT,
+        sock_read=OPENVERSE_READ_TIMEOUT
+    )
+
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
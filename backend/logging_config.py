@@ -0,0 +1,208 @@
+import atexit
+import logging
+import os
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+import orjson
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Comma-separated logger=rate pairs, e.g. "uvicorn.access=0.1,services=0.5"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "uvicorn.access=0.1,auth=0.01")
+
+REDACTED = "[REDACTED]"
+REDACTED_FIELDS = {"authorization", "cookie", "set-cookie", "x-session-token", "token", "password", "email"}
+REDACTED_PATTERNS = [
+    re.compile(r"(?i)bearer\s+[\w\-.~+/]+=*"),
+    re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]*"),
+    re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+]
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+def redact(text: str) -> str:
+    """Mask bearer tokens, JWTs and email addresses in text."""
+    for pattern in REDACTED_PATTERNS:
+        text = pattern.sub(REDACTED, text)
+    return text
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "logger=rate" pairs, ignoring malformed entries."""
+    rates: Dict[str, float] = {}
+    for pair in value.split(","):
+        name, _, rate = pair.partition("=")
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, redacting secrets.
+
+    Fields passed through extra= are included; fields named in
+    REDACTED_FIELDS are masked whatever their value.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage())
+        }
+        for key, value in vars(record).items():
+            if key in _RECORD_ATTRS:
+                continue
+            if key.lower() in REDACTED_FIELDS:
+                value = REDACTED
+            elif isinstance(value, str):
+                value = redact(value)
+            entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = redact(record.exc_text)
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of INFO and DEBUG records per logger.
+
+    Rates apply to a logger and its children, the most specific name
+    winning. Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Args:
+            rates: Fraction of records kept per logger name, from 0 to 1
+        """
+        super().__init__()
+        self.rates = rates
+        self._cache: Dict[str, float] = {}
+
+        self.dropped = 0
+
+    def rate_for(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to a bounded queue drained by a background thread.
+
+    The calling thread only merges the message arguments; JSON encoding,
+    redaction and I/O happen on the listener thread. Records arriving
+    while the queue is full are dropped instead of blocking the event loop.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Updated in place rather than copied: other handlers still see the
+        # same message, and the traceback survives as exc_text.
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_sampler: Optional[SamplingFilter] = None
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging() -> QueueListener:
+    """
+    Route all logging through a queue to a JSON stdout writer thread.
+
+    Replaces the root logger's handlers, makes uvicorn's loggers propagate
+    to it, and stops the writer at interpreter exit. Safe to call more than
+    once; later calls only re-route uvicorn's loggers and return the
+    running listener.
+    """
+    global _handler, _sampler, _listener
+    # uvicorn may have installed its own handlers since the last call
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+
+    _handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    _sampler = SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES))
+    _handler.addFilter(_sampler)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def logging_stats() -> Dict[str, Any]:
+    """Return queue depth and the number of records dropped or sampled out."""
+    if _handler is None:
+        return {"configured": False}
+    return {
+        "configured": True,
+        "queued": _handler.queue.qsize(),
+        "dropped": _handler.dropped,
+        "sampled_out": _sampler.dropped
+    }
@@ -1,13 +1,64 @@
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from routes import search, users
 from dotenv import load_dotenv
-from database import client as mongo_client
+from logging_config import configure_logging, logging_stats
+from database import client as mongo_client, db as mongo_db
+from repositories.user_repository import UserRepository
+from http_client import create_http_session
+from auth import auth_counters, create_jwks_client, known_users, require_metrics_access, verified_tokens
+from responses import ORJSONResponse, compressor
+from services.search_service import SearchService
+from services.suggestion_index import SuggestionIndex
 
 load_dotenv()
+configure_logging()
+
+logger = logging.getLogger(__name__)
+
+LOCAL_INDEX_BOOKMARK_LIMIT = int(os.getenv("LOCAL_INDEX_BOOKMARK_LIMIT", "10000"))
+SUGGEST_HISTORY_LIMIT = int(os.getenv("SUGGEST_HISTORY_LIMIT", "50000"))
+SUGGEST_MIN_USERS = int(os.getenv("SUGGEST_MIN_USERS", "2"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create app-scoped clients on startup and release them on shutdown."""
+    index_creation = asyncio.ensure_future(create_indexes())
+    app.state.http_session = create_http_session()
+    app.state.jwks_client = create_jwks_client(app.state.http_session)
+    if app.state.jwks_client.url:
+        app.state.jwks_client.start()
+    app.state.search_service = SearchService(session=app.state.http_session)
+    app.state.search_service.popular_pool.start()
+    local_index = app.state.search_service.local_index
+    try:
+        local_index.load()
+    except Exception as e:
+        logger.error(f"Could not load local index snapshot: {str(e)}")
+    local_index.start()
+    bookmark_indexing = asyncio.ensure_future(index_bookmarks(local_index))
+    app.state.suggestion_index = SuggestionIndex(min_users=SUGGEST_MIN_USERS)
+    suggestion_indexing = asyncio.ensure_future(index_search_history(app.state.suggestion_index))
+    try:
+        yield
+    finally:
+        index_creation.cancel()
+        bookmark_indexing.cancel()
+        suggestion_indexing.cancel()
+        await app.state.jwks_client.stop()
+        await app.state.search_service.popular_pool.stop()
+        await local_index.stop()
+        local_index.close()
+        await shutdown_http_session()
+        await shutdown_db_client()
 
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title="Open License Media Search API",
     description="API for searching and managing open license media",
     version="1.0.0",
@@ -56,7 +107,49 @@ async def health_check():
         "render_instance": os.getenv("RENDER_INSTANCE_ID", None)
     }
 
-@app.on_event("shutdown")
+@app.get("/api/metrics", dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    """Runtime counters for caches and upstream clients, for admins only."""
+    return {
+        **app.state.search_service.metrics(),
+        "suggestions": app.state.suggestion_index.stats(),
+        "compression": compressor.stats(),
+        "jwks": app.state.jwks_client.stats(),
+        "verified_tokens": verified_tokens.stats(),
+        "known_users": known_users.stats(),
+        "auth": dict(auth_counters),
+        "logging": logging_stats()
+    }
+
+async def create_indexes():
+    """Create the MongoDB indexes the repositories rely on."""
+    try:
+        await UserRepository(mongo_db).ensure_indexes()
+    except Exception as e:
+        logger.error(f"Could not create database indexes: {str(e)}")
+
+async def index_bookmarks(local_index):
+    """Add recently bookmarked media to the local search index."""
+    try:
+        bookmarks = await UserRepository(mongo_db).get_recent_bookmarks(LOCAL_INDEX_BOOKMARK_LIMIT)
+        for bookmark in bookmarks:
+            local_index.add_bookmark(bookmark)
+    except Exception as e:
+        logger.warning(f"Could not index bookmarks: {str(e)}")
+
+async def index_search_history(suggestion_index):
+    """Build the autocomplete index from recently saved searches."""
+    try:
+        history = await UserRepository(mongo_db).get_recent_search_history(SUGGEST_HISTORY_LIMIT)
+        for entry in reversed(history):
+            suggestion_index.record(entry.get("search_query") or "", user_id=entry.get("user_id"))
+    except Exception as e:
+        logger.warning(f"Could not index search history: {str(e)}")
+
+async def shutdown_http_session():
+    """Close the pooled Openverse HTTP session when the app shuts down."""
+    await app.state.http_session.close()
+
 async def shutdown_db_client():
     """Close MongoDB connection when the app shuts down."""
     mongo_client.close()
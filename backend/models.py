@@ -39,6 +39,7 @@ class SearchHistory(MongoBaseModel):
     user_id: str
     search_query: str
     search_params: Optional[Dict[str, Any]] = None
+    search_key: Optional[str] = None
     search_results: Optional[Dict[str, Any]] = None
     result_count: Optional[int] = None
     created_at: datetime = Field(default_factory=datetime.now)
@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict, Any
 from pymongo.database import Database
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 
 class UserRepository:
@@ -15,6 +16,10 @@ class UserRepository:
         self.bookmarks_collection = db.bookmarks
         self.search_history_collection = db.search_history
     
+    async def ensure_indexes(self) -> None:
+        """Create the indexes the repository relies on, if missing."""
+        await self.users_collection.create_index("id", unique=True)
+    
     async def get_user_by_id(self, user_id: str) -> Optional[Dict]:
         """Get a user by their ID."""
         return await self.users_collection.find_one({"id": user_id})
@@ -29,6 +34,26 @@ class UserRepository:
         result = await self.users_collection.insert_one(user_data)
         return {**user_data, "_id": result.inserted_id}
     
+    async def ensure_user(self, user_id: str, user_data: Dict[str, Any]) -> bool:
+        """
+        Create a user unless one with this ID already exists, in a single
+        upsert. Existing users are left unchanged. Relies on the unique
+        index from ensure_indexes so concurrent upserts cannot both insert.
+
+        Returns:
+            True if the user was created
+        """
+        try:
+            result = await self.users_collection.update_one(
+                {"id": user_id},
+                {"$setOnInsert": {**user_data, "id": user_id, "created_at": datetime.now()}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # A concurrent upsert for the same user inserted first.
+            return False
+        return result.upserted_id is not None
+    
     async def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[Dict]:
         """Update an existing user."""
         user = await self.get_user_by_id(user_id)
@@ -61,6 +86,11 @@ class UserRepository:
         cursor = self.bookmarks_collection.find({"user_id": user_id})
         return await cursor.to_list(length=None)
     
+    async def get_recent_bookmarks(self, limit: int) -> List[Dict]:
+        """Get the most recently created bookmarks across all users."""
+        cursor = self.bookmarks_collection.find().sort("created_at", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+    
     async def create_bookmark(self, bookmark_data: Dict[str, Any]) -> Dict:
         """Create a new bookmark."""
         bookmark_data["created_at"] = datetime.now()
@@ -89,6 +119,13 @@ class UserRepository:
         cursor = self.search_history_collection.find({"user_id": user_id}).sort("created_at", -1).limit(limit)
         return await cursor.to_list(length=None)
     
+    async def get_recent_search_history(self, limit: int) -> List[Dict]:
+        """Get the queries and users of the most recent searches across all users."""
+        cursor = self.search_history_collection.find(
+            {}, {"user_id": 1, "search_query": 1}
+        ).sort("created_at", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+    
     async def create_search_history(self, history_data: Dict[str, Any]) -> Dict:
         """Create a new search history entry."""
         history_data["created_at"] = datetime.now()
@@ -0,0 +1,282 @@
+import gzip
+import hashlib
+import os
+from typing import Any, Dict, Optional
+import orjson
+from bson import ObjectId
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from services.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are only gzip-compressed
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_MAX_ENTRIES = int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", "1024"))
+COMPRESSION_CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+COMPRESSION_CACHE_TTL = float(os.getenv("COMPRESSION_CACHE_TTL", "3600"))
+
+
+def json_default(value: Any) -> Any:
+    """
+    Serialize types orjson does not handle natively.
+
+    datetime, date, UUID and dataclasses are already handled by orjson
+    itself; this covers MongoDB ObjectIds and Pydantic models such as
+    StandardResponse.
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with the API's encoding rules."""
+    return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Used as the app's default response class. Routes that already hold
+    plain dicts return it directly so FastAPI skips jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    codings: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+class ResponseCompressor:
+    """
+    Negotiates and applies gzip or brotli compression to response bodies.
+
+    Bodies that are served repeatedly, such as popular media and hot
+    searches, can be compressed once: the compressed bytes are kept in a
+    TTLCache keyed by the body's ETag and the coding, so a repeat hit
+    costs a hash lookup instead of another compression pass.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache: Optional[TTLCache] = None,
+        cache_ttl: float = 3600
+    ):
+        """
+        Args:
+            min_size: Smallest body in bytes worth compressing
+            gzip_level: zlib compression level (1-9)
+            brotli_quality: Brotli quality (0-11), used if brotli is installed
+            cache: Cache for compressed bodies; nothing is cached if None
+            cache_ttl: Seconds a compressed body is kept
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+        self.compressed = 0
+        self.reused = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self, accept_encoding: Optional[str], size: int) -> Optional[str]:
+        """
+        Choose a coding for a body of size bytes.
+
+        Returns:
+            "br" or "gzip", or None to send the body uncompressed
+        """
+        if size < self.min_size:
+            return None
+        codings = parse_accept_encoding(accept_encoding)
+        for encoding in self.encodings:
+            if codings.get(encoding, codings.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+    def compress(self, body: bytes, encoding: str, etag: Optional[str] = None) -> bytes:
+        """
+        Compress body, reusing the cached result for the same ETag.
+
+        Args:
+            body: Uncompressed response body
+            encoding: "br" or "gzip"
+            etag: ETag of body; if given the compressed bytes are cached
+        """
+        key = (etag, encoding)
+        if etag is not None and self.cache is not None:
+            entry = self.cache.get_entry(key)
+            if entry is not None:
+                self.reused += 1
+                self.bytes_in += len(body)
+                self.bytes_out += entry.size
+                return entry.payload
+
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        self.compressed += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+
+        if etag is not None and self.cache is not None:
+            self.cache.set_payload(key, compressed, ttl=self.cache_ttl)
+        return compressed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return compression counters and the compressed body cache's stats."""
+        return {
+            "encodings": list(self.encodings),
+            "compressed": self.compressed,
+            "reused": self.reused,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+            "cache": self.cache.stats() if self.cache is not None else None
+        }
+
+
+compressor = ResponseCompressor(
+    min_size=COMPRESSION_MIN_SIZE,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
+    cache=TTLCache(max_entries=COMPRESSION_CACHE_MAX_ENTRIES, max_bytes=COMPRESSION_CACHE_MAX_BYTES),
+    cache_ttl=COMPRESSION_CACHE_TTL
+)
+
+
+def add_vary(headers: Dict[str, str], field: str) -> None:
+    """Add a field to the Vary header in headers."""
+    vary = headers.get("Vary")
+    headers["Vary"] = f"{vary}, {field}" if vary else field
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """Return the ETag of a body sent with the given content coding."""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def json_response(request: Request, content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Render content as JSON, compressed if the client accepts it and the
+    body is large enough. Compressed bytes are not cached.
+    """
+    body = dumps(content)
+    response_headers = dict(headers or {})
+    add_vary(response_headers, "Accept-Encoding")
+    encoding = compressor.negotiate(request.headers.get("accept-encoding"), len(body))
+    if encoding is not None:
+        body = compressor.compress(body, encoding)
+        response_headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=response_headers)
+
+
+def cache_control(max_age: int, private: bool = False) -> str:
+    """
+    Build a Cache-Control value.
+
+    Args:
+        max_age: Seconds clients may reuse the response without revalidating
+        private: Whether only the user's own client may store the response
+    """
+    return f"{'private' if private else 'public'}, max-age={max_age}"
+
+
+def etag_for(body: bytes) -> str:
+    """Return a strong ETag derived from the response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_json_response(
+    request: Request,
+    content: Any,
+    cache_control_value: str,
+    headers: Optional[Dict[str, str]] = None,
+    cache_compressed: bool = True
+) -> Response:
+    """
+    Render content as JSON with an ETag, answering 304 if the client has it.
+
+    Large bodies are compressed when the client accepts gzip or brotli.
+    Each coding gets its own ETag, and a client holding any of them gets a
+    304 since they all decode to the same JSON.
+
+    Args:
+        request: Incoming request, checked for If-None-Match and Accept-Encoding
+        content: JSON-serializable response content
+        cache_control_value: Cache-Control header for the response
+        headers: Additional response headers
+        cache_compressed: Whether to keep the compressed body for repeat
+            requests; disable for bodies unlikely to be served twice
+
+    Returns:
+        A 304 response without a body if the client's copy is current,
+        otherwise the JSON response
+    """
+    body = dumps(content)
+    etag = etag_for(body)
+    encoding = compressor.negotiate(request.headers.get("accept-encoding"), len(body))
+    response_headers = {
+        **(headers or {}),
+        "ETag": encoded_etag(etag, encoding),
+        "Cache-Control": cache_control_value
+    }
+    add_vary(response_headers, "Accept-Encoding")
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and any(
+        etag_matches(if_none_match, encoded_etag(etag, candidate))
+        for candidate in (None, *compressor.encodings)
+    ):
+        return Response(status_code=304, headers=response_headers)
+
+    if encoding is not None:
+        body = compressor.compress(body, encoding, etag=etag if cache_compressed else None)
+        response_headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=response_headers)
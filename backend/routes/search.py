@@ -1,118 +1,376 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import os
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from pymongo.database import Database
-from typing import Optional
+from typing import Dict, Optional
 from database import get_db
 from services.search_service import SearchService
+from services.response_cache import cache_status
+from services.resilience import Deadline, UpstreamError, UpstreamUnavailableError
+from services.media_models import parse_fields, project_results
+from services.query_canonicalizer import canonicalize_search
+from services.suggestion_index import SuggestionIndex
+from services.dedup import drop_seen, mark_seen
 from services.user_service import UserService
 from repositories.user_repository import UserRepository
 from auth import verify_clerk_token, get_current_user_id, get_optional_current_user
-from schemas import SearchRequest, StandardResponse
+from schemas import SearchRequest, MediaBatchRequest
+from responses import ORJSONResponse, cache_control, conditional_json_response, dumps, json_response
 
 router = APIRouter()
 
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "8"))
+STREAM_MAX_RESULTS = int(os.getenv("STREAM_MAX_RESULTS", "10000"))
+SEARCH_RESPONSE_MAX_AGE = int(os.getenv("SEARCH_RESPONSE_MAX_AGE", "60"))
+MEDIA_RESPONSE_MAX_AGE = int(os.getenv("MEDIA_RESPONSE_MAX_AGE", "3600"))
+POPULAR_RESPONSE_MAX_AGE = int(os.getenv("POPULAR_RESPONSE_MAX_AGE", "300"))
+
+def get_search_service(request: Request) -> SearchService:
+    """
+    Dependency that returns the app-scoped search service.
+    """
+    return request.app.state.search_service
+
+def get_suggestion_index(request: Request) -> SuggestionIndex:
+    """
+    Dependency that returns the app-scoped autocomplete index.
+    """
+    return request.app.state.suggestion_index
+
+def get_request_deadline() -> Deadline:
+    """
+    Dependency that starts the time budget for upstream calls made by a request.
+    """
+    return Deadline(REQUEST_DEADLINE_SECONDS)
+
+def cache_status_headers(statuses: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Headers marking the response as fresh, stale or revalidated from the cache.
+
+    statuses holds one status per media type for merged searches; they are
+    combined into a single value when they agree and listed per type otherwise.
+    """
+    if statuses:
+        values = set(statuses.values())
+        if len(values) == 1:
+            status_value = values.pop()
+        else:
+            status_value = ", ".join(f"{name}={value}" for name, value in statuses.items())
+    else:
+        status_value = cache_status.get()
+    return {"X-Cache-Status": status_value} if status_value else {}
+
 @router.get("/search")
 async def search_media(
+    request: Request,
+    background_tasks: BackgroundTasks,
     query: str = Query(..., description="Search term"),
-    media_type: str = Query("images", description="Type of media (images, audio)"),
+    media_type: str = Query("images", description="Type of media (images, audio, a comma-separated list, or all)"),
     page: int = Query(1, description="Page number", ge=1),
     page_size: int = Query(20, description="Results per page", ge=1, le=100),
     license_type: Optional[str] = Query(None, description="Filter by license type"),
     creator: Optional[str] = Query(None, description="Filter by creator"),
     tags: Optional[str] = Query(None, description="Filter by tags (comma-separated)"),
     source: Optional[str] = Query(None, description="Filter by source"),
+    prefetch: bool = Query(False, description="Prefetch the next page in the background"),
+    fields: Optional[str] = Query(None, description="Result shape: card (default), full, or comma-separated field names"),
+    dedup: bool = Query(False, description="Leave out results already delivered in this dedup session"),
+    dedup_token: Optional[str] = Query(None, description="Dedup session token returned by a previous page"),
     db: Database = Depends(get_db),
-    current_user: Optional[dict] = Depends(get_optional_current_user)
+    current_user: Optional[dict] = Depends(get_optional_current_user),
+    search_service: SearchService = Depends(get_search_service),
+    suggestion_index: SuggestionIndex = Depends(get_suggestion_index),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     """
     Search for media using the Openverse API.
     
+    Parameters are canonicalized before searching, so equivalent searches
+    share one cache entry and one history identity.
     If the user is authenticated, their search query will be saved to their history.
+    With media_type=all (or a comma-separated list) every type is searched
+    concurrently and the results are merged into one payload.
+    With prefetch enabled, the next page is fetched in the background after
+    this response is sent so the following page turn is served from memory.
+    Results use the compact card shape unless fields=full or an explicit
+    field list is requested.
+    If Openverse is unavailable, the search is answered from the local
+    index of previously seen media and the response is marked degraded.
+    With dedup enabled, results already delivered in the session named by
+    dedup_token are dropped and the page is refilled from the next pages;
+    the token to send with the following page is returned under "dedup".
+    Responses carry an ETag and are answered with 304 when the client's
+    copy is current; they are publicly cacheable only for anonymous users.
     """
     try:
-        search_service = SearchService()
-        
-        search_results = await search_service.search_media(
-            query=query,
-            media_type=media_type,
-            page=page,
-            page_size=page_size,
-            license_type=license_type,
-            creator=creator,
-            tags=tags,
-            source=source
-        )
+        projection = parse_fields(fields)
+        search = canonicalize_search(query, media_type, page, page_size, license_type, creator, tags, source)
+        media_types = search_service.parse_media_types(search.media_type)
+        seen = None
+        if dedup:
+            dedup_token, seen = search_service.seen_results.session(dedup_token)
+
+        type_cache_statuses = None
+        try:
+            if len(media_types) > 1:
+                search_results = await search_service.search_multiple_media_types(
+                    query=search.query,
+                    media_types=media_types,
+                    page=search.page,
+                    page_size=search.page_size,
+                    license_type=search.license_type,
+                    creator=search.creator,
+                    tags=search.tags,
+                    source=search.source,
+                    deadline=deadline
+                )
+                page_counts = {
+                    type_name: meta["page_count"]
+                    for type_name, meta in search_results["media_types"].items()
+                }
+                type_cache_statuses = search_results.pop("cache_statuses")
+            elif seen is not None:
+                search_results = await search_service.search_media_unseen(
+                    seen,
+                    query=search.query,
+                    media_type=media_types[0],
+                    page=search.page,
+                    page_size=search.page_size,
+                    license_type=search.license_type,
+                    creator=search.creator,
+                    tags=search.tags,
+                    source=search.source,
+                    deadline=deadline
+                )
+                page_counts = {media_types[0]: search_results.get("page_count", page)}
+            else:
+                search_results = await search_service.search_media(
+                    query=search.query,
+                    media_type=media_types[0],
+                    page=search.page,
+                    page_size=search.page_size,
+                    license_type=search.license_type,
+                    creator=search.creator,
+                    tags=search.tags,
+                    source=search.source,
+                    deadline=deadline
+                )
+                page_counts = {media_types[0]: search_results.get("page_count", page)}
+        except (UpstreamUnavailableError, UpstreamError):
+            search_results = search_service.search_local(
+                query=search.query,
+                media_types=media_types,
+                page=search.page,
+                page_size=search.page_size,
+                license_type=search.license_type,
+                creator=search.creator,
+                tags=search.tags,
+                source=search.source
+            )
+            if search_results is None:
+                raise
+            page_counts = {}
+
+        if seen is not None:
+            if "dedup" not in search_results:
+                search_results["results"], dropped = drop_seen(search_results.get("results", []), seen)
+                mark_seen(search_results["results"], seen)
+                search_results["dedup"] = {"dropped": dropped, "refilled": 0}
+            search_results["dedup"]["token"] = dedup_token
         
         if current_user and "sub" in current_user:
             user_id = current_user["sub"]
             user_repository = UserRepository(db)
-            user_service = UserService(user_repository)
-            
-            search_params = {
-                "media_type": media_type,
-                "page": page,
-                "page_size": page_size,
-                "license_type": license_type,
-                "creator": creator,
-                "tags": tags,
-                "source": source
-            }
+            user_service = UserService(user_repository, suggestion_index=suggestion_index)
 
             await user_service.save_search_history(
                 user_id=user_id,
-                search_query=query,
-                search_params=search_params,
-                search_results=None
+                search_query=search.query,
+                search_params=search.params(),
+                search_results=None,
+                search_key=search.search_key
             )
     
 
+        search_results["results"] = project_results(search_results.get("results", []), projection)
         search_results["auth_status"] = "authenticated" if current_user else "unauthenticated"
+
+        for type_name, page_count in page_counts.items():
+            if prefetch and page < page_count:
+                background_tasks.add_task(
+                    search_service.prefetch_next_page,
+                    query=search.query,
+                    media_type=type_name,
+                    page=search.page,
+                    page_size=search.page_size,
+                    license_type=search.license_type,
+                    creator=search.creator,
+                    tags=search.tags,
+                    source=search.source
+                )
         
-        return search_results
+        if seen is not None:
+            cache_control_value = "private, no-store"
+        else:
+            cache_control_value = cache_control(
+                0 if search_results.get("degraded") else SEARCH_RESPONSE_MAX_AGE,
+                private=current_user is not None
+            )
+        return conditional_json_response(
+            request,
+            search_results,
+            cache_control_value,
+            headers={**cache_status_headers(type_cache_statuses), "Vary": "Authorization"},
+            cache_compressed=seen is None
+        )
     
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UpstreamUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/suggest")
+async def suggest_queries(
+    prefix: str = Query(..., description="Query typed so far", min_length=1, max_length=100),
+    limit: int = Query(8, description="Maximum number of suggestions", ge=1, le=10),
+    current_user: Optional[dict] = Depends(get_optional_current_user),
+    suggestion_index: SuggestionIndex = Depends(get_suggestion_index)
+):
+    """
+    Suggest search queries for a prefix.
+
+    Suggestions come from an in-memory index of saved searches: the
+    authenticated user's own searches first, then queries popular across
+    users, each ordered by how often they were searched.
+    """
+    user_id = current_user.get("sub") if current_user else None
+    return ORJSONResponse({
+        "prefix": prefix,
+        "suggestions": suggestion_index.suggest(prefix, user_id=user_id, limit=limit)
+    })
+
+@router.get("/search/stream")
+async def stream_search_results(
+    query: str = Query(..., description="Search term"),
+    media_type: str = Query("images", description="Type of media (images, audio)"),
+    max_results: int = Query(1000, description="Maximum number of results to export", ge=1, le=STREAM_MAX_RESULTS),
+    license_type: Optional[str] = Query(None, description="Filter by license type"),
+    creator: Optional[str] = Query(None, description="Filter by creator"),
+    tags: Optional[str] = Query(None, description="Filter by tags (comma-separated)"),
+    source: Optional[str] = Query(None, description="Filter by source"),
+    search_service: SearchService = Depends(get_search_service)
+):
+    """
+    Export up to max_results search results as newline-delimited JSON.
+
+    Pages are fetched from Openverse concurrently but streamed in order and
+    de-duplicated, one result per line. If Openverse fails part-way, the
+    last line is an {"error": ...} object.
+    """
+    try:
+        search_service.validate_search_params(media_type, license_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def ndjson_lines():
+        async for item in search_service.stream_search(
+            query=query,
+            media_type=media_type,
+            max_results=max_results,
+            license_type=license_type,
+            creator=creator,
+            tags=tags,
+            source=source
+        ):
+            yield dumps(item) + b"\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@router.post("/media/batch")
+async def get_media_details_batch(
+    request: Request,
+    batch: MediaBatchRequest,
+    search_service: SearchService = Depends(get_search_service),
+    deadline: Deadline = Depends(get_request_deadline)
+):
+    """
+    Get detailed information about several media items in one request.
+
+    Each item reports its own success or error; one failing item does not
+    fail the whole batch.
+    """
+    try:
+        results = await search_service.get_media_details_batch(
+            [(item.media_type, item.media_id) for item in batch.items],
+            deadline=deadline
+        )
+        failed = sum(1 for result in results if not result["success"])
+
+        return json_response(request, {
+            "results": results,
+            "succeeded": len(results) - failed,
+            "failed": failed
+        })
+
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/media/{media_type}/{media_id}")
 async def get_media_details(
+    request: Request,
     media_type: str,
     media_id: str,
-    db: Database = Depends(get_db)
+    db: Database = Depends(get_db),
+    search_service: SearchService = Depends(get_search_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     """
     Get detailed information about a specific media item.
     """
     try:
-        search_service = SearchService()
         media_details = await search_service.get_media_details(
             media_id=media_id,
-            media_type=media_type
+            media_type=media_type,
+            deadline=deadline
         )
         
-        return media_details
+        return conditional_json_response(
+            request,
+            media_details,
+            cache_control(MEDIA_RESPONSE_MAX_AGE),
+            headers=cache_status_headers()
+        )
     
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except UpstreamUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/popular/{media_type}")
 async def get_popular_media(
+    request: Request,
     media_type: str = "images",
-    limit: int = Query(20, description="Maximum number of results", ge=1, le=50)
+    limit: int = Query(20, description="Maximum number of results", ge=1, le=50),
+    search_service: SearchService = Depends(get_search_service)
 ):
     """
     Get popular media items.
     """
     try:
-        search_service = SearchService()
         popular_media = await search_service.get_popular_media(
             media_type=media_type,
             limit=limit
         )
         
-        return {"results": popular_media}
+        return conditional_json_response(
+            request,
+            {"results": popular_media},
+            cache_control(POPULAR_RESPONSE_MAX_AGE)
+        )
     
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -134,11 +392,11 @@ async def get_search_history(
         
         history = await user_service.get_search_history(user_id=user_id, limit=limit)
         
-        return StandardResponse(
-            success=True,
-            message="Search history retrieved successfully",
-            data=history
-        )
+        return ORJSONResponse({
+            "success": True,
+            "message": "Search history retrieved successfully",
+            "data": history
+        })
     
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -160,11 +418,11 @@ async def delete_search_history_entry(
         
         result = await user_service.delete_search_history(user_id=user_id, history_id=history_id)
         
-        return StandardResponse(
-            success=True,
-            message=result["message"],
-            data=None
-        )
+        return ORJSONResponse({
+            "success": True,
+            "message": result["message"],
+            "data": None
+        })
     
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -185,11 +443,11 @@ async def clear_search_history(
         
         result = await user_service.clear_search_history(user_id=user_id)
         
-        return StandardResponse(
-            success=True,
-            message=result["message"],
-            data={"entries_deleted": result["entries_deleted"]}
-        )
+        return ORJSONResponse({
+            "success": True,
+            "message": result["message"],
+            "data": {"entries_deleted": result["entries_deleted"]}
+        })
     
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
@@ -3,9 +3,12 @@ from pymongo.database import Database
 from typing import Optional
 from database import get_db
 from services.user_service import UserService
+from services.search_service import SearchService
 from repositories.user_repository import UserRepository
 from auth import verify_clerk_token, get_current_user_id
-from schemas import BookmarkCreate, BookmarkResponse, StandardResponse
+from routes.search import get_search_service
+from schemas import BookmarkCreate, BookmarkResponse
+from responses import ORJSONResponse
 
 router = APIRouter()
 
@@ -23,11 +26,11 @@ async def get_user_profile(
         
         profile = await user_service.get_user_profile(user_id=user_id)
         
-        return StandardResponse(
-            success=True,
-            message="User profile retrieved successfully",
-            data=profile
-        )
+        return ORJSONResponse({
+            "success": True,
+            "message": "User profile retrieved successfully",
+            "data": profile
+        })
     
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -43,10 +46,13 @@ async def create_bookmark(
     media_creator: Optional[str] = Body(None),
     media_license: Optional[str] = Body(None),
     db: Database = Depends(get_db),
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    search_service: SearchService = Depends(get_search_service)
 ):
     """
     Create a new bookmark for the authenticated user.
+
+    The bookmarked media is also added to the local search index.
     """
     try:
         user_repository = UserRepository(db)
@@ -61,12 +67,13 @@ async def create_bookmark(
             media_creator=media_creator,
             media_license=media_license
         )
+        search_service.local_index.add_bookmark(bookmark)
         
-        return StandardResponse(
-            success=True,
-            message="Bookmark created successfully",
-            data=bookmark
-        )
+        return ORJSONResponse({
+            "success": True,
+            "message": "Bookmark created successfully",
+            "data": bookmark
+        })
     
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -87,11 +94,11 @@ async def get_bookmarks(
         
         bookmarks = await user_service.get_bookmarks(user_id=user_id)
         
-        return StandardResponse(
-            success=True,
-            message="Bookmarks retrieved successfully",
-            data=bookmarks
-        )
+        return ORJSONResponse({
+            "success": True,
+            "message": "Bookmarks retrieved successfully",
+            "data": bookmarks
+        })
     
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -111,11 +118,11 @@ async def delete_bookmark(
         
         result = await user_service.delete_bookmark(user_id=user_id, media_id=media_id)
         
-        return StandardResponse(
-            success=True,
-            message=result["message"],
-            data=None
-        )
+        return ORJSONResponse({
+            "success": True,
+            "message": result["message"],
+            "data": None
+        })
     
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
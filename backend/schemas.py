@@ -34,6 +34,7 @@ class UserResponse(UserBase):
 class SearchHistoryBase(BaseModel):
     search_query: str
     search_params: Optional[Dict[str, Any]] = None
+    search_key: Optional[str] = None
 
 class SearchHistoryCreate(SearchHistoryBase):
     user_id: str
@@ -78,6 +79,13 @@ class SearchRequest(BaseModel):
     tags: Optional[str] = None
     source: Optional[str] = None
 
+class MediaReference(BaseModel):
+    media_type: str
+    media_id: str
+
+class MediaBatchRequest(BaseModel):
+    items: List[MediaReference] = Field(..., min_length=1, max_length=50)
+
 class StandardResponse(BaseModel):
     success: bool
     message: str
@@ -0,0 +1,182 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import orjson
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialize a JSON-compatible value to the cache's storage format."""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def decode_value(payload: bytes) -> Any:
+    """Deserialize a payload produced by encode_value into a fresh object."""
+    return orjson.loads(payload)
+
+
+class CacheEntry:
+    """
+    A single cached value stored as serialized JSON bytes.
+
+    An entry is fresh until expires_at. After that it may still be served
+    while revalidating until stale_until, or when upstream is failing until
+    error_until; it is dropped once both windows have passed.
+    """
+
+    __slots__ = ("payload", "size", "expires_at", "stale_until", "error_until")
+
+    def __init__(self, payload: bytes, expires_at: float, stale_until: float, error_until: float):
+        self.payload = payload
+        self.size = len(payload)
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.error_until = error_until
+
+    @property
+    def retain_until(self) -> float:
+        return max(self.expires_at, self.stale_until, self.error_until)
+
+
+class TTLCache:
+    """
+    Bounded in-memory LRU cache with per-entry TTLs.
+
+    Values are stored as serialized JSON so the byte cap is exact and every
+    read hands back a fresh copy; callers can never mutate a cached result.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Maximum number of entries kept before LRU eviction
+            max_bytes: Maximum total size of serialized payloads in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return a copy of the cached value, or None if missing or expired.
+        """
+        entry = self.get_entry(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        return decode_value(entry.payload)
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Return the raw entry while it is fresh or within a stale window.
+
+        Only fresh entries count as hits; callers decide whether a stale
+        entry may be served.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        now = time.monotonic()
+        if entry.retain_until <= now:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if entry.expires_at > now:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0.0, error_ttl: float = 0.0) -> bytes:
+        """
+        Store a value for ttl seconds, evicting least recently used entries
+        until the entry and byte caps are respected.
+
+        Args:
+            key: Cache key
+            value: JSON-compatible value
+            ttl: Seconds the entry stays fresh
+            stale_ttl: Extra seconds the entry may be served while revalidating
+            error_ttl: Extra seconds the entry may be served if upstream fails
+
+        Returns:
+            The serialized payload, so callers can hand out copies without
+            encoding the value a second time
+        """
+        payload = encode_value(value)
+        self.set_payload(key, payload, ttl, stale_ttl=stale_ttl, error_ttl=error_ttl)
+        return payload
+
+    def set_payload(
+        self,
+        key: Hashable,
+        payload: bytes,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        error_ttl: float = 0.0
+    ) -> None:
+        """
+        Store already serialized bytes, such as a compressed response body.
+
+        Entries stored this way must be read back with get_entry; get would
+        try to decode them as JSON.
+        """
+        if len(payload) > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        expires_at = time.monotonic() + ttl
+        entry = CacheEntry(payload, expires_at, expires_at + stale_ttl, expires_at + error_ttl)
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -0,0 +1,146 @@
+import hashlib
+import math
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set of strings.
+
+    Membership tests never miss an added item but may report an item that
+    was not added, at roughly error_rate once capacity items are stored.
+    """
+
+    __slots__ = ("size", "hashes", "count", "_bits")
+
+    def __init__(self, capacity: int = 2000, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: Number of items the filter is sized for
+            error_rate: False positive rate at capacity
+        """
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class SeenResultsStore:
+    """
+    Bloom filters of result ids already delivered, one per client session.
+
+    Sessions are identified by an opaque token returned to the client and
+    expire after ttl seconds without use; the least recently used session
+    is dropped when max_sessions is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        ttl: float = 1800,
+        capacity: int = 2000,
+        error_rate: float = 0.01
+    ):
+        """
+        Args:
+            max_sessions: Sessions kept at once
+            ttl: Seconds a session survives without being used
+            capacity: Result ids each session's filter is sized for
+            error_rate: False positive rate of a full filter
+        """
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self._sessions: "OrderedDict[str, Tuple[BloomFilter, float]]" = OrderedDict()
+
+        self.created = 0
+        self.expired = 0
+
+    def session(self, token: Optional[str] = None) -> Tuple[str, BloomFilter]:
+        """
+        Return the filter for a session token, starting a new session if the
+        token is missing, unknown or expired.
+
+        Returns:
+            Tuple of (session token, filter of delivered result ids)
+        """
+        now = time.monotonic()
+        if token is not None:
+            entry = self._sessions.pop(token, None)
+            if entry is not None:
+                seen, expires_at = entry
+                if now < expires_at:
+                    self._sessions[token] = (seen, now + self.ttl)
+                    return token, seen
+                self.expired += 1
+
+        token = secrets.token_urlsafe(16)
+        seen = BloomFilter(self.capacity, self.error_rate)
+        self._sessions[token] = (seen, now + self.ttl)
+        self.created += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return token, seen
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of sessions and their memory use."""
+        return {
+            "sessions": len(self._sessions),
+            "bytes": sum(seen.nbytes for seen, _ in self._sessions.values()),
+            "created": self.created,
+            "expired": self.expired
+        }
+
+
+def drop_seen(
+    results: List[Dict[str, Any]],
+    seen: BloomFilter,
+    exclude: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Remove results whose id is in seen, in exclude, or repeated within results.
+
+    Returns:
+        Tuple of (remaining results, number of results removed)
+    """
+    taken = {item.get("id") for item in exclude or [] if item.get("id")}
+    remaining = []
+    for item in results:
+        item_id = item.get("id")
+        if item_id:
+            if item_id in taken or item_id in seen:
+                continue
+            taken.add(item_id)
+        remaining.append(item)
+    return remaining, len(results) - len(remaining)
+
+
+def mark_seen(results: List[Dict[str, Any]], seen: BloomFilter) -> None:
+    """Add the ids of delivered results to seen."""
+    for item in results:
+        if item.get("id"):
+            seen.add(item["id"])
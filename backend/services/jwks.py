@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+from jose import jwk
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSClient:
+    """
+    Cached signing keys from a JSON Web Key Set endpoint.
+
+    Keys are fetched over the shared aiohttp session and kept as parsed key
+    objects, so verifying a token never rebuilds a key from JSON. A
+    background task refreshes the set refresh_margin seconds before it
+    expires, and an expired set keeps being served while a refresh runs, so
+    callers only ever wait for the first fetch or an unknown kid. Fetches
+    happen at most once every min_refetch_interval seconds, and concurrent
+    fetches are coalesced into one request.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        session: aiohttp.ClientSession,
+        ttl: float = 3600,
+        refresh_margin: float = 300,
+        min_refetch_interval: float = 30,
+        timeout: float = 5,
+        algorithm: str = "RS256"
+    ):
+        """
+        Args:
+            url: JWKS endpoint
+            session: Pooled HTTP session used for fetching
+            ttl: Seconds a fetched key set is used before it is refetched
+            refresh_margin: Seconds before expiry the background task refreshes
+            min_refetch_interval: Minimum seconds between fetches made on
+                behalf of callers
+            timeout: Seconds allowed for one fetch
+            algorithm: Algorithm assumed for keys that do not declare one
+        """
+        self.url = url
+        self.session = session
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self.algorithm = algorithm
+
+        self._keys: Dict[str, Key] = {}
+        self._expires_at = 0.0
+        self._last_fetch: Optional[float] = None
+        self._flight = SingleFlight()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._refreshing: Optional["asyncio.Task[None]"] = None
+
+        self.fetches = 0
+        self.failed_fetches = 0
+        self.unknown_kids = 0
+        self.throttled = 0
+
+    async def fetch(self) -> Dict[str, Key]:
+        """
+        Fetch and parse the key set, sharing one request between concurrent callers.
+
+        Returns:
+            Mapping of key id to parsed key
+
+        Raises:
+            aiohttp.ClientError: If the endpoint cannot be reached or fails
+            ValueError: If the response contains no usable keys
+        """
+        return await self._flight.do("jwks", self._fetch)
+
+    async def _fetch(self) -> Dict[str, Key]:
+        self._last_fetch = time.monotonic()
+        try:
+            if not self.url:
+                raise ValueError("JWKS URL is not configured")
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with self.session.get(self.url, timeout=timeout) as response:
+                response.raise_for_status()
+                jwks = await response.json(content_type=None)
+
+            keys: Dict[str, Key] = {}
+            for key_data in jwks.get("keys", []):
+                kid = key_data.get("kid")
+                if not kid:
+                    continue
+                try:
+                    keys[kid] = jwk.construct(key_data, key_data.get("alg", self.algorithm))
+                except JWKError as e:
+                    logger.warning(f"Skipping unusable JWKS key {kid}: {str(e)}")
+            if not keys:
+                raise ValueError("JWKS contains no usable keys")
+        except Exception:
+            self.failed_fetches += 1
+            raise
+
+        self._keys = keys
+        self._expires_at = time.monotonic() + self.ttl
+        self.fetches += 1
+        return keys
+
+    async def get_key(self, kid: str) -> Optional[Key]:
+        """
+        Return the parsed key for a key id.
+
+        Only the very first fetch is waited for. Once keys are cached, an
+        expired set is still served while a refresh runs in the background.
+        An unknown kid triggers a refetch, and every fetch is throttled to
+        one per min_refetch_interval; callers arriving while a fetch is
+        running join it instead of being throttled.
+
+        Returns:
+            The key, or None if the key set does not contain kid
+
+        Raises:
+            Exception: If no key set has been fetched yet and fetching fails
+        """
+        if not self._keys:
+            if not self._may_fetch():
+                self.throttled += 1
+                raise ValueError("JWKS is unavailable")
+            await self.fetch()
+        elif time.monotonic() >= self._expires_at and self._may_fetch():
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        self.unknown_kids += 1
+        if not self._may_fetch():
+            self.throttled += 1
+            return None
+        await self.fetch()
+        return self._keys.get(kid)
+
+    def _may_fetch(self) -> bool:
+        # Joining a fetch that is already running sends no extra request,
+        # so only new fetches are throttled.
+        if self._flight.running("jwks") is not None:
+            return True
+        return self._last_fetch is None or time.monotonic() - self._last_fetch >= self.min_refetch_interval
+
+    def _refresh_in_background(self) -> None:
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            await self.fetch()
+        except Exception as e:
+            logger.warning(f"JWKS refresh failed, using cached keys: {str(e)}")
+
+    async def run(self) -> None:
+        """Keep the key set fresh, refreshing shortly before it expires."""
+        while True:
+            if self._keys:
+                delay = self._expires_at - self.refresh_margin - time.monotonic()
+                await asyncio.sleep(max(delay, self.min_refetch_interval))
+            try:
+                await self.fetch()
+            except Exception as e:
+                logger.error(f"JWKS refresh failed: {str(e)}")
+                await asyncio.sleep(self.min_refetch_interval)
+
+    def start(self) -> None:
+        """Start the background refresher if it is not already running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the background refresher and any refresh in progress."""
+        for task in (self._task, self._refreshing):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._refreshing = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of cached keys and fetch counters."""
+        return {
+            "keys": len(self._keys),
+            "expires_in": round(max(self._expires_at - time.monotonic(), 0.0), 1),
+            "fetches": self.fetches,
+            "failed_fetches": self.failed_fetches,
+            "unknown_kids": self.unknown_kids,
+            "throttled": self.throttled,
+            "coalesced": self._flight.coalesced
+        }
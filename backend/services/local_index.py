@@ -0,0 +1,513 @@
+import asyncio
+import heapq
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+
+from services.media_models import MediaCard
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Openverse reports singular media types on results ("image") while search
+# parameters use the endpoint name ("images"); the index stores the former.
+MEDIA_TYPE_NAMES = {"images": "image", "image": "image", "audio": "audio"}
+
+SNAPSHOT_MAGIC = b"OLMIDX01"
+SNAPSHOT_HEADER = struct.Struct("<8sI6Q")
+POSTING = struct.Struct("<IH")
+DOC_OFFSET = struct.Struct("<Q")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into casefolded, NFKC-normalized word tokens."""
+    return TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+def normalize_media_type(media_type: Optional[str]) -> Optional[str]:
+    if media_type is None:
+        return None
+    return MEDIA_TYPE_NAMES.get(media_type.strip().lower(), media_type.strip().lower())
+
+
+class _Snapshot:
+    """
+    Read-only index segment memory-mapped from a snapshot file.
+
+    Layout: a fixed header, a JSON metadata block (ids, lengths, media
+    types, licenses), a JSON term dictionary mapping each term to its
+    postings offset and document frequency, a table of document offsets
+    followed by the JSON-encoded documents, and the packed postings
+    (uint32 document number, uint16 term frequency). Only the metadata and
+    term dictionary are decoded at open; postings and documents are read
+    from the mapping on demand.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        (magic, self.doc_count, meta_offset, meta_length, terms_offset, terms_length,
+         self._docs_offset, self._postings_offset) = SNAPSHOT_HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a local index snapshot")
+
+        meta = orjson.loads(self._map[meta_offset:meta_offset + meta_length])
+        self.ids: List[str] = meta["ids"]
+        self.lengths: List[int] = meta["lengths"]
+        self.media_types: List[Optional[str]] = meta["media_types"]
+        self.licenses: List[Optional[str]] = meta["licenses"]
+        self.terms: Dict[str, List[int]] = orjson.loads(self._map[terms_offset:terms_offset + terms_length])
+
+    def postings(self, term: str) -> Iterator[Tuple[int, int]]:
+        entry = self.terms.get(term)
+        if entry is None:
+            return iter(())
+        offset, count = entry
+        start = self._postings_offset + offset * POSTING.size
+        return POSTING.iter_unpack(self._map[start:start + count * POSTING.size])
+
+    def document(self, doc: int) -> Dict[str, Any]:
+        table = self._docs_offset
+        start, = DOC_OFFSET.unpack_from(self._map, table + doc * DOC_OFFSET.size)
+        end, = DOC_OFFSET.unpack_from(self._map, table + (doc + 1) * DOC_OFFSET.size)
+        return orjson.loads(self._map[start:end])
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+@dataclass(frozen=True)
+class _SaveState:
+    """Copy of the live index taken on the event loop for a background save."""
+
+    ids: List[Tuple[str, int]]
+    lengths: Dict[int, int]
+    media_types: Dict[int, Optional[str]]
+    licenses: Dict[int, Optional[str]]
+    documents: Dict[int, Dict[str, Any]]
+    doc_terms: Dict[int, Tuple[Tuple[str, int], ...]]
+    snapshot: Optional[_Snapshot]
+
+
+class LocalMediaIndex:
+    """
+    Embedded BM25 index over media metadata seen by the service.
+
+    Search responses and bookmarks are added incrementally to an in-memory
+    segment. At startup a previously saved snapshot is memory-mapped as a
+    read-only base segment; documents re-added after that shadow their
+    snapshot copy. save() merges both segments into a new snapshot.
+
+    Removing an in-memory document drops its postings right away; only
+    snapshot documents, whose postings are read-only, are tracked as
+    deleted, so memory stays bounded by max_documents.
+
+    The index answers searches locally when Openverse cannot, so results
+    only cover media the service has already seen.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_documents: int = 100_000,
+        save_interval: float = 300,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        """
+        Args:
+            path: Snapshot file, or None to keep the index in memory only
+            max_documents: Documents kept before the oldest are dropped
+            save_interval: Seconds between background snapshots
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.path = path
+        self.max_documents = max_documents
+        self.save_interval = save_interval
+        self.k1 = k1
+        self.b = b
+
+        self._snapshot: Optional[_Snapshot] = None
+        self._base_count = 0
+        # id -> document number, oldest first
+        self._ids: "OrderedDict[str, int]" = OrderedDict()
+        # Snapshot documents that were removed or re-added since loading
+        self._deleted: set = set()
+        # In-memory document -> its (term, frequency) pairs, used to drop its
+        # postings on removal and to rebuild postings off the event loop
+        self._doc_terms: Dict[int, Tuple[Tuple[str, int], ...]] = {}
+        self._next_doc = 0
+        self._lengths: Dict[int, int] = {}
+        self._media_types: Dict[int, Optional[str]] = {}
+        self._licenses: Dict[int, Optional[str]] = {}
+        self._documents: Dict[int, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._total_length = 0
+
+        self._dirty = False
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._saving: Optional["asyncio.Future[None]"] = None
+
+        self.searches = 0
+        self.saves = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, item: Dict[str, Any], media_type: Optional[str] = None) -> None:
+        """
+        Index or re-index one media item.
+
+        Args:
+            item: Openverse result dict; only its card fields are stored
+            media_type: Media type to record when the item does not carry one
+        """
+        item_id = item.get("id")
+        if not item_id:
+            return
+
+        card = MediaCard.from_result(item).to_dict()
+        card["media_type"] = normalize_media_type(item.get("media_type") or media_type)
+
+        tag_names = [
+            tag.get("name") if isinstance(tag, dict) else tag
+            for tag in item.get("tags") or []
+        ]
+        text = " ".join(value for value in (item.get("title"), item.get("creator"), *tag_names) if value)
+        frequencies: Dict[str, int] = defaultdict(int)
+        for token in tokenize(text):
+            frequencies[token] += 1
+
+        self._remove(item_id)
+
+        doc = self._next_doc
+        self._next_doc += 1
+        self._ids[item_id] = doc
+        self._documents[doc] = card
+        self._lengths[doc] = sum(frequencies.values())
+        self._media_types[doc] = card["media_type"]
+        self._licenses[doc] = card.get("license")
+        self._total_length += self._lengths[doc]
+        self._doc_terms[doc] = tuple((token, min(count, 0xFFFF)) for token, count in frequencies.items())
+        for token, count in self._doc_terms[doc]:
+            self._postings[token][doc] = count
+
+        while len(self._ids) > self.max_documents:
+            self._remove(next(iter(self._ids)))
+
+        self._dirty = True
+
+    def add_many(self, items: Iterable[Dict[str, Any]], media_type: Optional[str] = None) -> None:
+        """Index every item of a search response."""
+        for item in items:
+            self.add(item, media_type)
+
+    def add_bookmark(self, bookmark: Dict[str, Any]) -> None:
+        """
+        Index a document from the bookmarks collection.
+
+        Items already indexed from a search response are left alone, since
+        bookmarks carry less metadata.
+        """
+        if bookmark.get("media_id") in self._ids:
+            return
+        self.add({
+            "id": bookmark.get("media_id"),
+            "title": bookmark.get("media_title"),
+            "creator": bookmark.get("media_creator"),
+            "license": bookmark.get("media_license"),
+            "url": bookmark.get("media_url")
+        }, bookmark.get("media_type"))
+
+    def _remove(self, item_id: str) -> None:
+        doc = self._ids.pop(item_id, None)
+        if doc is None:
+            return
+        self._total_length -= self._lengths.pop(doc)
+        self._media_types.pop(doc)
+        self._licenses.pop(doc)
+        self._documents.pop(doc, None)
+
+        terms = self._doc_terms.pop(doc, None)
+        if terms is None:
+            self._deleted.add(doc)
+            return
+        for term, _ in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _iter_postings(self, term: str) -> Iterator[Tuple[int, int]]:
+        if self._snapshot is not None:
+            yield from self._snapshot.postings(term)
+        yield from self._postings.get(term, {}).items()
+
+    def _document(self, doc: int) -> Dict[str, Any]:
+        if doc < self._base_count:
+            return self._snapshot.document(doc)
+        return self._documents[doc]
+
+    def search(
+        self,
+        query: str,
+        media_types: Optional[List[str]] = None,
+        license_type: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Rank indexed media against a query with BM25.
+
+        Args:
+            query: Search term
+            media_types: Only return these media types
+            license_type: Only return this license
+            page: Page number for pagination
+            page_size: Number of results per page
+
+        Returns:
+            Dict in the shape of an Openverse search response
+        """
+        self.searches += 1
+        wanted_types = {normalize_media_type(value) for value in media_types} if media_types else None
+        document_count = len(self._ids)
+        average_length = self._total_length / document_count if document_count else 0.0
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = [(doc, tf) for doc, tf in self._iter_postings(term) if doc not in self._deleted]
+            if not postings:
+                continue
+            idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings:
+                if wanted_types is not None and self._media_types[doc] not in wanted_types:
+                    continue
+                if license_type and self._licenses[doc] != license_type:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc] / (average_length or 1))
+                scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = heapq.nlargest(page * page_size, scores.items(), key=lambda entry: entry[1])
+        results = [self._document(doc) for doc, _ in ranked[(page - 1) * page_size:]]
+
+        return {
+            "result_count": len(scores),
+            "page_count": math.ceil(len(scores) / page_size),
+            "page_size": page_size,
+            "page": page,
+            "results": results
+        }
+
+    def load(self) -> None:
+        """
+        Memory-map the snapshot at path as the base segment, if one exists.
+
+        Must be called before anything is added to the index.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        if self._next_doc:
+            raise RuntimeError("A snapshot can only be loaded into an empty index")
+
+        self._snapshot = _Snapshot(self.path)
+        snapshot = self._snapshot
+        self._base_count = snapshot.doc_count
+        self._next_doc = snapshot.doc_count
+        for doc, item_id in enumerate(snapshot.ids):
+            self._ids[item_id] = doc
+            self._lengths[doc] = snapshot.lengths[doc]
+            self._media_types[doc] = snapshot.media_types[doc]
+            self._licenses[doc] = snapshot.licenses[doc]
+            self._total_length += snapshot.lengths[doc]
+
+        logger.info(f"Loaded local index snapshot with {snapshot.doc_count} documents from {self.path}")
+
+    def save(self) -> None:
+        """
+        Write all live documents to a new snapshot at path.
+
+        The file is written next to the target and renamed into place, so a
+        crash never leaves a partial snapshot behind. The running index keeps
+        its current segments.
+        """
+        if not self.path:
+            return
+        state = self._capture()
+        self._write(state)
+        self._dirty = False
+        self.saves += 1
+
+    async def save_async(self) -> None:
+        """
+        Like save(), but only copies the live state on the event loop.
+
+        Merging postings, encoding documents and writing the file happen in
+        a worker thread. Concurrent calls share one save.
+        """
+        if not self.path:
+            return
+        if self._saving is None or self._saving.done():
+            self._saving = asyncio.ensure_future(self._save_in_thread())
+        await asyncio.shield(self._saving)
+
+    async def _save_in_thread(self) -> None:
+        state = self._capture()
+        # Documents added while the file is written mark the index dirty again.
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, state)
+        except Exception:
+            self._dirty = True
+            raise
+        self.saves += 1
+
+    def _capture(self) -> _SaveState:
+        # Only C-level container copies here; everything per-document
+        # happens in _write on the worker thread.
+        return _SaveState(
+            ids=list(self._ids.items()),
+            lengths=dict(self._lengths),
+            media_types=dict(self._media_types),
+            licenses=dict(self._licenses),
+            documents=dict(self._documents),
+            doc_terms=dict(self._doc_terms),
+            snapshot=self._snapshot
+        )
+
+    def _write(self, state: _SaveState) -> None:
+        docs = [doc for _, doc in state.ids]
+        renumbered = {doc: number for number, doc in enumerate(docs)}
+        snapshot = state.snapshot
+
+        term_postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        if snapshot is not None:
+            for term in snapshot.terms:
+                term_postings[term].extend(
+                    (renumbered[doc], tf) for doc, tf in snapshot.postings(term) if doc in renumbered
+                )
+        for doc, doc_terms in state.doc_terms.items():
+            if doc in renumbered:
+                for term, tf in doc_terms:
+                    term_postings[term].append((renumbered[doc], tf))
+
+        postings_blob = bytearray()
+        terms: Dict[str, List[int]] = {}
+        for term, entries in term_postings.items():
+            if not entries:
+                continue
+            entries.sort()
+            terms[term] = [len(postings_blob) // POSTING.size, len(entries)]
+            for entry in entries:
+                postings_blob += POSTING.pack(*entry)
+
+        meta = orjson.dumps({
+            "ids": [item_id for item_id, _ in state.ids],
+            "lengths": [state.lengths[doc] for doc in docs],
+            "media_types": [state.media_types[doc] for doc in docs],
+            "licenses": [state.licenses[doc] for doc in docs]
+        })
+        terms_blob = orjson.dumps(terms)
+        documents = [
+            orjson.dumps(snapshot.document(doc) if doc not in state.documents else state.documents[doc])
+            for doc in docs
+        ]
+
+        meta_offset = SNAPSHOT_HEADER.size
+        terms_offset = meta_offset + len(meta)
+        docs_offset = terms_offset + len(terms_blob)
+        table_size = (len(documents) + 1) * DOC_OFFSET.size
+        offsets = [docs_offset + table_size]
+        for document in documents:
+            offsets.append(offsets[-1] + len(document))
+        postings_offset = offsets[-1]
+
+        temporary_path = f"{self.path}.tmp"
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(temporary_path, "wb") as handle:
+            handle.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, len(docs), meta_offset, len(meta), terms_offset, len(terms_blob),
+                docs_offset, postings_offset
+            ))
+            handle.write(meta)
+            handle.write(terms_blob)
+            handle.write(b"".join(DOC_OFFSET.pack(offset) for offset in offsets))
+            handle.write(b"".join(documents))
+            handle.write(postings_blob)
+        os.replace(temporary_path, self.path)
+
+    async def run(self) -> None:
+        """Save a snapshot every save_interval seconds while the index changes."""
+        while True:
+            await asyncio.sleep(self.save_interval)
+            if self._dirty:
+                try:
+                    started = time.monotonic()
+                    await self.save_async()
+                    logger.info(f"Saved local index snapshot in {time.monotonic() - started:.3f}s")
+                except Exception as e:
+                    logger.error(f"Local index snapshot failed: {str(e)}")
+
+    def start(self) -> None:
+        """Start periodic snapshots if the index is persisted."""
+        if self.path and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """Stop periodic snapshots and write a final one."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._saving is not None and not self._saving.done():
+            try:
+                await self._saving
+            except Exception:
+                pass
+        if self._dirty:
+            try:
+                await self.save_async()
+            except Exception as e:
+                logger.error(f"Local index snapshot failed: {str(e)}")
+
+    def close(self) -> None:
+        """Unmap the snapshot segment."""
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return document counts and usage counters."""
+        return {
+            "documents": len(self._ids),
+            "snapshot_documents": self._base_count,
+            "terms": len(self._postings) + (len(self._snapshot.terms) if self._snapshot else 0),
+            "searches": self.searches,
+            "saves": self.saves,
+            "dirty": self._dirty
+        }
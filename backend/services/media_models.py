@@ -0,0 +1,130 @@
+from dataclasses import dataclass, fields as dataclass_fields
+from typing import Any, Dict, List, Optional, Tuple
+
+CARD_TAG_LIMIT = 3
+
+
+@dataclass(slots=True)
+class MediaCard:
+    """
+    Compact shape of a search result, holding only what a result grid renders.
+
+    Built from a full Openverse result; None fields are left out of the
+    serialized dict so clients fall back to their own defaults.
+    """
+
+    id: str
+    title: Optional[str] = None
+    thumbnail: Optional[str] = None
+    url: Optional[str] = None
+    creator: Optional[str] = None
+    license: Optional[str] = None
+    license_version: Optional[str] = None
+    license_url: Optional[str] = None
+    provider: Optional[str] = None
+    foreign_landing_url: Optional[str] = None
+    detail_url: Optional[str] = None
+    filetype: Optional[str] = None
+    duration: Optional[int] = None
+    filesize: Optional[int] = None
+    waveform: Optional[str] = None
+    audio_set: Optional[Dict[str, Any]] = None
+    related_url: Optional[str] = None
+    media_type: Optional[str] = None
+    tags: Optional[List[str]] = None
+
+    @classmethod
+    def from_result(cls, item: Dict[str, Any]) -> "MediaCard":
+        """Build a card from a full Openverse result dict."""
+        tags = item.get("tags")
+        if tags:
+            tags = [
+                tag.get("name") if isinstance(tag, dict) else tag
+                for tag in tags[:CARD_TAG_LIMIT]
+            ]
+
+        return cls(
+            id=item.get("id"),
+            title=item.get("title"),
+            thumbnail=item.get("thumbnail"),
+            url=item.get("url"),
+            creator=item.get("creator"),
+            license=item.get("license"),
+            license_version=item.get("license_version"),
+            license_url=item.get("license_url"),
+            provider=item.get("provider"),
+            foreign_landing_url=item.get("foreign_landing_url"),
+            detail_url=item.get("detail_url"),
+            filetype=item.get("filetype"),
+            duration=item.get("duration"),
+            filesize=item.get("filesize"),
+            waveform=item.get("waveform"),
+            audio_set=item.get("audio_set"),
+            related_url=item.get("related_url"),
+            media_type=item.get("media_type"),
+            tags=tags or None
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the card, leaving out empty fields."""
+        return {
+            name: value
+            for name in CARD_FIELDS
+            if (value := getattr(self, name)) is not None
+        }
+
+
+CARD_FIELDS: Tuple[str, ...] = tuple(field.name for field in dataclass_fields(MediaCard))
+
+FIELDS_CARD = "card"
+FIELDS_FULL = "full"
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a fields= parameter.
+
+    Returns:
+        CARD_FIELDS for "card" (the default), None for "full", or the
+        requested field names for a comma-separated list; the id is always
+        included.
+
+    Raises:
+        ValueError: If the parameter contains no field names
+    """
+    if fields is None or fields == FIELDS_CARD:
+        return CARD_FIELDS
+    if fields == FIELDS_FULL:
+        return None
+
+    names = []
+    for name in fields.split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    if not names:
+        raise ValueError(f"Invalid fields. Use '{FIELDS_CARD}', '{FIELDS_FULL}' or a comma-separated list of field names")
+    if "id" not in names:
+        names.insert(0, "id")
+    return tuple(names)
+
+
+def project_results(results: List[Dict[str, Any]], fields: Optional[Tuple[str, ...]]) -> List[Dict[str, Any]]:
+    """
+    Reduce each result to the requested fields.
+
+    Args:
+        results: Full Openverse result dicts
+        fields: Output of parse_fields
+
+    Returns:
+        Projected result dicts; the input list itself when fields is None
+    """
+    if fields is None:
+        return results
+    if fields is CARD_FIELDS:
+        return [MediaCard.from_result(item).to_dict() for item in results]
+    return [
+        {name: item[name] for name in fields if name in item}
+        for item in results
+    ]
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Optional
+
+from services.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class PopularMediaPool:
+    """
+    Precomputed pool of popular media per media type.
+
+    A background task periodically runs the seed searches for every media
+    type and replaces each pool wholesale, so reads are a plain in-memory
+    sample that never waits on Openverse. Seed searches share the Openverse
+    rate limiter with user searches, so they only start while at least
+    reserved_tokens are left, and a refresh with failed pages is retried
+    after retry_interval instead of waiting a full refresh_interval.
+    """
+
+    def __init__(
+        self,
+        search_service: Any,
+        seed_terms: List[str],
+        media_types: List[str],
+        pages: int = 3,
+        page_size: int = 50,
+        refresh_interval: float = 900,
+        concurrency: int = 4,
+        rate_limiter: Optional[TokenBucket] = None,
+        reserved_tokens: float = 0.0,
+        retry_interval: float = 60
+    ):
+        """
+        Args:
+            search_service: Service providing search_media
+            seed_terms: Search terms whose results make up the pool
+            media_types: Media types to keep a pool for
+            pages: Number of result pages fetched per seed term
+            page_size: Results per fetched page
+            refresh_interval: Seconds between refreshes
+            concurrency: Maximum concurrent searches during a refresh
+            rate_limiter: Upstream rate limiter shared with user searches
+            reserved_tokens: Tokens left for user searches; seed searches
+                wait while fewer are available
+            retry_interval: Seconds before a refresh with failed pages is retried
+        """
+        self.search_service = search_service
+        self.seed_terms = seed_terms
+        self.media_types = media_types
+        self.pages = pages
+        self.page_size = page_size
+        self.refresh_interval = refresh_interval
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.reserved_tokens = reserved_tokens
+        self.retry_interval = retry_interval
+
+        self._pools: Dict[str, List[Dict[str, Any]]] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+
+        self.refreshes = 0
+        self.failed_fetches = 0
+        self.paced = 0
+
+    def sample(self, media_type: str, limit: int, seed: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return up to limit random items for a media type.
+
+        Args:
+            media_type: Media type to sample
+            limit: Maximum number of items
+            seed: Makes the sample repeatable; the same seed returns the same
+                items until the next refresh
+
+        Returns:
+            List of media items, or None if the pool has not been filled yet
+        """
+        pool = self._pools.get(media_type)
+        if not pool:
+            return None
+        chooser = random if seed is None else random.Random(f"{self.refreshes}:{seed}")
+        return chooser.sample(pool, min(limit, len(pool)))
+
+    async def refresh(self) -> int:
+        """
+        Rebuild the pool for every media type from the seed searches.
+
+        Returns:
+            Number of seed pages that could not be fetched
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        failed = 0
+
+        async def fetch(media_type: str, term: str, page: int) -> List[Dict[str, Any]]:
+            nonlocal failed
+            async with semaphore:
+                await self._wait_for_tokens()
+                try:
+                    result = await self.search_service.search_media(
+                        query=term,
+                        media_type=media_type,
+                        page=page,
+                        page_size=self.page_size
+                    )
+                    return result.get("results", [])
+                except Exception as e:
+                    self.failed_fetches += 1
+                    failed += 1
+                    logger.warning(f"Popular media fetch failed for {media_type}/{term}/{page}: {str(e)}")
+                    return []
+
+        for media_type in self.media_types:
+            pages = await asyncio.gather(*(
+                fetch(media_type, term, page)
+                for term in self.seed_terms
+                for page in range(1, self.pages + 1)
+            ))
+
+            pool: List[Dict[str, Any]] = []
+            seen = set()
+            for results in pages:
+                for item in results:
+                    item_id = item.get("id")
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                    pool.append(item)
+
+            if pool:
+                self._pools[media_type] = pool
+
+        self.refreshes += 1
+        return failed
+
+    async def _wait_for_tokens(self) -> None:
+        if self.rate_limiter is None:
+            return
+        if await self.rate_limiter.wait_for_spare(self.reserved_tokens):
+            self.paced += 1
+
+    async def run(self) -> None:
+        """
+        Refresh the pool forever, waiting refresh_interval between rounds, or
+        retry_interval after a round in which some seed pages failed.
+        """
+        while True:
+            failed = 1
+            try:
+                failed = await self.refresh()
+            except Exception as e:
+                logger.error(f"Popular media refresh failed: {str(e)}")
+            await asyncio.sleep(self.retry_interval if failed else self.refresh_interval)
+
+    def start(self) -> None:
+        """Start the background warmer if it is not already running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the background warmer."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool sizes and refresh counters."""
+        return {
+            "sizes": {media_type: len(pool) for media_type, pool in self._pools.items()},
+            "refreshes": self.refreshes,
+            "failed_fetches": self.failed_fetches,
+            "paced": self.paced,
+            "running": self._task is not None and not self._task.done()
+        }
@@ -0,0 +1,144 @@
+import hashlib
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import orjson
+
+DEFAULT_MEDIA_TYPE = "images"
+DEFAULT_PAGE = 1
+DEFAULT_PAGE_SIZE = 20
+
+
+def normalize_text(value: Optional[str], casefold: bool = True) -> Optional[str]:
+    """
+    Normalize a free-text parameter.
+
+    Applies Unicode NFKC, collapses runs of whitespace and optionally
+    casefolds.
+
+    Returns:
+        The normalized text, or None if nothing but whitespace remains
+    """
+    if value is None:
+        return None
+    value = " ".join(unicodedata.normalize("NFKC", value).split())
+    if casefold:
+        value = value.casefold()
+    return value or None
+
+
+def normalize_list(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize a comma-separated parameter into a sorted, de-duplicated list.
+
+    Returns:
+        The normalized entries joined by commas, or None if there are none
+    """
+    if value is None:
+        return None
+    items = {item for item in (normalize_text(part) for part in value.split(",")) if item}
+    return ",".join(sorted(items)) or None
+
+
+@dataclass(frozen=True, slots=True)
+class CanonicalSearch:
+    """
+    Canonical identity of a search request.
+
+    Two requests that differ only in case, whitespace, Unicode form, tag or
+    media type order, or in spelling out default values canonicalize to
+    equal instances with the same keys. query keeps the user's casing and
+    is what gets searched, shown and saved to history; only folded_query,
+    its casefolded form, takes part in equality and the keys.
+    """
+
+    query: str = field(compare=False)
+    media_type: str = DEFAULT_MEDIA_TYPE
+    page: int = DEFAULT_PAGE
+    page_size: int = DEFAULT_PAGE_SIZE
+    license_type: Optional[str] = None
+    creator: Optional[str] = None
+    tags: Optional[str] = None
+    source: Optional[str] = None
+    folded_query: str = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "folded_query", self.query.casefold())
+
+    def filters(self) -> Dict[str, Any]:
+        """Return the search parameters other than the query and pagination."""
+        return {
+            "media_type": self.media_type,
+            "license_type": self.license_type,
+            "creator": self.creator,
+            "tags": self.tags,
+            "source": self.source
+        }
+
+    def params(self) -> Dict[str, Any]:
+        """Return every search parameter other than the query."""
+        return {
+            **self.filters(),
+            "page": self.page,
+            "page_size": self.page_size
+        }
+
+    @property
+    def search_key(self) -> str:
+        """Stable hash of the query and filters, shared by every page of the search."""
+        return _digest({"query": self.folded_query, **self.filters()})
+
+    @property
+    def key(self) -> str:
+        """Stable hash identifying this exact page of the search."""
+        return _digest({"query": self.folded_query, **self.params()})
+
+
+def _digest(fields: Dict[str, Any]) -> str:
+    encoded = orjson.dumps(fields, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def canonicalize_search(
+    query: str,
+    media_type: Optional[str] = None,
+    page: Optional[int] = None,
+    page_size: Optional[int] = None,
+    license_type: Optional[str] = None,
+    creator: Optional[str] = None,
+    tags: Optional[str] = None,
+    source: Optional[str] = None
+) -> CanonicalSearch:
+    """
+    Canonicalize the parameters of a search.
+
+    The license, tags and source are casefolded. The query keeps its case
+    for searching and display and is only casefolded for the keys; the
+    creator keeps its case since it names a person or account. Tags and comma-separated
+    media types are sorted and de-duplicated, and missing values take the
+    search defaults.
+
+    Args:
+        query: Search term
+        media_type: Type of media (images, audio, a comma-separated list, or all)
+        page: Page number
+        page_size: Number of results per page
+        license_type: License filter
+        creator: Creator filter
+        tags: Comma-separated tag filter
+        source: Source filter
+
+    Returns:
+        CanonicalSearch for the request
+    """
+    return CanonicalSearch(
+        query=normalize_text(query, casefold=False) or "",
+        media_type=normalize_list(media_type) or DEFAULT_MEDIA_TYPE,
+        page=page or DEFAULT_PAGE,
+        page_size=page_size or DEFAULT_PAGE_SIZE,
+        license_type=normalize_text(license_type),
+        creator=normalize_text(creator, casefold=False),
+        tags=normalize_list(tags),
+        source=normalize_text(source)
+    )
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all calls made with one upstream API key.
+
+    Tokens refill at the sustained rate up to the burst size. Callers wait
+    a bounded time for a token rather than queueing indefinitely, so a
+    request that cannot be sent in time can be answered from cache instead.
+    When upstream throttles anyway, pause() empties the bucket and stops
+    refilling until the Retry-After period has passed.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Sustained tokens added per second
+            burst: Maximum tokens the bucket holds
+        """
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = float(burst)
+        # Time up to which tokens have been accounted for; set in the future
+        # while paused so no tokens accrue before the pause ends.
+        self._updated = time.monotonic()
+
+        self.granted = 0
+        self.waited = 0
+        self.rejected = 0
+        self.pauses = 0
+        self.deferred = 0
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def _time_until_token(self, now: float) -> float:
+        return max(0.0, self._updated - now) + max(0.0, 1 - self._tokens) / self.rate
+
+    def available(self) -> float:
+        """Return the number of tokens that could be taken right now."""
+        now = time.monotonic()
+        self._refill(now)
+        return self._tokens if now >= self._updated else 0.0
+
+    async def acquire(self, max_wait: float = 0.0) -> bool:
+        """
+        Take a token, waiting up to max_wait seconds for one.
+
+        Returns:
+            True if a token was taken, False if none became available in time
+        """
+        give_up_at = time.monotonic() + max_wait
+        waited = False
+
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1 and now >= self._updated:
+                self._tokens -= 1
+                self.granted += 1
+                self.waited += waited
+                return True
+
+            wait = self._time_until_token(now)
+            if now + wait > give_up_at:
+                self.rejected += 1
+                return False
+            waited = True
+            await asyncio.sleep(wait)
+
+    async def wait_for_spare(self, reserved: float) -> bool:
+        """
+        Wait until a token can be taken while leaving reserved tokens behind.
+
+        Used by background work sharing the bucket with interactive calls,
+        so it runs on spare capacity instead of draining the burst. The
+        reserve is capped so that a full bucket always has a spare token.
+
+        Returns:
+            True if the caller had to wait
+        """
+        needed = min(reserved + 1, self.burst)
+        if self.available() >= needed:
+            return False
+        self.deferred += 1
+        while self.available() < needed:
+            await asyncio.sleep(1 / self.rate)
+        return True
+
+    def pause(self, seconds: float) -> None:
+        """Empty the bucket and stop refilling it for the given number of seconds."""
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = min(self._tokens, 0.0)
+        self._updated = max(self._updated, now + seconds)
+        self.pauses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current fill level and counters."""
+        now = time.monotonic()
+        return {
+            "tokens": round(self.available(), 2),
+            "paused_for": round(max(0.0, self._updated - now), 2),
+            "granted": self.granted,
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "pauses": self.pauses,
+            "deferred": self.deferred
+        }
@@ -0,0 +1,265 @@
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised when a call to Openverse is rejected to protect the service."""
+
+
+class UpstreamError(Exception):
+    """
+    Raised when an Openverse call fails.
+
+    Attributes:
+        status: HTTP status returned by Openverse, or None if no response arrived
+        retryable: Whether repeating the idempotent request may succeed
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class Deadline:
+    """
+    Absolute point in time by which a request must be answered.
+
+    Created once per incoming request and passed down to every upstream
+    call made on its behalf, so retries never outlive the caller.
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, budget: float):
+        """
+        Args:
+            budget: Seconds from now until the deadline
+        """
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies with a cached percentile."""
+
+    def __init__(self, window_size: int = 256, min_samples: int = 20, recompute_every: int = 16):
+        """
+        Args:
+            window_size: Number of recent latencies kept
+            min_samples: Samples required before a percentile is reported
+            recompute_every: Number of new samples between percentile recomputations
+        """
+        self.min_samples = min_samples
+        self.recompute_every = recompute_every
+
+        self._samples: Deque[float] = deque(maxlen=window_size)
+        self._since_recompute = 0
+        self._p95: Optional[float] = None
+
+    def record(self, latency: float) -> None:
+        """Add a latency sample in seconds."""
+        self._samples.append(latency)
+        self._since_recompute += 1
+
+    def p95(self) -> Optional[float]:
+        """Return the 95th percentile latency, or None until enough samples exist."""
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._p95 is None or self._since_recompute >= self.recompute_every:
+            ordered = sorted(self._samples)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self._since_recompute = 0
+        return self._p95
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a rolling window of upstream call outcomes.
+
+    - closed: calls flow; the breaker opens once the failure rate or the
+      slow-call rate over the window crosses its threshold.
+    - open: calls are rejected immediately until open_duration has passed.
+    - half_open: a few probe calls are let through; if they all succeed the
+      breaker closes, and any failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: float = 3.0,
+        slow_call_rate_threshold: float = 0.8,
+        window_size: int = 50,
+        minimum_calls: int = 10,
+        open_duration: float = 30.0,
+        half_open_max_calls: int = 3
+    ):
+        """
+        Args:
+            failure_rate_threshold: Share of failed calls that opens the breaker
+            slow_call_threshold: Seconds after which a call counts as slow
+            slow_call_rate_threshold: Share of slow calls that opens the breaker
+            window_size: Number of recent calls considered
+            minimum_calls: Calls required in the window before rates are evaluated
+            open_duration: Seconds the breaker stays open before probing
+            half_open_max_calls: Successful probes needed to close again
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return whether a call may be made now, reserving a probe slot if half-open."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+            self._probes_in_flight += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record(self, success: bool, latency: float) -> None:
+        """Record the outcome of a call that allow_request let through."""
+        slow = latency >= self.slow_call_threshold
+
+        if self._state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if not success:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_max_calls:
+                self._state = self.CLOSED
+                self._window.clear()
+            return
+
+        if self._state == self.OPEN:
+            return
+
+        self._window.append((not success, slow))
+        if len(self._window) < self.minimum_calls:
+            return
+
+        failures = sum(1 for failed, _ in self._window if failed)
+        slow_calls = sum(1 for _, was_slow in self._window if was_slow)
+        if (failures / len(self._window) >= self.failure_rate_threshold
+                or slow_calls / len(self._window) >= self.slow_call_rate_threshold):
+            self._open()
+
+    def cancel(self) -> None:
+        """Release a probe slot for a call that was abandoned without an outcome."""
+        if self._state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
+        self.times_opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current state and counters."""
+        failures = sum(1 for failed, _ in self._window if failed)
+        return {
+            "state": self.state,
+            "window_calls": len(self._window),
+            "window_failures": failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on concurrent upstream calls.
+
+    The limit grows by roughly one per limit-many healthy calls that finish
+    under the latency target, and is cut multiplicatively on failures or
+    slow calls. Calls over the limit are rejected instead of queued.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        latency_target: float = 1.5,
+        backoff_ratio: float = 0.7
+    ):
+        """
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest limit the backoff can reach
+            max_limit: Highest limit the additive increase can reach
+            latency_target: Seconds above which a call counts as congestion
+            backoff_ratio: Factor applied to the limit on congestion
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free, without waiting."""
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, success: bool, latency: float) -> None:
+        """Return a slot and adjust the limit from the call's outcome."""
+        self.in_flight = max(0, self.in_flight - 1)
+        if success and latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        else:
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+
+    def cancel(self) -> None:
+        """Return a slot without feeding back an outcome."""
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit and usage."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "rejected": self.rejected
+        }
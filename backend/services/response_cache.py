@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from services.cache import TTLCache
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CACHE_FRESH = "fresh"
+CACHE_STALE = "stale"
+CACHE_REVALIDATED = "revalidated"
+CACHE_MISS = "miss"
+# Set by callers whose loader was answered by a background prefetch
+CACHE_PREFETCHED = "prefetched"
+
+# Status of the most recent cached lookup made by the current request, read by
+# routes to set the X-Cache-Status response header.
+cache_status: ContextVar[Optional[str]] = ContextVar("cache_status", default=None)
+
+
+class ResponseCache:
+    """
+    Stale-while-revalidate front for upstream responses.
+
+    - Fresh entries are served directly.
+    - Within the stale window after expiry the entry is served immediately
+      and a single background refresh is started.
+    - Past the stale window the request waits for upstream; if upstream
+      fails and the entry is still within its stale-if-error window, the
+      stale entry is served instead of the error.
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        inflight: SingleFlight,
+        stale_ttl: float = 0.0,
+        error_ttl: float = 0.0
+    ):
+        """
+        Args:
+            cache: Storage for serialized responses
+            inflight: Coalesces concurrent loads of the same key
+            stale_ttl: Seconds after expiry a stale entry is served while revalidating
+            error_ttl: Seconds after expiry a stale entry is served if upstream fails
+        """
+        self.cache = cache
+        self.inflight = inflight
+        self.stale_ttl = stale_ttl
+        self.error_ttl = error_ttl
+
+        self._refreshes: Set["asyncio.Task[Any]"] = set()
+
+        self.counts = {
+            CACHE_FRESH: 0,
+            CACHE_STALE: 0,
+            CACHE_REVALIDATED: 0,
+            CACHE_MISS: 0,
+            "stale_if_error": 0,
+            "refresh_failures": 0
+        }
+
+    async def fetch(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float
+    ) -> Tuple[bytes, str]:
+        """
+        Return the serialized response for key and how it was obtained.
+
+        Args:
+            key: Canonical cache key
+            loader: Coroutine factory fetching the value from upstream
+            ttl: Seconds a newly loaded value stays fresh
+
+        Returns:
+            Tuple of (payload bytes, cache status)
+
+        Raises:
+            Exception: If upstream fails and no usable stale entry exists
+        """
+        entry = self.cache.get_entry(key)
+        now = time.monotonic()
+
+        if entry is not None and now < entry.expires_at:
+            return self._served(entry.payload, CACHE_FRESH)
+
+        if entry is not None and now < entry.stale_until:
+            self._schedule_refresh(key, loader, ttl)
+            return self._served(entry.payload, CACHE_STALE)
+
+        try:
+            payload = await self.inflight.do(key, lambda: self._load(key, loader, ttl))
+        except Exception:
+            if entry is not None and time.monotonic() < entry.error_until:
+                self.counts["stale_if_error"] += 1
+                return self._served(entry.payload, CACHE_STALE)
+            raise
+
+        return self._served(payload, CACHE_REVALIDATED if entry is not None else CACHE_MISS)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float) -> bytes:
+        value = await loader()
+        return self.cache.set(key, value, ttl=ttl, stale_ttl=self.stale_ttl, error_ttl=self.error_ttl)
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float) -> None:
+        async def refresh():
+            try:
+                await self.inflight.do(key, lambda: self._load(key, loader, ttl))
+            except Exception as e:
+                self.counts["refresh_failures"] += 1
+                logger.warning(f"Background refresh failed for {key}: {str(e)}")
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    def _served(self, payload: bytes, status: str) -> Tuple[bytes, str]:
+        self.counts[status] += 1
+        cache_status.set(status)
+        return payload, status
+
+    def stats(self) -> Dict[str, Any]:
+        """Return storage statistics and counts per cache status."""
+        return {
+            **self.cache.stats(),
+            "served": dict(self.counts),
+            "refreshing": len(self._refreshes)
+        }
@@ -1,19 +1,113 @@
 import os
+import time
+import random
+import asyncio
 import requests
 import aiohttp
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 from dotenv import load_dotenv
+from http_client import create_http_session, OPENVERSE_CONNECT_TIMEOUT, OPENVERSE_READ_TIMEOUT
+from services.cache import TTLCache, decode_value
+from services.response_cache import CACHE_PREFETCHED, ResponseCache, cache_status
+from services.popular_media_pool import PopularMediaPool
+from services.local_index import LocalMediaIndex
+from services.dedup import BloomFilter, SeenResultsStore, drop_seen, mark_seen
+from services.query_canonicalizer import CanonicalSearch, canonicalize_search
+from services.rate_limiter import TokenBucket, parse_retry_after
+from services.resilience import (
+    CircuitBreaker, AdaptiveConcurrencyLimiter, LatencyTracker, Deadline,
+    UpstreamError, UpstreamUnavailableError
+)
+from services.singleflight import SingleFlight
 
 load_dotenv()
 
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SEARCH_CACHE_TTL_IMAGES = float(os.getenv("SEARCH_CACHE_TTL_IMAGES", "600"))
+SEARCH_CACHE_TTL_AUDIO = float(os.getenv("SEARCH_CACHE_TTL_AUDIO", "1800"))
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", "300"))
+SEARCH_CACHE_ERROR_TTL = float(os.getenv("SEARCH_CACHE_ERROR_TTL", "3600"))
+
+PREFETCH_MAX_ENTRIES = int(os.getenv("PREFETCH_MAX_ENTRIES", "512"))
+PREFETCH_MAX_BYTES = int(os.getenv("PREFETCH_MAX_BYTES", str(16 * 1024 * 1024)))
+PREFETCH_TTL = float(os.getenv("PREFETCH_TTL", "60"))
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "4"))
+PREFETCH_MIN_TOKENS = float(os.getenv("PREFETCH_MIN_TOKENS", "5"))
+
+MEDIA_CACHE_MAX_ENTRIES = int(os.getenv("MEDIA_CACHE_MAX_ENTRIES", "4096"))
+MEDIA_CACHE_MAX_BYTES = int(os.getenv("MEDIA_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+MEDIA_CACHE_TTL = float(os.getenv("MEDIA_CACHE_TTL", "3600"))
+MEDIA_CACHE_STALE_TTL = float(os.getenv("MEDIA_CACHE_STALE_TTL", "600"))
+MEDIA_CACHE_ERROR_TTL = float(os.getenv("MEDIA_CACHE_ERROR_TTL", "86400"))
+MEDIA_BATCH_CONCURRENCY = int(os.getenv("MEDIA_BATCH_CONCURRENCY", "8"))
+
+OPENVERSE_BREAKER_FAILURE_RATE = float(os.getenv("OPENVERSE_BREAKER_FAILURE_RATE", "0.5"))
+OPENVERSE_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("OPENVERSE_BREAKER_SLOW_CALL_SECONDS", "3"))
+OPENVERSE_BREAKER_SLOW_CALL_RATE = float(os.getenv("OPENVERSE_BREAKER_SLOW_CALL_RATE", "0.8"))
+OPENVERSE_BREAKER_OPEN_SECONDS = float(os.getenv("OPENVERSE_BREAKER_OPEN_SECONDS", "30"))
+OPENVERSE_CONCURRENCY_INITIAL = int(os.getenv("OPENVERSE_CONCURRENCY_INITIAL", "20"))
+OPENVERSE_CONCURRENCY_MIN = int(os.getenv("OPENVERSE_CONCURRENCY_MIN", "2"))
+OPENVERSE_CONCURRENCY_MAX = int(os.getenv("OPENVERSE_CONCURRENCY_MAX", "200"))
+OPENVERSE_LATENCY_TARGET = float(os.getenv("OPENVERSE_LATENCY_TARGET", "1.5"))
+
+OPENVERSE_REQUEST_BUDGET = float(os.getenv("OPENVERSE_REQUEST_BUDGET", "10"))
+OPENVERSE_MAX_ATTEMPTS = int(os.getenv("OPENVERSE_MAX_ATTEMPTS", "3"))
+OPENVERSE_RETRY_BASE_DELAY = float(os.getenv("OPENVERSE_RETRY_BASE_DELAY", "0.05"))
+OPENVERSE_RETRY_MAX_DELAY = float(os.getenv("OPENVERSE_RETRY_MAX_DELAY", "1"))
+OPENVERSE_MIN_ATTEMPT_SECONDS = float(os.getenv("OPENVERSE_MIN_ATTEMPT_SECONDS", "0.25"))
+OPENVERSE_HEDGE_ENABLED = os.getenv("OPENVERSE_HEDGE_ENABLED", "true").lower() == "true"
+OPENVERSE_HEDGE_MAX_RATIO = float(os.getenv("OPENVERSE_HEDGE_MAX_RATIO", "0.1"))
+
+# Quota of the Openverse API key: sustained requests per second and burst size
+OPENVERSE_RATE_LIMIT_PER_SECOND = float(os.getenv("OPENVERSE_RATE_LIMIT_PER_SECOND", "10"))
+OPENVERSE_RATE_LIMIT_BURST = int(os.getenv("OPENVERSE_RATE_LIMIT_BURST", "20"))
+OPENVERSE_RATE_LIMIT_MAX_WAIT = float(os.getenv("OPENVERSE_RATE_LIMIT_MAX_WAIT", "0.5"))
+OPENVERSE_RETRY_AFTER_DEFAULT = float(os.getenv("OPENVERSE_RETRY_AFTER_DEFAULT", "5"))
+
+STREAM_PAGE_SIZE = int(os.getenv("STREAM_PAGE_SIZE", "20"))
+STREAM_WINDOW = int(os.getenv("STREAM_WINDOW", "4"))
+STREAM_DEDUP_WINDOW = int(os.getenv("STREAM_DEDUP_WINDOW", "5000"))
+# Rate limiter tokens an export leaves for interactive searches
+STREAM_RESERVED_TOKENS = float(os.getenv("STREAM_RESERVED_TOKENS", "10"))
+
+DEDUP_MAX_SESSIONS = int(os.getenv("DEDUP_MAX_SESSIONS", "10000"))
+DEDUP_SESSION_TTL = float(os.getenv("DEDUP_SESSION_TTL", "1800"))
+DEDUP_CAPACITY = int(os.getenv("DEDUP_CAPACITY", "2000"))
+DEDUP_ERROR_RATE = float(os.getenv("DEDUP_ERROR_RATE", "0.01"))
+DEDUP_MAX_REFILL_PAGES = int(os.getenv("DEDUP_MAX_REFILL_PAGES", "2"))
+
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "data/local_index.bin")
+LOCAL_INDEX_MAX_DOCUMENTS = int(os.getenv("LOCAL_INDEX_MAX_DOCUMENTS", "100000"))
+LOCAL_INDEX_SAVE_INTERVAL = float(os.getenv("LOCAL_INDEX_SAVE_INTERVAL", "300"))
+
+POPULAR_SEARCH_TERMS = ["nature", "technology", "art", "music", "people"]
+POPULAR_POOL_PAGES = int(os.getenv("POPULAR_POOL_PAGES", "3"))
+POPULAR_POOL_PAGE_SIZE = int(os.getenv("POPULAR_POOL_PAGE_SIZE", "50"))
+POPULAR_POOL_REFRESH_INTERVAL = float(os.getenv("POPULAR_POOL_REFRESH_INTERVAL", "900"))
+POPULAR_POOL_RETRY_INTERVAL = float(os.getenv("POPULAR_POOL_RETRY_INTERVAL", "60"))
+# Rate limiter tokens the pool warmer leaves for user searches
+POPULAR_POOL_RESERVED_TOKENS = float(os.getenv("POPULAR_POOL_RESERVED_TOKENS", "10"))
+POPULAR_SAMPLE_WINDOW = float(os.getenv("POPULAR_SAMPLE_WINDOW", "300"))
+
 class SearchService:
     """
     Service for handling media search operations using the Openverse API.
     This service implements the business logic for searching media.
     """
     
-    def __init__(self):
-        """Initialize the search service with API configuration."""
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        """
+        Initialize the search service with API configuration.
+
+        Args:
+            session: Shared pooled HTTP session. When omitted, the service
+                lazily creates and owns its own session.
+        """
+        self._session = session
+        self._owns_session = session is None
+
         self.api_url = os.getenv("OPENVERSE_API_URL", "https://api.openverse.engineering/v1/")
         self.api_key = os.getenv("OPENVERSE_API_KEY")
 
@@ -22,7 +116,325 @@ class SearchService:
         self.supported_licenses = [
             "cc0", "pdm", "by", "by-sa", "by-nc", "by-nd", "by-nc-sa", "by-nc-nd"
         ]
-    
+
+        self.search_cache = TTLCache(
+            max_entries=SEARCH_CACHE_MAX_ENTRIES,
+            max_bytes=SEARCH_CACHE_MAX_BYTES
+        )
+        self.search_cache_ttls = {
+            "images": SEARCH_CACHE_TTL_IMAGES,
+            "audio": SEARCH_CACHE_TTL_AUDIO
+        }
+
+        self.prefetch_store = TTLCache(
+            max_entries=PREFETCH_MAX_ENTRIES,
+            max_bytes=PREFETCH_MAX_BYTES
+        )
+        self._prefetches_running = 0
+        self.prefetch_counts = {
+            "issued": 0,
+            "used": 0,
+            "skipped_budget": 0,
+            "skipped_rate_limit": 0,
+            "skipped_cached": 0,
+            "failed": 0
+        }
+
+        self.media_cache = TTLCache(
+            max_entries=MEDIA_CACHE_MAX_ENTRIES,
+            max_bytes=MEDIA_CACHE_MAX_BYTES
+        )
+
+        self.inflight = SingleFlight()
+
+        self.circuit_breaker = CircuitBreaker(
+            failure_rate_threshold=OPENVERSE_BREAKER_FAILURE_RATE,
+            slow_call_threshold=OPENVERSE_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate_threshold=OPENVERSE_BREAKER_SLOW_CALL_RATE,
+            open_duration=OPENVERSE_BREAKER_OPEN_SECONDS
+        )
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=OPENVERSE_CONCURRENCY_INITIAL,
+            min_limit=OPENVERSE_CONCURRENCY_MIN,
+            max_limit=OPENVERSE_CONCURRENCY_MAX,
+            latency_target=OPENVERSE_LATENCY_TARGET
+        )
+        self.latency_tracker = LatencyTracker()
+        self.rate_limiter = TokenBucket(
+            rate=OPENVERSE_RATE_LIMIT_PER_SECOND,
+            burst=OPENVERSE_RATE_LIMIT_BURST
+        )
+        self.upstream_counts = {
+            "attempts": 0,
+            "retries": 0,
+            "hedges": 0
+        }
+
+        self.search_responses = ResponseCache(
+            self.search_cache,
+            self.inflight,
+            stale_ttl=SEARCH_CACHE_STALE_TTL,
+            error_ttl=SEARCH_CACHE_ERROR_TTL
+        )
+        self.media_responses = ResponseCache(
+            self.media_cache,
+            self.inflight,
+            stale_ttl=MEDIA_CACHE_STALE_TTL,
+            error_ttl=MEDIA_CACHE_ERROR_TTL
+        )
+
+        self.popular_pool = PopularMediaPool(
+            self,
+            seed_terms=POPULAR_SEARCH_TERMS,
+            media_types=self.supported_media_types,
+            pages=POPULAR_POOL_PAGES,
+            page_size=POPULAR_POOL_PAGE_SIZE,
+            refresh_interval=POPULAR_POOL_REFRESH_INTERVAL,
+            rate_limiter=self.rate_limiter,
+            reserved_tokens=POPULAR_POOL_RESERVED_TOKENS,
+            retry_interval=POPULAR_POOL_RETRY_INTERVAL
+        )
+
+        self.seen_results = SeenResultsStore(
+            max_sessions=DEDUP_MAX_SESSIONS,
+            ttl=DEDUP_SESSION_TTL,
+            capacity=DEDUP_CAPACITY,
+            error_rate=DEDUP_ERROR_RATE
+        )
+
+        self.local_index = LocalMediaIndex(
+            path=LOCAL_INDEX_PATH or None,
+            max_documents=LOCAL_INDEX_MAX_DOCUMENTS,
+            save_interval=LOCAL_INDEX_SAVE_INTERVAL
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the HTTP session, creating an owned one if none was injected."""
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session = create_http_session()
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Close the HTTP session if this service created it."""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Perform a GET request against the Openverse API over the pooled session.
+
+        Retryable failures (5xx, 429, timeouts, connection errors) are retried
+        with full-jitter exponential backoff for as long as the deadline
+        allows; a retry after a 429 additionally waits on the rate limiter.
+        Each attempt may be hedged, see _hedged_get.
+
+        Args:
+            url: Openverse endpoint URL
+            params: Query parameters
+            deadline: Time budget of the request this call serves; a default
+                budget is used when omitted
+
+        Raises:
+            UpstreamUnavailableError: If the call is rejected by the rate limiter,
+                breaker or concurrency limiter
+            UpstreamError: If the API responds with an error or cannot be reached
+        """
+        deadline = deadline or Deadline(OPENVERSE_REQUEST_BUDGET)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                return await self._hedged_get(url, params, deadline)
+            except UpstreamError as e:
+                delay = random.uniform(0, min(OPENVERSE_RETRY_MAX_DELAY, OPENVERSE_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+                if (not e.retryable
+                        or attempt >= OPENVERSE_MAX_ATTEMPTS
+                        or deadline.remaining() < delay + OPENVERSE_MIN_ATTEMPT_SECONDS):
+                    raise
+                self.upstream_counts["retries"] += 1
+                await asyncio.sleep(delay)
+
+    async def _hedged_get(self, url: str, params: Optional[Dict[str, Any]], deadline: Deadline) -> Dict[str, Any]:
+        """
+        Run one attempt, hedging it with a second request if it is slow.
+
+        When hedging is enabled and the first request has not answered by the
+        observed p95 latency, a duplicate request is sent and whichever
+        succeeds first wins; the other is cancelled. Hedges are capped at a
+        share of all attempts and never wait for a rate limit token, so they
+        barely add to upstream load.
+        """
+        hedge_after = self.latency_tracker.p95() if OPENVERSE_HEDGE_ENABLED else None
+        self.upstream_counts["attempts"] += 1
+
+        if hedge_after is None or not self._hedge_allowed():
+            return await self._get_once(url, params, deadline)
+
+        pending = {asyncio.ensure_future(self._get_once(url, params, deadline))}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=min(hedge_after, deadline.remaining()))
+            if not done and deadline.remaining() >= OPENVERSE_MIN_ATTEMPT_SECONDS:
+                self.upstream_counts["hedges"] += 1
+                pending.add(asyncio.ensure_future(self._get_once(url, params, deadline, token_wait=0.0)))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_allowed(self) -> bool:
+        attempts = self.upstream_counts["attempts"]
+        return self.upstream_counts["hedges"] < max(1, attempts * OPENVERSE_HEDGE_MAX_RATIO)
+
+    async def _get_once(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        deadline: Deadline,
+        token_wait: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a single GET request, bounded by the remaining deadline.
+
+        Each call first takes a token from the API key's rate limiter, waiting
+        at most token_wait seconds (OPENVERSE_RATE_LIMIT_MAX_WAIT by default)
+        and never past the deadline. A 429 pauses the limiter for the
+        Retry-After period. Calls are then guarded by the circuit breaker and
+        the adaptive concurrency limit, so when Openverse is struggling
+        requests fail fast instead of queueing behind the timeout. Server errors, throttling, timeouts and
+        connection failures count against upstream health; other 4xx
+        responses do not. Cancelled calls (such as a losing hedge) record
+        no outcome.
+        """
+        if deadline.expired:
+            raise UpstreamError("Openverse API request deadline exceeded")
+        if token_wait is None:
+            token_wait = OPENVERSE_RATE_LIMIT_MAX_WAIT
+        token_wait = min(token_wait, max(0.0, deadline.remaining() - OPENVERSE_MIN_ATTEMPT_SECONDS))
+        if not await self.rate_limiter.acquire(token_wait):
+            raise UpstreamUnavailableError("Openverse API rate limit reached")
+        if not self.concurrency_limiter.try_acquire():
+            raise UpstreamUnavailableError("Openverse API concurrency limit reached")
+        if not self.circuit_breaker.allow_request():
+            self.concurrency_limiter.cancel()
+            raise UpstreamUnavailableError("Openverse API circuit breaker is open")
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        # A per-request ClientTimeout replaces the session's entirely, so the
+        # connect and read limits are restated here.
+        remaining = deadline.remaining()
+        timeout = aiohttp.ClientTimeout(
+            total=remaining,
+            connect=min(OPENVERSE_CONNECT_TIMEOUT, remaining),
+            sock_read=min(OPENVERSE_READ_TIMEOUT, remaining)
+        )
+        started = time.monotonic()
+        healthy = False
+        cancelled = False
+
+        try:
+            session = self._get_session()
+            async with session.get(url, headers=headers, params=params, timeout=timeout) as response:
+                if response.status == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.rate_limiter.pause(OPENVERSE_RETRY_AFTER_DEFAULT if retry_after is None else retry_after)
+
+                if response.status != 200:
+                    healthy = response.status < 500 and response.status != 429
+                    error_message = f"Openverse API error: {response.status}"
+                    try:
+                        error_detail = await response.json()
+                        error_message += f" - {error_detail.get('detail', '')}"
+                    except:
+                        pass
+                    raise UpstreamError(
+                        error_message,
+                        status=response.status,
+                        retryable=(response.status >= 500 and response.status != 501) or response.status == 429
+                    )
+
+                result = await response.json()
+                healthy = True
+                return result
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise UpstreamError(
+                f"Failed to connect to Openverse API: {str(e) or type(e).__name__}",
+                retryable=True
+            )
+
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+        finally:
+            latency = time.monotonic() - started
+            if cancelled:
+                self.concurrency_limiter.cancel()
+                self.circuit_breaker.cancel()
+            else:
+                self.concurrency_limiter.release(healthy, latency)
+                self.circuit_breaker.record(healthy, latency)
+                if healthy:
+                    self.latency_tracker.record(latency)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return runtime counters for the service's caches and upstream guards."""
+        return {
+            "search_cache": self.search_responses.stats(),
+            "media_cache": self.media_responses.stats(),
+            "prefetch": self.prefetch_stats(),
+            "popular_pool": self.popular_pool.stats(),
+            "local_index": self.local_index.stats(),
+            "dedup": self.seen_results.stats(),
+            "inflight": self.inflight.stats(),
+            "circuit_breaker": self.circuit_breaker.stats(),
+            "concurrency_limiter": self.concurrency_limiter.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "upstream": {
+                **self.upstream_counts,
+                "p95_latency": self.latency_tracker.p95()
+            }
+        }
+
+    @staticmethod
+    def _search_cache_key(search: CanonicalSearch) -> tuple:
+        """Build a cache key from a canonicalized search."""
+        return ("search", search.key)
+
+    @staticmethod
+    def _prefetch_key(cache_key: tuple) -> tuple:
+        """Build the single-flight key of a prefetch for a search cache key."""
+        return ("prefetch",) + cache_key
+
+    async def _prefetch(self, search: CanonicalSearch, cache_key: tuple) -> None:
+        # Stored before the single-flight task finishes, so a request that
+        # joined the prefetch finds the page as soon as it wakes up.
+        result = await self._fetch_canonical(search)
+        self.prefetch_store.set(cache_key, result, ttl=PREFETCH_TTL)
+
+    async def _fetch_canonical(self, search: CanonicalSearch, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        result = await self._fetch_search(
+            search.query, search.media_type, search.page, search.page_size,
+            search.license_type, search.creator, search.tags, search.source, deadline
+        )
+        self.local_index.add_many(result.get("results", []), search.media_type)
+        return result
+
     async def search_media(
         self, 
         query: str, 
@@ -32,10 +444,18 @@ class SearchService:
         license_type: Optional[str] = None,
         creator: Optional[str] = None,
         tags: Optional[str] = None,
-        source: Optional[str] = None
+        source: Optional[str] = None,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         """
         Search for media using the Openverse API.
+
+        Parameters are canonicalized first, so searches differing only in
+        case, whitespace, Unicode form or tag order share one identity.
+        Results are served from an in-process LRU cache when an identical
+        search was made within the media type's TTL, or stale while being
+        revalidated in the background shortly after expiry. Concurrent misses
+        for the same search share a single upstream request.
         
         Args:
             query: Search term
@@ -46,6 +466,7 @@ class SearchService:
             creator: Filter by creator
             tags: Filter by tags
             source: Filter by source
+            deadline: Time budget for upstream calls made on the caller's behalf
             
         Returns:
             Dict containing search results and metadata
@@ -54,15 +475,492 @@ class SearchService:
             ValueError: If an invalid parameter is provided
             Exception: If the API request fails
         """
+        search = canonicalize_search(query, media_type, page, page_size, license_type, creator, tags, source)
+        self.validate_search_params(search.media_type, search.license_type)
+
+        cache_key = self._search_cache_key(search)
+        prefetch_used = False
+
+        async def load() -> Dict[str, Any]:
+            nonlocal prefetch_used
+            prefetching = self.inflight.running(self._prefetch_key(cache_key))
+            if prefetching is not None:
+                # Join the prefetch for this page instead of racing it upstream,
+                # leaving enough of the deadline for a fetch of our own if it
+                # is too slow or fails
+                remaining = deadline.remaining() if deadline else OPENVERSE_REQUEST_BUDGET
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(prefetching),
+                        max(0.0, remaining - OPENVERSE_MIN_ATTEMPT_SECONDS)
+                    )
+                except Exception:
+                    pass
+            prefetched = self.prefetch_store.get(cache_key)
+            if prefetched is not None:
+                self.prefetch_store.delete(cache_key)
+                self.prefetch_counts["used"] += 1
+                prefetch_used = True
+                return prefetched
+            return await self._fetch_canonical(search, deadline)
+
+        payload, _ = await self.search_responses.fetch(
+            cache_key, load, ttl=self.search_cache_ttls[search.media_type]
+        )
+        if prefetch_used:
+            cache_status.set(CACHE_PREFETCHED)
+        result = decode_value(payload)
+
+        result["search_info"] = {
+            "query": query,
+            "media_type": media_type,
+            "page": page,
+            "page_size": page_size,
+            "license_type": license_type,
+            "creator": creator,
+            "tags": tags,
+            "source": source
+        }
+        
+        return result
+
+    async def search_media_unseen(
+        self,
+        seen: BloomFilter,
+        query: str,
+        media_type: str = "images",
+        page: int = 1,
+        page_size: int = 20,
+        license_type: Optional[str] = None,
+        creator: Optional[str] = None,
+        tags: Optional[str] = None,
+        source: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Search like search_media, leaving out results already delivered.
+
+        Results whose id is in seen are dropped, and the page is refilled
+        from up to DEDUP_MAX_REFILL_PAGES following pages, which then sit in
+        the search cache for the client's next page request. Every returned
+        id is added to seen.
+
+        Args:
+            seen: Filter of result ids already delivered to the client
+            query: Search term
+            media_type: Type of media (images, audio)
+            page: Page number for pagination
+            page_size: Number of results per page
+            license_type: Filter by license type
+            creator: Filter by creator
+            tags: Filter by tags
+            source: Filter by source
+            deadline: Time budget for upstream calls made on the caller's behalf
+
+        Returns:
+            Dict containing search results and metadata, with counts of
+            dropped and refilled results under "dedup"
+
+        Raises:
+            ValueError: If an invalid parameter is provided
+            Exception: If the API request fails
+        """
+        async def fetch(page_number: int) -> Dict[str, Any]:
+            return await self.search_media(
+                query=query,
+                media_type=media_type,
+                page=page_number,
+                page_size=page_size,
+                license_type=license_type,
+                creator=creator,
+                tags=tags,
+                source=source,
+                deadline=deadline
+            )
+
+        result = await fetch(page)
+        result["results"], dropped = drop_seen(result.get("results", []), seen)
+        last_page = min(result.get("page_count", page), page + DEDUP_MAX_REFILL_PAGES)
+
+        refilled = 0
+        next_page = page + 1
+        while len(result["results"]) < page_size and next_page <= last_page:
+            try:
+                more = await fetch(next_page)
+            except Exception:
+                break
+            unseen, _ = drop_seen(more.get("results", []), seen, exclude=result["results"])
+            unseen = unseen[:page_size - len(result["results"])]
+            result["results"].extend(unseen)
+            refilled += len(unseen)
+            next_page += 1
+
+        mark_seen(result["results"], seen)
+        result["dedup"] = {"dropped": dropped, "refilled": refilled}
+        return result
+
+    def validate_search_params(self, media_type: str, license_type: Optional[str] = None) -> None:
+        """
+        Check a media type and license filter against the supported values.
+
+        Raises:
+            ValueError: If either value is not supported
+        """
         if media_type not in self.supported_media_types:
             raise ValueError(f"Invalid media type. Use one of {self.supported_media_types}")
         
         if license_type and license_type not in self.supported_licenses:
             raise ValueError(f"Invalid license type. Use one of {self.supported_licenses}")
 
-        url = f"{self.api_url}{media_type}/"
+    def parse_media_types(self, media_type: str) -> List[str]:
+        """
+        Expand a media_type parameter into the list of types to search.
+
+        Accepts a single type, a comma-separated list, or "all".
+        """
+        if media_type == "all":
+            return list(self.supported_media_types)
+
+        media_types = []
+        for value in media_type.split(","):
+            value = value.strip()
+            if value and value not in media_types:
+                media_types.append(value)
+        return media_types or [media_type]
+
+    async def search_multiple_media_types(
+        self,
+        query: str,
+        media_types: List[str],
+        page: int = 1,
+        page_size: int = 20,
+        license_type: Optional[str] = None,
+        creator: Optional[str] = None,
+        tags: Optional[str] = None,
+        source: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Search several media types concurrently and merge the results.
+
+        Each type is searched with search_media at the same time, so the
+        call takes as long as the slowest type rather than the sum of all.
+        Results are interleaved and tagged with their media type; a type that
+        fails is reported under "errors" while the others are still returned.
         
-        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        Args:
+            query: Search term
+            media_types: Media types to search (images, audio)
+            page: Page number for pagination, applied to every type
+            page_size: Number of results per page for each type
+            license_type: Filter by license type
+            creator: Filter by creator
+            tags: Filter by tags
+            source: Filter by source
+            deadline: Time budget shared by every media type's upstream calls
+            
+        Returns:
+            Dict containing merged results, per-type metadata, errors and
+            the cache status of each type under "cache_statuses"
+            
+        Raises:
+            ValueError: If an invalid parameter is provided
+            UpstreamError: If every media type fails
+        """
+        for media_type in media_types:
+            if media_type not in self.supported_media_types:
+                raise ValueError(f"Invalid media type. Use one of {self.supported_media_types}")
+
+        if license_type and license_type not in self.supported_licenses:
+            raise ValueError(f"Invalid license type. Use one of {self.supported_licenses}")
+
+        async def search_one(media_type: str) -> Tuple[Dict[str, Any], Optional[str]]:
+            result = await self.search_media(
+                query=query,
+                media_type=media_type,
+                page=page,
+                page_size=page_size,
+                license_type=license_type,
+                creator=creator,
+                tags=tags,
+                source=source,
+                deadline=deadline
+            )
+            # Each gathered search runs in a copy of the context, so its
+            # cache status has to be read here rather than by the caller.
+            return result, cache_status.get()
+
+        outcomes = await asyncio.gather(
+            *(search_one(media_type) for media_type in media_types),
+            return_exceptions=True
+        )
+
+        per_type: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        cache_statuses: Dict[str, str] = {}
+        result_lists: List[List[Dict[str, Any]]] = []
+
+        for media_type, outcome in zip(media_types, outcomes):
+            if isinstance(outcome, BaseException):
+                errors[media_type] = str(outcome)
+                continue
+
+            outcome, type_status = outcome
+            if type_status:
+                cache_statuses[media_type] = type_status
+            type_results = outcome.get("results", [])
+            for item in type_results:
+                item.setdefault("media_type", media_type)
+            result_lists.append(type_results)
+            per_type[media_type] = {
+                "result_count": outcome.get("result_count", len(type_results)),
+                "page_count": outcome.get("page_count", page)
+            }
+
+        if not per_type:
+            raise UpstreamError(f"All media type searches failed: {errors}")
+
+        results = [
+            type_results[position]
+            for position in range(max(len(type_results) for type_results in result_lists))
+            for type_results in result_lists
+            if position < len(type_results)
+        ]
+
+        return {
+            "result_count": sum(meta["result_count"] for meta in per_type.values()),
+            "page_count": max(meta["page_count"] for meta in per_type.values()),
+            "page_size": page_size * len(media_types),
+            "page": page,
+            "results": results,
+            "media_types": per_type,
+            "errors": errors,
+            "cache_statuses": cache_statuses,
+            "search_info": {
+                "query": query,
+                "media_type": ",".join(media_types),
+                "media_types": media_types,
+                "page": page,
+                "page_size": page_size,
+                "license_type": license_type,
+                "creator": creator,
+                "tags": tags,
+                "source": source
+            }
+        }
+
+    def search_local(
+        self,
+        query: str,
+        media_types: List[str],
+        page: int = 1,
+        page_size: int = 20,
+        license_type: Optional[str] = None,
+        creator: Optional[str] = None,
+        tags: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer a search from the local index while Openverse is unavailable.
+
+        Only media already seen in search responses or bookmarks can be
+        found. The index supports the media type and license filters; a
+        search using any other filter is not answered.
+
+        Args:
+            query: Search term
+            media_types: Media types to search (images, audio)
+            page: Page number for pagination
+            page_size: Number of results per page
+            license_type: Filter by license type
+            creator: Filter by creator
+            tags: Filter by tags
+            source: Filter by source
+
+        Returns:
+            Dict containing search results marked as degraded, or None if
+            the filters are unsupported or nothing in the index matches
+        """
+        if creator or tags or source:
+            return None
+
+        search = canonicalize_search(query, ",".join(media_types), page, page_size, license_type)
+        result = self.local_index.search(
+            search.query,
+            media_types=media_types,
+            license_type=search.license_type,
+            page=search.page,
+            page_size=search.page_size
+        )
+        if not result["result_count"]:
+            return None
+
+        result["degraded"] = True
+        result["search_info"] = {
+            "query": query,
+            "media_type": ",".join(media_types),
+            "page": page,
+            "page_size": page_size,
+            "license_type": license_type,
+            "source": "local_index"
+        }
+        return result
+
+    async def prefetch_next_page(
+        self,
+        query: str,
+        media_type: str = "images",
+        page: int = 1,
+        page_size: int = 20,
+        license_type: Optional[str] = None,
+        creator: Optional[str] = None,
+        tags: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> None:
+        """
+        Fetch page + 1 of a search into the short-lived prefetch store.
+
+        Meant to run as a background task after page N has been returned.
+        The prefetch is skipped when the next page is already cached, the
+        global prefetch concurrency budget is exhausted or the rate limiter
+        is running low on tokens, and failures are only counted, never raised.
+        """
+        search = canonicalize_search(query, media_type, page + 1, page_size, license_type, creator, tags, source)
+        cache_key = self._search_cache_key(search)
+
+        if cache_key in self.search_cache or cache_key in self.prefetch_store:
+            self.prefetch_counts["skipped_cached"] += 1
+            return
+
+        if self._prefetches_running >= PREFETCH_CONCURRENCY:
+            self.prefetch_counts["skipped_budget"] += 1
+            return
+
+        if self.rate_limiter.available() < PREFETCH_MIN_TOKENS:
+            self.prefetch_counts["skipped_rate_limit"] += 1
+            return
+
+        self._prefetches_running += 1
+        self.prefetch_counts["issued"] += 1
+        try:
+            await self.inflight.do(self._prefetch_key(cache_key), lambda: self._prefetch(search, cache_key))
+        except Exception:
+            self.prefetch_counts["failed"] += 1
+        finally:
+            self._prefetches_running -= 1
+
+    def prefetch_stats(self) -> Dict[str, Any]:
+        """Return prefetch counters and the share of prefetches later used."""
+        issued = self.prefetch_counts["issued"]
+        return {
+            **self.prefetch_counts,
+            "running": self._prefetches_running,
+            "stored": len(self.prefetch_store),
+            "hit_rate": round(self.prefetch_counts["used"] / issued, 4) if issued else 0.0
+        }
+
+    async def stream_search(
+        self,
+        query: str,
+        media_type: str = "images",
+        max_results: int = 1000,
+        license_type: Optional[str] = None,
+        creator: Optional[str] = None,
+        tags: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Walk the Openverse result pages for a search and yield each result.
+
+        Up to STREAM_WINDOW pages are fetched concurrently ahead of the page
+        being emitted, but results are always yielded in page order. Items
+        already yielded are dropped using a bounded window of recent ids, so
+        memory use does not grow with the number of exported results. Pages
+        bypass the search cache so an export cannot flush it, and each page
+        waits until STREAM_RESERVED_TOKENS rate limiter tokens are left for
+        interactive searches, so an export runs on spare capacity.
+        
+        Args:
+            query: Search term
+            media_type: Type of media (images, audio)
+            max_results: Stop after this many results
+            license_type: Filter by license type
+            creator: Filter by creator
+            tags: Filter by tags
+            source: Filter by source
+            
+        Yields:
+            Result dicts; if upstream fails part-way, a final {"error": ...} dict
+            
+        Raises:
+            ValueError: If an invalid parameter is provided
+        """
+        self.validate_search_params(media_type, license_type)
+
+        async def fetch_page(page: int) -> Dict[str, Any]:
+            await self.rate_limiter.wait_for_spare(STREAM_RESERVED_TOKENS)
+            return await self._fetch_search(
+                query, media_type, page, STREAM_PAGE_SIZE, license_type, creator, tags, source
+            )
+
+        def fetch(page: int) -> "asyncio.Task[Dict[str, Any]]":
+            return asyncio.ensure_future(fetch_page(page))
+
+        pending: "deque[asyncio.Task[Dict[str, Any]]]" = deque([fetch(1)])
+        next_page = 2
+        last_page: Optional[int] = None
+        recent_ids: "OrderedDict[Any, None]" = OrderedDict()
+        emitted = 0
+
+        try:
+            while pending:
+                try:
+                    result = await pending.popleft()
+                except Exception as e:
+                    yield {"error": str(e)}
+                    return
+
+                page_results = result.get("results", [])
+                if not page_results:
+                    return
+
+                if last_page is None:
+                    last_page = result.get("page_count", 1)
+
+                while len(pending) < STREAM_WINDOW and next_page <= last_page:
+                    pending.append(fetch(next_page))
+                    next_page += 1
+
+                for item in page_results:
+                    item_id = item.get("id")
+                    if item_id in recent_ids:
+                        continue
+                    recent_ids[item_id] = None
+                    if len(recent_ids) > STREAM_DEDUP_WINDOW:
+                        recent_ids.popitem(last=False)
+
+                    yield item
+                    emitted += 1
+                    if emitted >= max_results:
+                        return
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_search(
+        self,
+        query: str,
+        media_type: str,
+        page: int,
+        page_size: int,
+        license_type: Optional[str],
+        creator: Optional[str],
+        tags: Optional[str],
+        source: Optional[str],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Fetch a page of search results from the Openverse API."""
+        url = f"{self.api_url}{media_type}/"
         
         params = {
             "q": query,
@@ -79,44 +977,25 @@ class SearchService:
         if source:
             params["source"] = source
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params, timeout=10) as response:
-                    if response.status != 200:
-                        error_message = f"Openverse API error: {response.status}"
-                        try:
-                            error_detail = await response.json()
-                            error_message += f" - {error_detail.get('detail', '')}"
-                        except:
-                            pass
-                        raise Exception(error_message)
-                    
-
-                    result = await response.json()
-
-                    result["search_info"] = {
-                        "query": query,
-                        "media_type": media_type,
-                        "page": page,
-                        "page_size": page_size,
-                        "license_type": license_type,
-                        "creator": creator,
-                        "tags": tags,
-                        "source": source
-                    }
-                    
-                    return result
-                    
-        except aiohttp.ClientError as e:
-            raise Exception(f"Failed to connect to Openverse API: {str(e)}")
+        return await self._get_json(url, params=params, deadline=deadline)
     
-    async def get_media_details(self, media_id: str, media_type: str = "images") -> Dict[str, Any]:
+    async def get_media_details(
+        self,
+        media_id: str,
+        media_type: str = "images",
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Get detailed information bout a specific media item.
+
+        Details are cached with the same stale-while-revalidate semantics as
+        searches, and concurrent requests for the same item share a single
+        upstream request.
         
         Args:
             media_id: The ID of the media item
             media_type: The type of media (images, audio)
+            deadline: Time budget for upstream calls made on the caller's behalf
             
         Returns:
             Dict containing media details
@@ -129,30 +1008,67 @@ class SearchService:
             raise ValueError(f"Invalid media type. Use one of {self.supported_media_types}")
         
         url = f"{self.api_url}{media_type}/{media_id}/"
+
+        async def load() -> Dict[str, Any]:
+            return await self._get_json(url, deadline=deadline)
+
+        payload, _ = await self.media_responses.fetch(
+            self._media_cache_key(media_id, media_type), load, ttl=MEDIA_CACHE_TTL
+        )
+        return decode_value(payload)
+
+    @staticmethod
+    def _media_cache_key(media_id: str, media_type: str) -> tuple:
+        """Build the cache key for a media item's details."""
+        return ("media", media_type, media_id)
+
+    async def get_media_details_batch(
+        self,
+        items: List[Tuple[str, str]],
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get details for several media items in one call.
+
+        Items with fresh cached details are answered immediately; the rest are
+        fetched from Openverse concurrently, at most MEDIA_BATCH_CONCURRENCY
+        at a time. A failing item does not fail the batch.
         
-        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        Args:
+            items: List of (media_type, media_id) pairs
+            deadline: Time budget shared by every item's upstream calls
+            
+        Returns:
+            List of per-item results, in request order, each with either
+            "data" or "error"
+        """
+        semaphore = asyncio.Semaphore(MEDIA_BATCH_CONCURRENCY)
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=10) as response:
-                    if response.status != 200:
-                        error_message = f"Openverse API error: {response.status}"
-                        try:
-                            error_detail = await response.json()
-                            error_message += f" - {error_detail.get('detail', '')}"
-                        except:
-                            pass
-                        raise Exception(error_message)
-
-                    return await response.json()
-                    
-        except aiohttp.ClientError as e:
-            raise Exception(f"Failed to connect to Openverse API: {str(e)}")
+        async def resolve(media_type: str, media_id: str) -> Dict[str, Any]:
+            item = {"media_type": media_type, "media_id": media_id}
+            try:
+                if self._media_cache_key(media_id, media_type) in self.media_cache:
+                    details = await self.get_media_details(media_id=media_id, media_type=media_type)
+                else:
+                    async with semaphore:
+                        details = await self.get_media_details(
+                            media_id=media_id, media_type=media_type, deadline=deadline
+                        )
+                return {**item, "success": True, "data": details}
+            except Exception as e:
+                return {**item, "success": False, "error": str(e)}
+
+        return await asyncio.gather(*(resolve(media_type, media_id) for media_type, media_id in items))
     
     async def get_popular_media(self, media_type: str = "images", limit: int = 20) -> List[Dict[str, Any]]:
         """
         Get popular media from Openverse.
         This is a convenience method to help populate the homepage.
+
+        Items are sampled from the precomputed popular media pool. The sample
+        stays the same for POPULAR_SAMPLE_WINDOW seconds, so repeat requests
+        return identical content that clients and CDNs can cache. Only while
+        the pool is still cold does this fall back to a live search.
         
         Args:
             media_type: The type of media (images, audio)
@@ -165,11 +1081,15 @@ class SearchService:
             ValueError: If an invalid parameter is provided
             Exception: If the API request fails
         """
-        popular_searches = ["nature", "technology", "art", "music", "people"]
+        if media_type not in self.supported_media_types:
+            raise ValueError(f"Invalid media type. Use one of {self.supported_media_types}")
+
+        pooled = self.popular_pool.sample(media_type, limit, seed=int(time.time() // POPULAR_SAMPLE_WINDOW))
+        if pooled is not None:
+            return pooled
         
         try:
-            import random
-            query = random.choice(popular_searches)
+            query = random.choice(POPULAR_SEARCH_TERMS)
             
             result = await self.search_media(
                 query=query,
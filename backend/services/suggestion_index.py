@@ -0,0 +1,263 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from services.query_canonicalizer import normalize_text
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[str] = []
+
+
+class PrefixIndex:
+    """
+    Trie of queries weighted by frequency.
+
+    Every node keeps the top_k heaviest queries below it, so a lookup only
+    walks the prefix and never visits the subtree. Weights only grow, which
+    lets each update maintain the per-node lists along a single path.
+    """
+
+    def __init__(self, top_k: int = 10, max_terms: int = 50_000, max_length: int = 100):
+        """
+        Args:
+            top_k: Queries kept per node, the most a lookup can return
+            max_terms: Distinct queries kept; new queries are ignored once reached
+            max_length: Queries are truncated to this many characters
+        """
+        self.top_k = top_k
+        self.max_terms = max_terms
+        self.max_length = max_length
+
+        self._root = _Node()
+        self.weights: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def __contains__(self, term: str) -> bool:
+        return term[:self.max_length] in self.weights
+
+    def add(self, term: str, weight: float = 1.0) -> bool:
+        """
+        Increase the weight of a query, inserting it if needed.
+
+        Returns:
+            False if the query is new and the index is full, True otherwise
+        """
+        term = term[:self.max_length]
+        if term not in self.weights and len(self.weights) >= self.max_terms:
+            return False
+        self.weights[term] = self.weights.get(term, 0.0) + weight
+
+        node = self._root
+        self._offer(node, term)
+        for char in term:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+            self._offer(node, term)
+        return True
+
+    def _offer(self, node: _Node, term: str) -> None:
+        top = node.top
+        if term not in top:
+            if len(top) < self.top_k:
+                top.append(term)
+            elif self.weights[term] > self.weights[top[-1]]:
+                top[-1] = term
+            else:
+                return
+        top.sort(key=lambda candidate: (-self.weights[candidate], candidate))
+
+    def top(self, prefix: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to limit (query, weight) pairs starting with prefix, heaviest first."""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [(term, self.weights[term]) for term in node.top[:limit]]
+
+
+class SortedPrefixIndex:
+    """
+    Queries weighted by frequency, kept as one sorted list.
+
+    Meant for small sets such as one user's history: memory is one list
+    entry and one dict entry per query, and a lookup bisects to the first
+    match and ranks the matching run. Same interface as PrefixIndex.
+    """
+
+    def __init__(self, max_terms: int = 200, max_length: int = 100):
+        """
+        Args:
+            max_terms: Distinct queries kept; new queries are ignored once reached
+            max_length: Queries are truncated to this many characters
+        """
+        self.max_terms = max_terms
+        self.max_length = max_length
+
+        self._terms: List[str] = []
+        self.weights: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def __contains__(self, term: str) -> bool:
+        return term[:self.max_length] in self.weights
+
+    def add(self, term: str, weight: float = 1.0) -> bool:
+        """
+        Increase the weight of a query, inserting it if needed.
+
+        Returns:
+            False if the query is new and the index is full, True otherwise
+        """
+        term = term[:self.max_length]
+        if term not in self.weights:
+            if len(self.weights) >= self.max_terms:
+                return False
+            insort(self._terms, term)
+            self.weights[term] = 0.0
+        self.weights[term] += weight
+        return True
+
+    def top(self, prefix: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to limit (query, weight) pairs starting with prefix, heaviest first."""
+        matches = []
+        for position in range(bisect_left(self._terms, prefix), len(self._terms)):
+            term = self._terms[position]
+            if not term.startswith(prefix):
+                break
+            matches.append((term, self.weights[term]))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+
+class SuggestionIndex:
+    """
+    Search-as-you-type suggestions from saved searches.
+
+    Keeps one global trie of popular queries and a small sorted list per
+    recently active user, since a trie per user would cost a node for every
+    character of every user's history. A query only becomes a global suggestion once
+    min_users different users have searched for it, so one person's
+    searches are never suggested to anyone else.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 10,
+        max_terms: int = 50_000,
+        max_users: int = 10_000,
+        max_user_terms: int = 200,
+        min_users: int = 2
+    ):
+        """
+        Args:
+            top_k: Most suggestions one lookup can return per source
+            max_terms: Distinct queries kept in the global index
+            max_users: Users whose personal index is kept, least recent dropped first
+            max_user_terms: Distinct queries kept per user
+            min_users: Distinct users required before a query is suggested globally
+        """
+        self.top_k = top_k
+        self.max_users = max_users
+        self.max_user_terms = max_user_terms
+        self.min_users = min_users
+
+        self.popular = PrefixIndex(top_k=top_k, max_terms=max_terms)
+        self._personal: "OrderedDict[str, SortedPrefixIndex]" = OrderedDict()
+        # Queries not yet searched by min_users users: query -> (users, weight)
+        self._pending: "OrderedDict[str, Tuple[Set[str], float]]" = OrderedDict()
+        self._max_pending = max_terms
+
+        self.lookups = 0
+
+    def record(self, query: str, user_id: Optional[str] = None, weight: float = 1.0) -> None:
+        """
+        Count a saved search.
+
+        Args:
+            query: Search query as saved to history
+            user_id: User who searched, if known
+            weight: Amount added to the query's frequency
+        """
+        term = normalize_text(query)
+        if term is None:
+            return
+
+        if user_id:
+            personal = self._personal.get(user_id)
+            if personal is None:
+                personal = self._personal[user_id] = SortedPrefixIndex(max_terms=self.max_user_terms)
+                while len(self._personal) > self.max_users:
+                    self._personal.popitem(last=False)
+            else:
+                self._personal.move_to_end(user_id)
+            personal.add(term, weight)
+
+        if term in self.popular or self.min_users <= 1:
+            self.popular.add(term, weight)
+            return
+
+        users, pending_weight = self._pending.pop(term, (set(), 0.0))
+        if user_id:
+            users.add(user_id)
+        pending_weight += weight
+        if len(users) >= self.min_users:
+            self.popular.add(term, pending_weight)
+            return
+        self._pending[term] = (users, pending_weight)
+        while len(self._pending) > self._max_pending:
+            self._pending.popitem(last=False)
+
+    def suggest(self, prefix: str, user_id: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return suggestions for a prefix, the user's own searches first.
+
+        Args:
+            prefix: What the user has typed so far
+            user_id: User to include personal suggestions for
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of dicts with the suggested query and whether it came from
+            the user's own history
+        """
+        self.lookups += 1
+        prefix = normalize_text(prefix) or ""
+        if not prefix:
+            return []
+
+        suggestions: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+
+        personal = self._personal.get(user_id) if user_id else None
+        if personal is not None:
+            for term, _ in personal.top(prefix, limit):
+                seen.add(term)
+                suggestions.append({"query": term, "personal": True})
+
+        for term, _ in self.popular.top(prefix, limit):
+            if len(suggestions) >= limit:
+                break
+            if term not in seen:
+                suggestions.append({"query": term, "personal": False})
+
+        return suggestions[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index sizes and the lookup count."""
+        return {
+            "popular_terms": len(self.popular),
+            "pending_terms": len(self._pending),
+            "users": len(self._personal),
+            "lookups": self.lookups
+        }
@@ -0,0 +1,48 @@
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from services.cache import TTLCache
+
+
+class VerifiedTokenCache:
+    """
+    Payloads of tokens whose signature and claims were already verified.
+
+    Entries are keyed by the token's SHA-256 digest, so raw tokens are
+    never kept in memory, and expire at the token's exp claim (capped at
+    max_ttl). Tokens without an exp claim are never cached. The underlying
+    TTLCache evicts least recently used entries beyond its caps and hands
+    out a fresh copy of the payload on every hit.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 8 * 1024 * 1024, max_ttl: float = 3600):
+        """
+        Args:
+            max_entries: Maximum number of cached tokens
+            max_bytes: Maximum total size of cached payloads in bytes
+            max_ttl: Longest a payload is cached, whatever its exp claim
+        """
+        self.max_ttl = max_ttl
+        self.cache = TTLCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the verified payload for a token, or None if not cached or expired."""
+        return self.cache.get(self.digest(token))
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        """Cache a verified payload until the token expires."""
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+            return
+        ttl = min(exp - time.time(), self.max_ttl)
+        if ttl > 0:
+            self.cache.set(self.digest(token), payload, ttl=ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the underlying cache's counters."""
+        return self.cache.stats()
@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional
 from repositories.user_repository import UserRepository
+from services.suggestion_index import SuggestionIndex
 from bson import ObjectId
 
 class UserService:
@@ -8,9 +9,16 @@ class UserService:
     This service implements the business logic for user operations.
     """
     
-    def __init__(self, user_repository: UserRepository):
-        """Initialize with a user repository instance."""
+    def __init__(self, user_repository: UserRepository, suggestion_index: Optional[SuggestionIndex] = None):
+        """
+        Initialize with a user repository instance.
+
+        Args:
+            user_repository: Repository for user data
+            suggestion_index: Autocomplete index updated as searches are saved (optional)
+        """
         self.user_repository = user_repository
+        self.suggestion_index = suggestion_index
     
     async def get_user_profile(self, user_id: str) -> Dict[str, Any]:
         """
@@ -147,7 +155,8 @@ class UserService:
                           user_id: str, 
                           search_query: str, 
                           search_params: Optional[Dict[str, Any]] = None,
-                          search_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                          search_results: Optional[Dict[str, Any]] = None,
+                          search_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Save a search to the user's history.
         
@@ -156,6 +165,7 @@ class UserService:
             search_query: The search query
             search_params: Additional search parameters (optional)
             search_results: The search results (optional)
+            search_key: Canonical identity of the search, shared by equivalent searches (optional)
             
         Returns:
             Dict containing the created search history entry
@@ -168,12 +178,16 @@ class UserService:
             "user_id": user_id,
             "search_query": search_query,
             "search_params": search_params,
+            "search_key": search_key,
             "search_results": search_results,
             "result_count": result_count
         }
         
         history = await self.user_repository.create_search_history(history_data)
 
+        if self.suggestion_index is not None:
+            self.suggestion_index.record(search_query, user_id=user_id)
+
         if "_id" in history and isinstance(history["_id"], ObjectId):
             history["_id"] = str(history["_id"])
         
@@ -181,6 +195,7 @@ class UserService:
             "id": history.get("_id"),
             "search_query": history.get("search_query"),
             "search_params": history.get("search_params"),
+            "search_key": history.get("search_key"),
             "result_count": history.get("result_count"),
             "created_at": history.get("created_at")
         }
@@ -203,6 +218,7 @@ class UserService:
                 "id": str(item.get("_id")),
                 "search_query": item.get("search_query"),
                 "search_params": item.get("search_params"),
+                "search_key": item.get("search_key"),
                 "result_count": item.get("result_count"),
                 "created_at": item.get("created_at")
             }
@@ -0,0 +1,202 @@
+import logging
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+from jose import jwt
+from pymongo.errors import DuplicateKeyError
+from starlette.requests import Request
+import auth
+from services.cache import TTLCache
+from services.jwks import JWKSClient
+from services.token_cache import VerifiedTokenCache
+from tests.test_jwks import make_session, make_signing_key
+
+
+@pytest.fixture
+def signed_token(monkeypatch):
+    """Return a token signed with a key served by a mock JWKS client."""
+    pem, public_jwk = make_signing_key("k1")
+    monkeypatch.setattr(auth, "CLERK_JWT_ISSUER", "https://clerk.example.com")
+    monkeypatch.setattr(auth, "verified_tokens", VerifiedTokenCache())
+    token = jwt.encode(
+        {"sub": "user_1", "iss": "https://clerk.example.com", "exp": int(time.time()) + 60},
+        pem,
+        algorithm="RS256",
+        headers={"kid": "k1"}
+    )
+    jwks_client = JWKSClient("https://example.com/jwks", session=make_session([public_jwk]))
+    return token, jwks_client
+
+
+class TestDecodeToken:
+    """Tests for auth.decode_token."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_tokens_skip_verification(self, signed_token):
+        """Test that a verified token is not verified again."""
+        token, jwks_client = signed_token
+
+        with patch("auth.jwt.decode", wraps=jwt.decode) as decode:
+            first = await auth.decode_token(token, jwks_client)
+            second = await auth.decode_token(token, jwks_client)
+
+        assert first == second
+        assert first["sub"] == "user_1"
+        assert decode.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_tampered_tokens_are_rejected(self, signed_token):
+        """Test that a cached token does not vouch for a modified one."""
+        token, jwks_client = signed_token
+        await auth.decode_token(token, jwks_client)
+
+        header, payload, signature = token.split(".")
+        with pytest.raises(jwt.JWTError):
+            await auth.decode_token(f"{header}.{payload}.{signature[:-4]}AAAA", jwks_client)
+
+
+class TestProvisionUser:
+    """Tests for auth.provision_user."""
+
+    def setup_method(self):
+        self.db = MagicMock()
+        self.db.users.update_one = AsyncMock(return_value=MagicMock(upserted_id="new_id"))
+        self.payload = {"sub": "user_1", "email": "user@example.com"}
+
+    @pytest.mark.asyncio
+    async def test_known_users_skip_the_database(self, monkeypatch):
+        """Test that only the first request for a user reaches MongoDB."""
+        monkeypatch.setattr(auth, "known_users", TTLCache())
+
+        await auth.provision_user(self.db, self.payload)
+        await auth.provision_user(self.db, self.payload)
+
+        self.db.users.update_one.assert_awaited_once()
+        filter_doc, update = self.db.users.update_one.call_args.args
+        assert filter_doc == {"id": "user_1"}
+        assert update["$setOnInsert"]["email"] == "user@example.com"
+        assert update["$setOnInsert"]["username"] == "user_user_1"
+        assert self.db.users.update_one.call_args.kwargs == {"upsert": True}
+        self.db.users.find_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_insert_counts_as_existing(self, monkeypatch):
+        """Test that losing an upsert race on the unique id index is not an error."""
+        monkeypatch.setattr(auth, "known_users", TTLCache())
+        self.db.users.update_one = AsyncMock(side_effect=DuplicateKeyError("E11000 duplicate key"))
+
+        await auth.provision_user(self.db, self.payload)
+
+        assert "user_1" in auth.known_users
+
+    @pytest.mark.asyncio
+    async def test_tokens_without_email_are_not_provisioned(self, monkeypatch):
+        """Test that users are only created from tokens carrying an email."""
+        monkeypatch.setattr(auth, "known_users", TTLCache())
+
+        await auth.provision_user(self.db, {"sub": "user_1"})
+
+        self.db.users.update_one.assert_not_called()
+
+
+def make_request(headers=None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    })
+
+
+class TestAuthenticateRequest:
+    """Tests for the per-request auth resolver shared by the auth dependencies."""
+
+    @pytest.mark.asyncio
+    async def test_principal_is_resolved_once_per_request(self, signed_token, monkeypatch):
+        """Test that optional and required dependencies share one resolution."""
+        token, jwks_client = signed_token
+        monkeypatch.setattr(auth, "known_users", TTLCache())
+        db = MagicMock()
+        db.users.update_one = AsyncMock(return_value=MagicMock(upserted_id=None))
+        request = make_request({"Authorization": f"Bearer {token}"})
+
+        with patch("auth.decode_token", wraps=auth.decode_token) as decode:
+            optional = await auth.get_optional_current_user(request, None, jwks_client)
+            required = await auth.verify_clerk_token(request, None, db, jwks_client)
+
+        assert optional["sub"] == required["sub"] == "user_1"
+        assert decode.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_token(self, signed_token):
+        """Test that a missing token is None when optional and 401 when required."""
+        _, jwks_client = signed_token
+        request = make_request()
+
+        assert await auth.get_optional_current_user(request, None, jwks_client) is None
+        with pytest.raises(HTTPException) as error:
+            await auth.verify_clerk_token(request, None, MagicMock(), jwks_client)
+
+        assert error.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_unknown_key_is_unauthorized(self, signed_token):
+        """Test that rejections raised while verifying stay 401 instead of becoming 500."""
+        token, _ = signed_token
+        _, other_jwk = make_signing_key("other")
+        jwks_client = JWKSClient("https://example.com/jwks", session=make_session([other_jwk], [other_jwk]))
+        request = make_request({"Authorization": f"Bearer {token}"})
+
+        with pytest.raises(HTTPException) as error:
+            await auth.verify_clerk_token(request, None, MagicMock(), jwks_client)
+
+        assert error.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_validation_and_missing_token_are_logged_without_secrets(self, signed_token, monkeypatch, caplog):
+        """Test that successful validations log the user id and a missing token logs no headers."""
+        token, jwks_client = signed_token
+        monkeypatch.setattr(auth, "known_users", TTLCache())
+
+        with caplog.at_level(logging.INFO, logger="auth"):
+            await auth.get_optional_current_user(make_request({"Authorization": f"Bearer {token}"}), None, jwks_client)
+            with pytest.raises(HTTPException):
+                await auth.verify_clerk_token(make_request({"Cookie": "session=abc"}), None, MagicMock(), jwks_client)
+
+        validated, missing = caplog.records
+        assert validated.getMessage() == "Token validated"
+        assert validated.user_id == "user_1"
+        assert missing.levelname == "WARNING"
+        assert "session=abc" not in missing.getMessage()
+
+
+class TestRequireMetricsAccess:
+    """Tests for the /api/metrics access check."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_token_is_accepted(self, signed_token, monkeypatch):
+        """Test that the configured metrics token is enough on its own."""
+        _, jwks_client = signed_token
+        monkeypatch.setattr(auth, "METRICS_TOKEN", "secret")
+
+        await auth.require_metrics_access(make_request({"X-Metrics-Token": "secret"}), None, MagicMock(), jwks_client)
+
+        with pytest.raises(HTTPException) as error:
+            await auth.require_metrics_access(make_request({"X-Metrics-Token": "wrong"}), None, MagicMock(), jwks_client)
+        assert error.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_only_admins_are_allowed(self, signed_token, monkeypatch):
+        """Test that authenticated users need the admin flag."""
+        token, jwks_client = signed_token
+        monkeypatch.setattr(auth, "METRICS_TOKEN", None)
+        db = MagicMock()
+
+        db.users.find_one = AsyncMock(return_value={"id": "user_1", "is_admin": True})
+        await auth.require_metrics_access(make_request({"Authorization": f"Bearer {token}"}), None, db, jwks_client)
+
+        db.users.find_one = AsyncMock(return_value={"id": "user_1", "is_admin": False})
+        with pytest.raises(HTTPException) as error:
+            await auth.require_metrics_access(make_request({"Authorization": f"Bearer {token}"}), None, db, jwks_client)
+        assert error.value.status_code == 403
@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import patch
+from services.cache import TTLCache
+
+class TestTTLCache:
+    """Tests for the TTLCache class."""
+
+    def test_get_returns_copy(self):
+        """Test that cached values cannot be mutated by callers."""
+        cache = TTLCache()
+        cache.set("key", {"results": [1, 2]}, ttl=60)
+
+        value = cache.get("key")
+        value["results"].append(3)
+
+        assert cache.get("key") == {"results": [1, 2]}
+        assert cache.hits == 2
+
+    def test_expired_entry_is_a_miss(self):
+        """Test that entries past their TTL are not returned."""
+        cache = TTLCache()
+        with patch("services.cache.time.monotonic", return_value=100.0):
+            cache.set("key", {"a": 1}, ttl=10)
+        with patch("services.cache.time.monotonic", return_value=111.0):
+            assert cache.get("key") is None
+
+        assert cache.misses == 1
+        assert len(cache) == 0
+
+    def test_lru_eviction_by_entry_count(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.evictions == 1
+
+    def test_eviction_by_byte_cap(self):
+        """Test that the byte cap is enforced."""
+        cache = TTLCache(max_bytes=30)
+        cache.set("a", "x" * 10, ttl=60)
+        cache.set("b", "y" * 10, ttl=60)
+        cache.set("c", "z" * 10, ttl=60)
+
+        assert len(cache) == 2
+        assert cache.stats()["bytes"] <= 30
+        assert "a" not in cache
+
+    def test_set_payload_stores_raw_bytes(self):
+        """Test that pre-serialized payloads are stored as given."""
+        cache = TTLCache()
+        cache.set_payload("key", b"\x1f\x8b compressed", ttl=60)
+
+        entry = cache.get_entry("key")
+
+        assert entry.payload == b"\x1f\x8b compressed"
+        assert cache.stats()["bytes"] == len(b"\x1f\x8b compressed")
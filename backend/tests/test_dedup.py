@@ -0,0 +1,73 @@
+from unittest.mock import patch
+from services.dedup import BloomFilter, SeenResultsStore, drop_seen, mark_seen
+
+class TestBloomFilter:
+    """Tests for the BloomFilter class."""
+
+    def test_added_items_are_always_found(self):
+        seen = BloomFilter(capacity=1000, error_rate=0.01)
+        for number in range(1000):
+            seen.add(f"id-{number}")
+
+        assert all(f"id-{number}" in seen for number in range(1000))
+
+    def test_false_positive_rate_near_target(self):
+        """Test that a full filter stays close to its configured error rate."""
+        seen = BloomFilter(capacity=1000, error_rate=0.01)
+        for number in range(1000):
+            seen.add(f"id-{number}")
+
+        false_positives = sum(f"other-{number}" in seen for number in range(10000))
+
+        assert false_positives < 300
+
+    def test_stays_a_few_kilobytes(self):
+        assert BloomFilter(capacity=2000, error_rate=0.01).nbytes < 4096
+
+class TestSeenResultsStore:
+    """Tests for the SeenResultsStore class."""
+
+    def test_token_returns_same_filter(self):
+        store = SeenResultsStore()
+        token, seen = store.session()
+        seen.add("a")
+
+        same_token, same_seen = store.session(token)
+
+        assert same_token == token
+        assert "a" in same_seen
+
+    def test_unknown_or_expired_tokens_start_new_sessions(self):
+        store = SeenResultsStore(ttl=10)
+        with patch("services.dedup.time.monotonic", return_value=100.0):
+            token, _ = store.session()
+
+        with patch("services.dedup.time.monotonic", return_value=111.0):
+            new_token, _ = store.session(token)
+
+        assert new_token != token
+        assert store.expired == 1
+        assert store.session("made-up")[0] != "made-up"
+
+    def test_least_recently_used_sessions_are_dropped(self):
+        store = SeenResultsStore(max_sessions=2)
+        first, _ = store.session()
+        second, _ = store.session()
+        store.session(first)
+        store.session()
+
+        assert store.session(first)[0] == first
+        assert store.session(second)[0] != second
+
+def test_drop_seen_and_mark_seen():
+    seen = BloomFilter()
+    mark_seen([{"id": "a"}], seen)
+
+    remaining, dropped = drop_seen(
+        [{"id": "a"}, {"id": "b"}, {"id": "b"}, {"id": "c"}, {"title": "no id"}],
+        seen,
+        exclude=[{"id": "c"}]
+    )
+
+    assert remaining == [{"id": "b"}, {"title": "no id"}]
+    assert dropped == 3
@@ -0,0 +1,174 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from services.jwks import JWKSClient
+
+
+def make_signing_key(kid: str):
+    """Return a PEM private key and the matching public JWK."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    public_jwk = jwk.construct(pem, "RS256").public_key().to_dict()
+    public_jwk["kid"] = kid
+    return pem, public_jwk
+
+
+def make_session(*key_sets, delay: float = 0.0):
+    """Return a mock aiohttp session serving the given key sets in turn."""
+    responses = iter(key_sets)
+    session = MagicMock()
+
+    def get(url, **kwargs):
+        keys = next(responses)
+
+        async def json(content_type=None):
+            await asyncio.sleep(delay)
+            return {"keys": keys}
+
+        response = AsyncMock()
+        response.raise_for_status = MagicMock()
+        response.json = json
+        context = AsyncMock()
+        context.__aenter__.return_value = response
+        return context
+
+    session.get = MagicMock(side_effect=get)
+    return session
+
+
+class TestJWKSClient:
+    """Tests for the JWKSClient class."""
+
+    @pytest.mark.asyncio
+    async def test_parsed_keys_verify_tokens(self):
+        """Test that keys are parsed once and usable for jwt.decode."""
+        pem, public_jwk = make_signing_key("k1")
+        session = make_session([public_jwk])
+        client = JWKSClient("https://example.com/jwks", session=session)
+        token = jwt.encode({"sub": "user_1"}, pem, algorithm="RS256", headers={"kid": "k1"})
+
+        key = await client.get_key("k1")
+        assert await client.get_key("k1") is key
+
+        assert jwt.decode(token, key, algorithms=["RS256"])["sub"] == "user_1"
+        assert session.get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_fetches_are_coalesced(self):
+        """Test that concurrent callers share a single request."""
+        _, public_jwk = make_signing_key("k1")
+        session = make_session([public_jwk], delay=0.01)
+        client = JWKSClient("https://example.com/jwks", session=session)
+
+        keys = await asyncio.gather(*(client.get_key("k1") for _ in range(10)))
+
+        assert all(key is keys[0] for key in keys)
+        assert session.get.call_count == 1
+        assert client.stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refetches_at_most_once_per_interval(self):
+        """Test that unknown key ids trigger a throttled refetch."""
+        _, old_jwk = make_signing_key("old")
+        _, new_jwk = make_signing_key("new")
+        session = make_session([old_jwk], [old_jwk, new_jwk])
+        client = JWKSClient("https://example.com/jwks", session=session, min_refetch_interval=30)
+
+        with patch("services.jwks.time.monotonic", return_value=100.0):
+            await client.get_key("old")
+            assert await client.get_key("new") is None
+        with patch("services.jwks.time.monotonic", return_value=131.0):
+            assert await client.get_key("new") is not None
+            assert await client.get_key("missing") is None
+
+        assert session.get.call_count == 2
+        assert client.throttled == 2
+
+    @pytest.mark.asyncio
+    async def test_callers_join_first_fetch_in_flight(self):
+        """Test that a caller arriving during the first fetch waits for it instead of failing."""
+        _, public_jwk = make_signing_key("k1")
+        session = make_session([public_jwk], delay=0.05)
+        client = JWKSClient("https://example.com/jwks", session=session, min_refetch_interval=30)
+
+        first = asyncio.ensure_future(client.get_key("k1"))
+        await asyncio.sleep(0.01)
+        key = await client.get_key("k1")
+
+        assert key is not None
+        assert await first is key
+        assert session.get.call_count == 1
+        assert client.throttled == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_joins_refetch_in_flight(self):
+        """Test that a rotated key is found by callers arriving during the refetch."""
+        _, old_jwk = make_signing_key("old")
+        _, new_jwk = make_signing_key("new")
+        session = make_session([old_jwk], [old_jwk, new_jwk], delay=0.05)
+        client = JWKSClient("https://example.com/jwks", session=session, min_refetch_interval=30)
+        await client.get_key("old")
+        client._last_fetch -= 30
+
+        first = asyncio.ensure_future(client.get_key("new"))
+        await asyncio.sleep(0.01)
+        key = await client.get_key("new")
+
+        assert key is not None
+        assert await first is key
+        assert session.get.call_count == 2
+        assert client.throttled == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_keys_are_served_while_refreshing_in_background(self):
+        """Test that callers never wait on a refresh once keys are cached."""
+        _, public_jwk = make_signing_key("k1")
+        session = make_session([public_jwk], [], delay=0.05)
+        client = JWKSClient("https://example.com/jwks", session=session, ttl=0, min_refetch_interval=0)
+        key = await client.get_key("k1")
+
+        started = asyncio.get_running_loop().time()
+        for _ in range(3):
+            assert await client.get_key("k1") is key
+        elapsed = asyncio.get_running_loop().time() - started
+        await client._refreshing
+
+        assert elapsed < 0.05
+        assert session.get.call_count == 2
+        assert client.failed_fetches == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_previous_keys(self):
+        """Test that expired keys are still served while the endpoint fails."""
+        _, public_jwk = make_signing_key("k1")
+        session = make_session([public_jwk], [])
+        client = JWKSClient("https://example.com/jwks", session=session, ttl=0, min_refetch_interval=0)
+
+        key = await client.get_key("k1")
+        assert await client.get_key("k1") is key
+        await client._refreshing
+
+        assert await client.get_key("k1") is key
+        assert client.failed_fetches == 1
+        await client.stop()
+
+    @pytest.mark.asyncio
+    async def test_first_fetch_failure_is_raised_and_throttled(self):
+        """Test that a failure with no cached keys reaches the caller without refetching each time."""
+        session = make_session([], [])
+        client = JWKSClient("https://example.com/jwks", session=session)
+
+        with pytest.raises(ValueError):
+            await client.get_key("k1")
+        with pytest.raises(ValueError):
+            await client.get_key("k1")
+
+        assert session.get.call_count == 1
+        assert client.throttled == 1
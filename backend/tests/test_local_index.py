@@ -0,0 +1,145 @@
+import asyncio
+import pytest
+from services.local_index import LocalMediaIndex, tokenize
+
+RESULTS = [
+    {"id": "1", "title": "Red fox in the snow", "creator": "Alice", "license": "by", "tags": [{"name": "fox"}, {"name": "winter"}]},
+    {"id": "2", "title": "Fox", "creator": "Bob", "license": "cc0", "tags": [{"name": "animal"}]},
+    {"id": "3", "title": "Mountain lake", "creator": "Carol", "license": "by", "tags": [{"name": "water"}]},
+]
+
+def build_index(**kwargs) -> LocalMediaIndex:
+    index = LocalMediaIndex(**kwargs)
+    index.add_many(RESULTS, "images")
+    index.add({"id": "4", "title": "Fox call", "creator": "Dan", "license": "by", "media_type": "audio"})
+    return index
+
+def ids(result):
+    return [item["id"] for item in result["results"]]
+
+def test_tokenize_normalizes_text():
+    assert tokenize("Ｒed FOX, snow-fall") == ["red", "fox", "snow", "fall"]
+
+def test_bm25_ranks_shorter_matching_documents_first():
+    """Test that a short title matching the query outranks a longer one."""
+    result = build_index().search("fox", media_types=["images"])
+
+    assert ids(result) == ["2", "1"]
+    assert result["results"][0]["media_type"] == "image"
+    assert result["result_count"] == 2
+
+def test_filters_by_media_type_and_license():
+    index = build_index()
+
+    assert ids(index.search("fox", media_types=["audio"])) == ["4"]
+    assert sorted(ids(index.search("fox", license_type="by"))) == ["1", "4"]
+    assert ids(index.search("fox", media_types=["images"], license_type="cc0")) == ["2"]
+
+def test_readding_an_item_replaces_it():
+    """Test that incremental updates re-index a document in place."""
+    index = build_index()
+    index.add({"id": "3", "title": "Arctic fox den", "license": "by"}, "images")
+
+    assert "3" in ids(index.search("fox", media_types=["images"]))
+    assert ids(index.search("lake")) == []
+    assert len(index) == 4
+
+def test_oldest_documents_are_dropped_over_capacity():
+    index = build_index(max_documents=2)
+
+    assert len(index) == 2
+    assert ids(index.search("snow")) == []
+    assert ids(index.search("fox")) == ["4"]
+    assert ids(index.search("lake")) == ["3"]
+
+def test_pagination():
+    index = LocalMediaIndex()
+    index.add_many([{"id": str(number), "title": "tree"} for number in range(5)], "images")
+
+    result = index.search("tree", page=2, page_size=2)
+
+    assert len(result["results"]) == 2
+    assert result["page_count"] == 3
+
+def test_snapshot_round_trip(tmp_path):
+    """Test that a saved snapshot is memory-mapped with identical search results."""
+    path = str(tmp_path / "index.bin")
+    index = build_index(path=path)
+    expected = index.search("fox")
+    index.save()
+
+    restored = LocalMediaIndex(path=path)
+    restored.load()
+
+    assert restored.search("fox") == expected
+    assert len(restored) == 4
+    restored.close()
+
+def test_updates_after_loading_shadow_the_snapshot(tmp_path):
+    path = str(tmp_path / "index.bin")
+    build_index(path=path).save()
+
+    index = LocalMediaIndex(path=path)
+    index.load()
+    index.add({"id": "2", "title": "Sleeping cat", "license": "cc0"}, "images")
+    index.add({"id": "5", "title": "Fox cub", "license": "by"}, "images")
+
+    assert "2" not in ids(index.search("fox"))
+    assert "5" in ids(index.search("fox"))
+    assert ids(index.search("cat")) == ["2"]
+
+    index.save()
+    index.close()
+    reloaded = LocalMediaIndex(path=path)
+    reloaded.load()
+    assert ids(reloaded.search("cat")) == ["2"]
+    assert len(reloaded) == 5
+    reloaded.close()
+
+def test_bookmarks_do_not_replace_richer_documents():
+    index = build_index()
+    index.add_bookmark({"media_id": "1", "media_title": "Bookmarked", "media_type": "image", "media_url": "http://x"})
+    index.add_bookmark({"media_id": "9", "media_title": "Saved fox", "media_type": "image", "media_url": "http://y"})
+
+    assert ids(index.search("bookmarked")) == []
+    assert "9" in ids(index.search("fox"))
+
+def test_load_requires_empty_index(tmp_path):
+    path = str(tmp_path / "index.bin")
+    build_index(path=path).save()
+
+    with pytest.raises(RuntimeError):
+        build_index(path=path).load()
+
+def test_readding_in_memory_documents_keeps_postings_bounded():
+    index = LocalMediaIndex(max_documents=100)
+    for round_number in range(20):
+        for item_id in range(100):
+            index.add({"id": str(item_id), "title": f"fox {round_number}"}, "images")
+
+    assert len(index._deleted) == 0
+    assert sum(len(postings) for postings in index._postings.values()) == 200
+    assert index.search("fox")["result_count"] == 100
+
+@pytest.mark.asyncio
+async def test_save_async_writes_in_a_thread_while_adds_continue(tmp_path):
+    path = str(tmp_path / "index.bin")
+    index = build_index(path=path)
+
+    save = asyncio.ensure_future(index.save_async())
+    while index.stats()["dirty"]:
+        await asyncio.sleep(0)
+    index.add({"id": "5", "title": "Fox cub", "license": "by"}, "images")
+    await save
+
+    assert index.stats()["dirty"] is True
+    reloaded = LocalMediaIndex(path=path)
+    reloaded.load()
+    assert len(reloaded) == 4
+    reloaded.close()
+
+    await index.stop()
+    reloaded = LocalMediaIndex(path=path)
+    reloaded.load()
+    assert "5" in ids(reloaded.search("fox"))
+    reloaded.close()
@@ -0,0 +1,70 @@
+import json
+import logging
+import queue
+import pytest
+from logging_config import (
+    JSONFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    parse_sample_rates,
+    redact
+)
+
+
+def make_record(name="app", level=logging.INFO, msg="message", args=None, **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_redact_masks_tokens_and_emails():
+    text = redact("Bearer abc.def-123 sent eyJhbGciOi.eyJzdWIi.c2ln by user@example.com")
+
+    assert "abc.def-123" not in text
+    assert "eyJhbGciOi" not in text
+    assert "user@example.com" not in text
+
+
+def test_json_formatter_includes_and_redacts_extras():
+    record = make_record(msg="Created user %s", args=("user@example.com",), user_id="user_1", authorization="secret")
+
+    entry = json.loads(JSONFormatter().format(record))
+
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app"
+    assert entry["message"] == "Created user [REDACTED]"
+    assert entry["user_id"] == "user_1"
+    assert entry["authorization"] == "[REDACTED]"
+
+
+def test_parse_sample_rates_clamps_and_skips_malformed_pairs():
+    assert parse_sample_rates("uvicorn.access=0.1, auth=2, broken") == {"uvicorn.access": 0.1, "auth": 1.0}
+
+
+def test_sampling_filter_uses_most_specific_logger():
+    sampler = SamplingFilter({"services": 0.0, "services.jwks": 1.0})
+
+    assert sampler.filter(make_record(name="services.jwks"))
+    assert not sampler.filter(make_record(name="services.search_service"))
+    assert sampler.filter(make_record(name="main"))
+    assert sampler.dropped == 1
+
+
+def test_sampling_filter_never_drops_warnings():
+    sampler = SamplingFilter({"": 0.0, "app": 0.0})
+
+    assert sampler.filter(make_record(level=logging.WARNING))
+    assert not sampler.filter(make_record(level=logging.INFO))
+
+
+def test_queue_handler_drops_records_when_full():
+    handler = NonBlockingQueueHandler(queue.Queue(1))
+
+    handler.handle(make_record(msg="first %s", args=("call",)))
+    handler.handle(make_record(msg="second"))
+
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "first call"
+    assert queued.args is None
+    assert handler.dropped == 1
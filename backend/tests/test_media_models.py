@@ -0,0 +1,77 @@
+import pytest
+from services.media_models import MediaCard, CARD_FIELDS, parse_fields, project_results
+
+FULL_RESULT = {
+    "id": "abc",
+    "title": "Forest",
+    "thumbnail": "http://example.com/thumb.jpg",
+    "url": "http://example.com/image.jpg",
+    "creator": "Test Creator",
+    "creator_url": "http://example.com/creator",
+    "license": "by",
+    "license_version": "4.0",
+    "license_url": "http://creativecommons.org/licenses/by/4.0/",
+    "provider": "flickr",
+    "foreign_landing_url": "http://example.com/landing",
+    "attribution": "\"Forest\" by Test Creator is licensed under CC BY 4.0.",
+    "fields_matched": ["title"],
+    "tags": [{"name": "forest"}, {"name": "tree"}, {"name": "green"}, {"name": "leaf"}],
+    "height": 600,
+    "width": 800,
+    "mature": False
+}
+
+class TestMediaModels:
+    """Tests for result projection and the MediaCard model."""
+
+    def test_card_keeps_grid_fields_only(self):
+        """Test that the card shape drops fields the grid does not render."""
+        card = MediaCard.from_result(FULL_RESULT).to_dict()
+
+        assert card["id"] == "abc"
+        assert card["thumbnail"] == "http://example.com/thumb.jpg"
+        assert card["tags"] == ["forest", "tree", "green"]
+        assert "attribution" not in card
+        assert "height" not in card
+        assert "filetype" not in card
+
+    def test_default_audio_card_keeps_player_fields(self):
+        """Test that audio results keep the fields the audio card renders."""
+        audio = {
+            "id": "snd",
+            "title": "Rain",
+            "url": "http://example.com/rain.mp3",
+            "duration": 42000,
+            "filesize": 1048576,
+            "waveform": "http://example.com/waveform",
+            "audio_set": {"title": "Weather"},
+            "related_url": "http://example.com/related",
+            "bit_rate": 128000
+        }
+
+        card, = project_results([audio], parse_fields(None))
+
+        assert card["waveform"] == "http://example.com/waveform"
+        assert card["filesize"] == 1048576
+        assert card["audio_set"] == {"title": "Weather"}
+        assert card["related_url"] == "http://example.com/related"
+        assert "bit_rate" not in card
+
+    def test_parse_fields(self):
+        """Test parsing of the fields parameter."""
+        assert parse_fields(None) is CARD_FIELDS
+        assert parse_fields("card") is CARD_FIELDS
+        assert parse_fields("full") is None
+        assert parse_fields("title, url,title") == ("id", "title", "url")
+        with pytest.raises(ValueError):
+            parse_fields(" , ")
+
+    def test_project_results(self):
+        """Test projection to full, card and explicit field lists."""
+        results = [FULL_RESULT]
+
+        assert project_results(results, None) is results
+        assert project_results(results, parse_fields("title,width,missing")) == [
+            {"id": "abc", "title": "Forest", "width": 800}
+        ]
+        assert project_results(results, CARD_FIELDS)[0]["license"] == "by"
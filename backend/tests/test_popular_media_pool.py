@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from services.popular_media_pool import PopularMediaPool
+from services.rate_limiter import TokenBucket
+
+class TestPopularMediaPool:
+    """Tests for the PopularMediaPool class."""
+
+    def setup_method(self):
+        """Set up test environment before each test."""
+        self.search_service = MagicMock()
+        self.pool = PopularMediaPool(
+            self.search_service,
+            seed_terms=["nature", "art"],
+            media_types=["images"],
+            pages=2,
+            page_size=10
+        )
+
+    def test_sample_before_refresh_returns_none(self):
+        """Test that a cold pool reports it has nothing to sample."""
+        assert self.pool.sample("images", 5) is None
+
+    @pytest.mark.asyncio
+    async def test_refresh_fills_pool_from_all_seed_pages(self):
+        """Test that refresh searches every term and page and de-duplicates results."""
+        async def search_media(query, media_type, page, page_size):
+            return {"results": [{"id": f"{query}-{page}"}, {"id": "shared"}]}
+
+        self.search_service.search_media = AsyncMock(side_effect=search_media)
+
+        await self.pool.refresh()
+
+        assert self.search_service.search_media.call_count == 4
+        assert self.pool.stats()["sizes"] == {"images": 5}
+        sample = self.pool.sample("images", 3)
+        assert len(sample) == 3
+        assert len({item["id"] for item in sample}) == 3
+
+    @pytest.mark.asyncio
+    async def test_seeded_sample_is_repeatable(self):
+        """Test that the same seed returns the same items until the next refresh."""
+        self.search_service.search_media = AsyncMock(return_value={
+            "results": [{"id": str(number)} for number in range(30)]
+        })
+        await self.pool.refresh()
+
+        first = self.pool.sample("images", 5, seed=7)
+
+        assert self.pool.sample("images", 5, seed=7) == first
+        assert any(self.pool.sample("images", 5, seed=seed) != first for seed in range(8, 12))
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_previous_pool(self):
+        """Test that an upstream outage does not empty a warm pool."""
+        self.search_service.search_media = AsyncMock(return_value={"results": [{"id": "1"}]})
+        await self.pool.refresh()
+
+        self.search_service.search_media = AsyncMock(side_effect=Exception("Openverse API error: 503"))
+        await self.pool.refresh()
+
+        assert self.pool.sample("images", 5) == [{"id": "1"}]
+        assert self.pool.failed_fetches == 4
+
+    @pytest.mark.asyncio
+    async def test_seed_searches_leave_reserved_tokens(self):
+        """Test that the warmer waits instead of draining the shared rate limiter."""
+        limiter = TokenBucket(rate=100, burst=4)
+        pool = PopularMediaPool(
+            self.search_service,
+            seed_terms=["nature", "art"],
+            media_types=["images"],
+            pages=2,
+            rate_limiter=limiter,
+            reserved_tokens=2
+        )
+
+        async def search_media(query, media_type, page, page_size):
+            assert await limiter.acquire()
+            return {"results": [{"id": f"{query}-{page}"}]}
+
+        self.search_service.search_media = AsyncMock(side_effect=search_media)
+
+        assert await pool.refresh() == 0
+        assert pool.stats()["sizes"] == {"images": 4}
+        assert pool.paced > 0
+
+    @pytest.mark.asyncio
+    async def test_failed_pages_are_retried_after_retry_interval(self):
+        """Test that a partial refresh is retried soon instead of after a full interval."""
+        self.pool.retry_interval = 5
+        self.search_service.search_media = AsyncMock(side_effect=Exception("Openverse API rate limit reached"))
+        sleeps = []
+
+        async def sleep(delay):
+            sleeps.append(delay)
+            raise asyncio.CancelledError
+
+        with patch("services.popular_media_pool.asyncio.sleep", side_effect=sleep):
+            with pytest.raises(asyncio.CancelledError):
+                await self.pool.run()
+
+        assert sleeps == [5]
@@ -0,0 +1,56 @@
+from services.query_canonicalizer import canonicalize_search, normalize_list, normalize_text
+
+def test_case_whitespace_and_unicode_variants_share_a_key():
+    """Test that cosmetic query differences canonicalize to one identity."""
+    variants = [
+        canonicalize_search("Nature "),
+        canonicalize_search("nature"),
+        canonicalize_search("NATURE"),
+        canonicalize_search("Ｎature"),
+        canonicalize_search("  nature\t", media_type="images", page=1, page_size=20),
+    ]
+
+    assert {variant.key for variant in variants} == {variants[0].key}
+    assert {variant.search_key for variant in variants} == {variants[0].search_key}
+    assert all(variant == variants[0] for variant in variants)
+
+def test_query_keeps_the_users_casing():
+    """Test that only the keys are casefolded, not the query that is searched and saved."""
+    search = canonicalize_search("  Straße  im  Winter ")
+
+    assert search.query == "Straße im Winter"
+    assert search.folded_query == "strasse im winter"
+    assert search.key == canonicalize_search("STRASSE im winter").key
+
+def test_tags_are_sorted_and_deduplicated():
+    """Test that tag order, case and duplicates do not change the identity."""
+    first = canonicalize_search("forest", tags="Tree, green,tree")
+    second = canonicalize_search("forest", tags="green,TREE")
+
+    assert first.tags == "green,tree"
+    assert first.key == second.key
+
+def test_media_types_are_sorted():
+    """Test that comma-separated media types canonicalize regardless of order."""
+    assert canonicalize_search("sea", media_type="Audio, images").media_type == "audio,images"
+    assert canonicalize_search("sea").media_type == "images"
+
+def test_creator_keeps_its_case():
+    """Test that the creator filter is normalized without casefolding."""
+    assert canonicalize_search("sea", creator=" Jane  Doe ").creator == "Jane Doe"
+
+def test_page_changes_key_but_not_search_key():
+    """Test that pages of the same search share a search key but not a page key."""
+    first = canonicalize_search("sea", page=1)
+    second = canonicalize_search("sea", page=2)
+
+    assert first.key != second.key
+    assert first.search_key == second.search_key
+
+def test_filters_change_the_key():
+    """Test that different filters produce different identities."""
+    assert canonicalize_search("sea").key != canonicalize_search("sea", license_type="by").key
+
+def test_empty_values_normalize_to_none():
+    assert normalize_text("   ") is None
+    assert normalize_list(" , ,") is None
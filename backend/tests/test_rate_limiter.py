@@ -0,0 +1,83 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+from services.rate_limiter import TokenBucket, parse_retry_after
+
+class TestTokenBucket:
+    """Tests for the TokenBucket class."""
+
+    @pytest.mark.asyncio
+    async def test_allows_burst_then_rejects(self):
+        """Test that a full bucket grants burst tokens immediately and then rejects."""
+        bucket = TokenBucket(rate=1, burst=3)
+
+        for _ in range(3):
+            assert await bucket.acquire()
+
+        assert not await bucket.acquire()
+        assert bucket.granted == 3
+        assert bucket.rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_waits_briefly_for_refill(self):
+        """Test that a caller willing to wait gets the next refilled token."""
+        bucket = TokenBucket(rate=100, burst=1)
+        assert await bucket.acquire()
+
+        assert await bucket.acquire(max_wait=0.5)
+        assert bucket.waited == 1
+
+    @pytest.mark.asyncio
+    async def test_wait_for_spare_leaves_reserved_tokens(self):
+        """Test that background callers wait until the reserve plus one token is available."""
+        bucket = TokenBucket(rate=100, burst=4)
+        for _ in range(3):
+            assert await bucket.acquire()
+
+        assert await bucket.wait_for_spare(2)
+        assert bucket.available() >= 3
+        assert not await bucket.wait_for_spare(2)
+        assert bucket.deferred == 1
+
+    def test_refills_at_sustained_rate(self):
+        """Test that tokens refill over time without exceeding the burst size."""
+        with patch("services.rate_limiter.time.monotonic", return_value=100.0):
+            bucket = TokenBucket(rate=2, burst=4)
+            bucket._tokens = 0.0
+
+        with patch("services.rate_limiter.time.monotonic", return_value=101.0):
+            assert bucket.available() == 2.0
+
+        with patch("services.rate_limiter.time.monotonic", return_value=110.0):
+            assert bucket.available() == 4.0
+
+    @pytest.mark.asyncio
+    async def test_pause_blocks_until_retry_after(self):
+        """Test that a pause empties the bucket and delays refilling."""
+        with patch("services.rate_limiter.time.monotonic", return_value=100.0):
+            bucket = TokenBucket(rate=10, burst=5)
+            bucket.pause(30)
+            assert bucket.available() == 0.0
+            assert not await bucket.acquire(max_wait=1)
+
+        with patch("services.rate_limiter.time.monotonic", return_value=129.0):
+            assert bucket.available() == 0.0
+
+        with patch("services.rate_limiter.time.monotonic", return_value=130.5):
+            assert bucket.available() == 5.0
+            assert await bucket.acquire()
+
+class TestParseRetryAfter:
+    """Tests for parse_retry_after."""
+
+    def test_parses_delay_seconds(self):
+        assert parse_retry_after("120") == 120.0
+
+    def test_parses_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+        assert 55 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 60
+
+    def test_ignores_missing_or_malformed_values(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import patch
+from services.resilience import CircuitBreaker, AdaptiveConcurrencyLimiter, LatencyTracker
+
+class TestCircuitBreaker:
+    """Tests for the CircuitBreaker class."""
+
+    def test_opens_when_failure_rate_exceeded(self):
+        """Test that the breaker opens after too many failures in the window."""
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, minimum_calls=4)
+        for success in (True, False, True, False):
+            assert breaker.allow_request()
+            breaker.record(success, latency=0.1)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+        assert breaker.rejected == 1
+
+    def test_opens_when_calls_are_slow(self):
+        """Test that slow successful calls also open the breaker."""
+        breaker = CircuitBreaker(slow_call_threshold=1.0, slow_call_rate_threshold=0.5, minimum_calls=2)
+        breaker.record(True, latency=2.0)
+        breaker.record(True, latency=2.0)
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_half_open_probes_close_the_breaker(self):
+        """Test that successful probes after the open period close the breaker."""
+        breaker = CircuitBreaker(minimum_calls=1, open_duration=30, half_open_max_calls=2)
+        with patch("services.resilience.time.monotonic", return_value=100.0):
+            breaker.record(False, latency=0.1)
+            assert breaker.state == CircuitBreaker.OPEN
+
+        with patch("services.resilience.time.monotonic", return_value=131.0):
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert breaker.allow_request()
+            assert breaker.allow_request()
+            assert not breaker.allow_request()
+            breaker.record(True, latency=0.1)
+            breaker.record(True, latency=0.1)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_failure_reopens(self):
+        """Test that a failed probe opens the breaker again."""
+        breaker = CircuitBreaker(minimum_calls=1, open_duration=0)
+        breaker.record(False, latency=0.1)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        assert breaker.allow_request()
+        breaker.record(False, latency=0.1)
+
+        assert breaker._state == CircuitBreaker.OPEN
+        assert breaker.times_opened == 2
+
+class TestAdaptiveConcurrencyLimiter:
+    """Tests for the AdaptiveConcurrencyLimiter class."""
+
+    def test_rejects_over_limit(self):
+        """Test that calls beyond the limit are rejected rather than queued."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+        assert limiter.try_acquire()
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+        assert limiter.rejected == 1
+
+    def test_additive_increase_multiplicative_decrease(self):
+        """Test that healthy calls grow the limit and failures shrink it."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_target=1.0, backoff_ratio=0.5)
+        for _ in range(10):
+            limiter.try_acquire()
+            limiter.release(True, latency=0.1)
+        assert limiter.stats()["limit"] == 10
+        assert limiter.limit > 10
+
+        limiter.try_acquire()
+        limiter.release(False, latency=0.1)
+        assert limiter.stats()["limit"] == 5
+
+        limiter.try_acquire()
+        limiter.release(True, latency=5.0)
+        assert limiter.stats()["limit"] == 2
+
+class TestLatencyTracker:
+    """Tests for the LatencyTracker class."""
+
+    def test_p95_requires_minimum_samples(self):
+        """Test that no percentile is reported before enough samples exist."""
+        tracker = LatencyTracker(min_samples=5)
+        for _ in range(4):
+            tracker.record(0.1)
+        assert tracker.p95() is None
+
+    def test_p95(self):
+        """Test the reported 95th percentile."""
+        tracker = LatencyTracker(min_samples=1)
+        for latency in range(1, 101):
+            tracker.record(latency / 100)
+        assert tracker.p95() == 0.96
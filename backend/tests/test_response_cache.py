@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from services.cache import TTLCache, decode_value
+from services.response_cache import (
+    ResponseCache, CACHE_FRESH, CACHE_STALE, CACHE_REVALIDATED, CACHE_MISS, cache_status
+)
+from services.singleflight import SingleFlight
+
+class TestResponseCache:
+    """Tests for the ResponseCache class."""
+
+    def make_cache(self, stale_ttl=0.0, error_ttl=0.0):
+        return ResponseCache(TTLCache(), SingleFlight(), stale_ttl=stale_ttl, error_ttl=error_ttl)
+
+    @pytest.mark.asyncio
+    async def test_miss_then_fresh(self):
+        """Test that a loaded value is served fresh on the next lookup."""
+        responses = self.make_cache()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            return {"n": calls}
+
+        payload, status = await responses.fetch("key", loader, ttl=60)
+        assert status == CACHE_MISS
+        payload, status = await responses.fetch("key", loader, ttl=60)
+        assert status == CACHE_FRESH
+        assert cache_status.get() == CACHE_FRESH
+        assert decode_value(payload) == {"n": 1}
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_revalidating(self):
+        """Test that a stale entry is served immediately and refreshed in the background."""
+        responses = self.make_cache(stale_ttl=60)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            return {"n": calls}
+
+        await responses.fetch("key", loader, ttl=0)
+        payload, status = await responses.fetch("key", loader, ttl=0)
+
+        assert status == CACHE_STALE
+        assert decode_value(payload) == {"n": 1}
+
+        await asyncio.sleep(0.01)
+        assert calls == 2
+        payload, status = await responses.fetch("key", loader, ttl=0)
+        assert decode_value(payload) == {"n": 2}
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_revalidated_synchronously(self):
+        """Test that an entry past its stale window is reloaded before serving."""
+        responses = self.make_cache()
+
+        async def loader():
+            return {"ok": True}
+
+        await responses.fetch("key", loader, ttl=0)
+        _, status = await responses.fetch("key", loader, ttl=0)
+
+        assert status == CACHE_MISS
+
+        responses = self.make_cache(error_ttl=60)
+        await responses.fetch("key", loader, ttl=0)
+        _, status = await responses.fetch("key", loader, ttl=0)
+
+        assert status == CACHE_REVALIDATED
+
+    @pytest.mark.asyncio
+    async def test_stale_if_error(self):
+        """Test that a stale entry is served when upstream fails."""
+        responses = self.make_cache(error_ttl=60)
+
+        async def loader():
+            return {"ok": True}
+
+        async def failing():
+            raise Exception("Openverse API error: 503")
+
+        await responses.fetch("key", loader, ttl=0)
+        payload, status = await responses.fetch("key", failing, ttl=0)
+
+        assert status == CACHE_STALE
+        assert decode_value(payload) == {"ok": True}
+        assert responses.counts["stale_if_error"] == 1
+
+    @pytest.mark.asyncio
+    async def test_error_without_stale_entry_is_raised(self):
+        """Test that failures propagate when nothing can be served."""
+        responses = self.make_cache()
+
+        async def failing():
+            raise Exception("Openverse API error: 503")
+
+        with pytest.raises(Exception) as exc_info:
+            await responses.fetch("key", failing, ttl=60)
+
+        assert "503" in str(exc_info.value)
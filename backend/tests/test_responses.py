@@ -0,0 +1,163 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from starlette.requests import Request
+
+from responses import (
+    ORJSONResponse,
+    ResponseCompressor,
+    cache_control,
+    compressor,
+    conditional_json_response,
+    dumps,
+    etag_matches,
+    parse_accept_encoding
+)
+from services.cache import TTLCache
+from schemas import StandardResponse
+
+
+def test_dumps_handles_datetime_and_object_id():
+    object_id = ObjectId()
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+    decoded = json.loads(dumps({"_id": object_id, "created_at": created_at}))
+
+    assert decoded == {"_id": str(object_id), "created_at": "2024-05-01T12:30:00+00:00"}
+
+
+def test_dumps_serializes_pydantic_models():
+    body = StandardResponse(success=True, message="ok", data={"items": [1, 2]})
+
+    decoded = json.loads(dumps({"response": body}))
+
+    assert decoded["response"]["success"] is True
+    assert decoded["response"]["data"] == {"items": [1, 2]}
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_orjson_response_renders_bytes():
+    response = ORJSONResponse({"results": [{"id": "a"}]}, headers={"X-Cache-Status": "fresh"})
+
+    assert response.body == b'{"results":[{"id":"a"}]}'
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["x-cache-status"] == "fresh"
+
+
+def make_request(headers=None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    })
+
+
+def test_conditional_response_sets_etag_and_cache_control():
+    response = conditional_json_response(make_request(), {"results": []}, cache_control(60))
+
+    assert response.status_code == 200
+    assert response.body == b'{"results":[]}'
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+
+def test_matching_if_none_match_returns_304():
+    etag = conditional_json_response(make_request(), {"id": "1"}, cache_control(60)).headers["etag"]
+
+    response = conditional_json_response(
+        make_request({"If-None-Match": f'"other", W/{etag}'}),
+        {"id": "1"},
+        cache_control(60, private=True)
+    )
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "private, max-age=60"
+
+
+def test_changed_content_gets_new_etag():
+    etag = conditional_json_response(make_request(), {"id": "1"}, cache_control(60)).headers["etag"]
+
+    response = conditional_json_response(make_request({"If-None-Match": etag}), {"id": "2"}, cache_control(60))
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_matches_wildcard():
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+LARGE_CONTENT = {"results": [{"id": str(index), "title": "Sunset over the harbour"} for index in range(100)]}
+
+
+def test_parse_accept_encoding_reads_q_values():
+    assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+    assert parse_accept_encoding(None) == {}
+
+
+def test_negotiate_skips_small_bodies_and_refused_codings():
+    negotiator = ResponseCompressor(min_size=100)
+
+    assert negotiator.negotiate("gzip", 99) is None
+    assert negotiator.negotiate("gzip", 100) == "gzip"
+    assert negotiator.negotiate("gzip;q=0", 100) is None
+    assert negotiator.negotiate("*", 100) in negotiator.encodings
+    assert negotiator.negotiate("identity", 100) is None
+
+
+def test_compressed_body_is_cached_by_etag():
+    cached = ResponseCompressor(cache=TTLCache())
+    body = dumps(LARGE_CONTENT)
+
+    first = cached.compress(body, "gzip", etag='"abc"')
+    second = cached.compress(body, "gzip", etag='"abc"')
+
+    assert second is first
+    assert gzip.decompress(first) == body
+    assert cached.compressed == 1
+    assert cached.reused == 1
+
+
+def test_conditional_response_compresses_large_bodies():
+    response = conditional_json_response(
+        make_request({"Accept-Encoding": "gzip"}),
+        LARGE_CONTENT,
+        cache_control(60),
+        headers={"Vary": "Authorization"}
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert response.headers["vary"] == "Authorization, Accept-Encoding"
+    assert json.loads(gzip.decompress(response.body)) == LARGE_CONTENT
+
+
+def test_conditional_response_leaves_small_bodies_uncompressed():
+    response = conditional_json_response(make_request({"Accept-Encoding": "gzip"}), {"id": "1"}, cache_control(60))
+
+    assert "content-encoding" not in response.headers
+    assert response.body == b'{"id":"1"}'
+
+
+def test_etag_of_any_coding_revalidates():
+    etag = conditional_json_response(
+        make_request({"Accept-Encoding": "gzip"}), LARGE_CONTENT, cache_control(60)
+    ).headers["etag"]
+    compressed_before = compressor.compressed
+
+    response = conditional_json_response(make_request({"If-None-Match": etag}), LARGE_CONTENT, cache_control(60))
+
+    assert response.status_code == 304
+    assert compressor.compressed == compressed_before
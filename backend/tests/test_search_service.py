@@ -1,15 +1,21 @@
+import asyncio
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 import aiohttp
 from services.search_service import SearchService
+from services.resilience import Deadline, UpstreamUnavailableError
+from services.rate_limiter import TokenBucket
+from services.response_cache import CACHE_PREFETCHED, cache_status
 
 class TestSearchService:
     """Tests for the SearchService class."""
-    
+
     def setup_method(self):
         """Set up test environment before each test."""
-        self.search_service = SearchService()
-    
+        self.mock_session = MagicMock()
+        self.mock_session.closed = False
+        self.search_service = SearchService(session=self.mock_session)
+
     @pytest.mark.asyncio
     async def test_search_media_successful(self):
         """Test search_media with successful API response."""
@@ -21,25 +27,40 @@ class TestSearchService:
                 {"id": "1", "title": "Test Image", "url": "http://example.com/image.jpg"}
             ]
         })
-        
-        mock_session = AsyncMock()
+
+        mock_session = self.mock_session
         mock_session.get.return_value = mock_response
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session):
-            result = await self.search_service.search_media(query="test")
-            
-            assert "results" in result
-            assert len(result["results"]) == 1
-            assert result["results"][0]["id"] == "1"
-            assert "search_info" in result
-            assert result["search_info"]["query"] == "test"
-            
-            mock_session.get.assert_called_once()
-            args, kwargs = mock_session.get.call_args
-            assert kwargs["params"]["q"] == "test"
-            assert kwargs["params"]["page"] == 1
-            assert kwargs["params"]["page_size"] == 20
-    
+
+        result = await self.search_service.search_media(query="test")
+
+        assert "results" in result
+        assert len(result["results"]) == 1
+        assert result["results"][0]["id"] == "1"
+        assert "search_info" in result
+        assert result["search_info"]["query"] == "test"
+
+        mock_session.get.assert_called_once()
+        args, kwargs = mock_session.get.call_args
+        assert kwargs["params"]["q"] == "test"
+        assert kwargs["params"]["page"] == 1
+        assert kwargs["params"]["page_size"] == 20
+
+    @pytest.mark.asyncio
+    async def test_request_timeout_keeps_connect_and_read_limits(self):
+        """Test that the per-request timeout bounds connect and read, not just the total."""
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+        mock_response.json = AsyncMock(return_value={"results": []})
+        self.mock_session.get.return_value = mock_response
+
+        await self.search_service.search_media(query="timeouts", deadline=Deadline(30))
+
+        timeout = self.mock_session.get.call_args.kwargs["timeout"]
+        assert timeout.total <= 30
+        assert timeout.connect == 3
+        assert timeout.sock_read == 8
+
     @pytest.mark.asyncio
     async def test_search_media_with_filters(self):
         """Test search_media with filters."""
@@ -47,38 +68,37 @@ class TestSearchService:
         mock_response.status = 200
         mock_response.__aenter__.return_value = mock_response
         mock_response.json = AsyncMock(return_value={"results": []})
-        
-        mock_session = AsyncMock()
+
+        mock_session = self.mock_session
         mock_session.get.return_value = mock_response
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session):
-            await self.search_service.search_media(
-                query="test",
-                media_type="audio",
-                page=2,
-                page_size=30,
-                license_type="cc0",
-                creator="test_creator",
-                tags="nature,water",
-                source="flickr"
-            )
-            
-            args, kwargs = mock_session.get.call_args
-            assert kwargs["params"]["q"] == "test"
-            assert kwargs["params"]["page"] == 2
-            assert kwargs["params"]["page_size"] == 30
-            assert kwargs["params"]["license"] == "cc0"
-            assert kwargs["params"]["creator"] == "test_creator"
-            assert kwargs["params"]["tags"] == "nature,water"
-            assert kwargs["params"]["source"] == "flickr"
-    
+
+        await self.search_service.search_media(
+            query="test",
+            media_type="audio",
+            page=2,
+            page_size=30,
+            license_type="cc0",
+            creator="test_creator",
+            tags="nature,water",
+            source="flickr"
+        )
+
+        args, kwargs = mock_session.get.call_args
+        assert kwargs["params"]["q"] == "test"
+        assert kwargs["params"]["page"] == 2
+        assert kwargs["params"]["page_size"] == 30
+        assert kwargs["params"]["license"] == "cc0"
+        assert kwargs["params"]["creator"] == "test_creator"
+        assert kwargs["params"]["tags"] == "nature,water"
+        assert kwargs["params"]["source"] == "flickr"
+
     def test_search_media_invalid_type(self):
         """Test search_media with invalid media type."""
         with pytest.raises(ValueError) as exc_info:
             self.search_service.search_media(query="test", media_type="invalid")
-        
+
         assert "Invalid media type" in str(exc_info.value)
-    
+
     @pytest.mark.asyncio
     async def test_search_media_api_error(self):
         """Test search_media with API error."""
@@ -86,16 +106,15 @@ class TestSearchService:
         mock_response.status = 500
         mock_response.__aenter__.return_value = mock_response
         mock_response.json = AsyncMock(return_value={"detail": "Server error"})
-        
-        mock_session = AsyncMock()
+
+        mock_session = self.mock_session
         mock_session.get.return_value = mock_response
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session):
-            with pytest.raises(Exception) as exc_info:
-                await self.search_service.search_media(query="test")
-            
-            assert "Openverse API error: 500" in str(exc_info.value)
-    
+
+        with pytest.raises(Exception) as exc_info:
+            await self.search_service.search_media(query="test")
+
+        assert "Openverse API error: 500" in str(exc_info.value)
+
     @pytest.mark.asyncio
     async def test_get_media_details(self):
         """Test get_media_details with successful API response."""
@@ -109,16 +128,461 @@ class TestSearchService:
             "creator": "Test Creator",
             "license": "CC BY"
         })
-        
-        mock_session = AsyncMock()
+
+        mock_session = self.mock_session
         mock_session.get.return_value = mock_response
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session):
-            result = await self.search_service.get_media_details(media_id="123")
-
-            assert result["id"] == "123"
-            assert result["title"] == "Detailed Image"
-            
-            mock_session.get.assert_called_once()
-            args = mock_session.get.call_args[0]
-            assert "123" in args[0]
\ No newline at end of file
+
+        result = await self.search_service.get_media_details(media_id="123")
+
+        assert result["id"] == "123"
+        assert result["title"] == "Detailed Image"
+
+        mock_session.get.assert_called_once()
+        args = mock_session.get.call_args[0]
+        assert "123" in args[0]
+
+    @pytest.mark.asyncio
+    async def test_requests_share_injected_session(self):
+        """Test that consecutive calls reuse the injected session."""
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+        mock_response.json = AsyncMock(return_value={"results": []})
+        self.mock_session.get.return_value = mock_response
+
+        with patch('aiohttp.ClientSession') as session_factory:
+            await self.search_service.search_media(query="test")
+            await self.search_service.get_media_details(media_id="123")
+
+            session_factory.assert_not_called()
+        assert self.mock_session.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_search_media_unseen_drops_repeats_and_refills(self):
+        """Test that delivered results are skipped and the page is refilled from the next one."""
+        pages = {
+            "1": {"page_count": 3, "results": [{"id": "a"}, {"id": "b"}]},
+            "2": {"page_count": 3, "results": [{"id": "b"}, {"id": "c"}]},
+            "3": {"page_count": 3, "results": [{"id": "c"}, {"id": "d"}]},
+        }
+
+        def respond(url, headers=None, params=None, timeout=None):
+            response = AsyncMock()
+            response.status = 200
+            response.__aenter__.return_value = response
+            response.json = AsyncMock(return_value=pages[str(params["page"])])
+            return response
+
+        self.mock_session.get.side_effect = respond
+        token, seen = self.search_service.seen_results.session()
+
+        first = await self.search_service.search_media_unseen(seen, query="test", page=1, page_size=2)
+        second = await self.search_service.search_media_unseen(seen, query="test", page=2, page_size=2)
+
+        assert [item["id"] for item in first["results"]] == ["a", "b"]
+        assert [item["id"] for item in second["results"]] == ["c", "d"]
+        assert second["dedup"] == {"dropped": 1, "refilled": 1}
+
+    @pytest.mark.asyncio
+    async def test_search_media_served_from_cache(self):
+        """Test that an identical search is answered from the cache."""
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+        mock_response.json = AsyncMock(return_value={"results": [{"id": "1"}]})
+        self.mock_session.get.return_value = mock_response
+
+        first = await self.search_service.search_media(query="Nature")
+        first["results"].append({"id": "mutated"})
+        second = await self.search_service.search_media(query=" nature ")
+
+        assert self.mock_session.get.call_count == 1
+        assert second["results"] == [{"id": "1"}]
+        assert second["search_info"]["query"] == " nature "
+        assert self.search_service.search_cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_equivalent_searches_share_cache_entry(self):
+        """Test that searches differing in case and tag order make one upstream call."""
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+        mock_response.json = AsyncMock(return_value={"results": [{"id": "1"}]})
+        self.mock_session.get.return_value = mock_response
+
+        await self.search_service.search_media(query="NATURE", tags="tree,Forest")
+        await self.search_service.search_media(query="nature", tags="forest, tree, tree")
+
+        assert self.mock_session.get.call_count == 1
+        params = self.mock_session.get.call_args.kwargs["params"]
+        assert params["q"] == "NATURE"
+        assert params["tags"] == "forest,tree"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_searches_are_coalesced(self):
+        """Test that concurrent identical searches make one upstream call."""
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+
+        async def slow_json():
+            await asyncio.sleep(0.01)
+            return {"results": [{"id": "1"}]}
+
+        mock_response.json = slow_json
+        self.mock_session.get.return_value = mock_response
+
+        results = await asyncio.gather(
+            *(self.search_service.search_media(query="nature") for _ in range(3))
+        )
+
+        assert self.mock_session.get.call_count == 1
+        assert all(result["results"] == [{"id": "1"}] for result in results)
+        assert results[0] is not results[1]
+
+    @pytest.mark.asyncio
+    async def test_prefetched_next_page_is_served_without_upstream_call(self):
+        """Test that a prefetched page is used by the following page request."""
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+        mock_response.json = AsyncMock(return_value={"results": [{"id": "2"}], "page_count": 5})
+        self.mock_session.get.return_value = mock_response
+
+        await self.search_service.prefetch_next_page(query="nature", page=1)
+        args, kwargs = self.mock_session.get.call_args
+        assert kwargs["params"]["page"] == 2
+
+        result = await self.search_service.search_media(query="nature", page=2)
+
+        assert self.mock_session.get.call_count == 1
+        assert result["results"] == [{"id": "2"}]
+        assert self.search_service.prefetch_stats()["used"] == 1
+        assert self.search_service.prefetch_stats()["hit_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_page_request_joins_prefetch_in_flight(self):
+        """Test that requesting a page while it is being prefetched sends one upstream request."""
+        async def slow_json(content_type=None):
+            await asyncio.sleep(0.05)
+            return {"results": [{"id": "2"}], "page_count": 5}
+
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+        mock_response.json = slow_json
+        self.mock_session.get.return_value = mock_response
+
+        prefetch = asyncio.ensure_future(self.search_service.prefetch_next_page(query="nature", page=1))
+        await asyncio.sleep(0.01)
+        result = await self.search_service.search_media(query="nature", page=2)
+        await prefetch
+
+        assert self.mock_session.get.call_count == 1
+        assert result["results"] == [{"id": "2"}]
+        assert cache_status.get() == CACHE_PREFETCHED
+        assert self.search_service.prefetch_stats()["used"] == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_prefetch_does_not_hold_request_past_deadline(self):
+        """Test that a request stops waiting on a slow prefetch and fetches the page itself."""
+        calls = 0
+
+        def get(url, params=None, **kwargs):
+            nonlocal calls
+            calls += 1
+            delay = 5 if calls == 1 else 0
+
+            async def page_json(content_type=None):
+                await asyncio.sleep(delay)
+                return {"results": [{"id": str(calls)}], "page_count": 5}
+
+            response = AsyncMock()
+            response.status = 200
+            response.__aenter__.return_value = response
+            response.json = page_json
+            return response
+
+        self.mock_session.get.side_effect = get
+
+        prefetch = asyncio.ensure_future(self.search_service.prefetch_next_page(query="nature", page=1))
+        await asyncio.sleep(0.01)
+        started = asyncio.get_running_loop().time()
+        with patch("services.search_service.OPENVERSE_MIN_ATTEMPT_SECONDS", 0.2):
+            result = await self.search_service.search_media(query="nature", page=2, deadline=Deadline(0.3))
+        elapsed = asyncio.get_running_loop().time() - started
+        prefetch.cancel()
+
+        assert elapsed < 0.3
+        assert result["results"] == [{"id": "2"}]
+        assert self.mock_session.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_prefetch_skipped_when_next_page_cached(self):
+        """Test that prefetch does not refetch an already cached page."""
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+        mock_response.json = AsyncMock(return_value={"results": []})
+        self.mock_session.get.return_value = mock_response
+
+        await self.search_service.search_media(query="nature", page=2)
+        await self.search_service.prefetch_next_page(query="nature", page=1)
+
+        assert self.mock_session.get.call_count == 1
+        assert self.search_service.prefetch_counts["skipped_cached"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_media_details_batch(self):
+        """Test batch details with cached, fetched and failing items."""
+        ok_response = AsyncMock()
+        ok_response.status = 200
+        ok_response.__aenter__.return_value = ok_response
+        ok_response.json = AsyncMock(return_value={"id": "1"})
+
+        error_response = AsyncMock()
+        error_response.status = 404
+        error_response.__aenter__.return_value = error_response
+        error_response.json = AsyncMock(return_value={"detail": "Not found"})
+
+        self.mock_session.get.return_value = ok_response
+        await self.search_service.get_media_details(media_id="1")
+
+        self.mock_session.get.side_effect = [ok_response, error_response]
+        results = await self.search_service.get_media_details_batch([
+            ("images", "1"),
+            ("images", "2"),
+            ("audio", "3")
+        ])
+
+        assert [result["media_id"] for result in results] == ["1", "2", "3"]
+        assert results[0]["success"] and results[0]["data"] == {"id": "1"}
+        assert results[1]["success"]
+        assert not results[2]["success"]
+        assert "Openverse API error: 404" in results[2]["error"]
+        assert self.mock_session.get.call_count == 3
+
+    def test_parse_media_types(self):
+        """Test expansion of the media_type parameter."""
+        assert self.search_service.parse_media_types("images") == ["images"]
+        assert self.search_service.parse_media_types("all") == ["images", "audio"]
+        assert self.search_service.parse_media_types("audio, images,audio") == ["audio", "images"]
+
+    @pytest.mark.asyncio
+    async def test_search_multiple_media_types_partial_failure(self):
+        """Test that one failing media type still returns the other's results."""
+        ok_response = AsyncMock()
+        ok_response.status = 200
+        ok_response.__aenter__.return_value = ok_response
+        ok_response.json = AsyncMock(return_value={
+            "result_count": 2, "page_count": 1, "results": [{"id": "1"}, {"id": "2"}]
+        })
+
+        error_response = AsyncMock()
+        error_response.status = 502
+        error_response.__aenter__.return_value = error_response
+        error_response.json = AsyncMock(return_value={"detail": "Bad gateway"})
+
+        def get(url, **kwargs):
+            return ok_response if url.endswith("images/") else error_response
+
+        self.mock_session.get.side_effect = get
+
+        result = await self.search_service.search_multiple_media_types(
+            query="nature", media_types=["images", "audio"]
+        )
+
+        assert [item["id"] for item in result["results"]] == ["1", "2"]
+        assert result["results"][0]["media_type"] == "images"
+        assert result["result_count"] == 2
+        assert "Openverse API error: 502" in result["errors"]["audio"]
+        assert result["search_info"]["media_types"] == ["images", "audio"]
+        assert result["cache_statuses"] == {"images": "miss"}
+
+        repeated = await self.search_service.search_multiple_media_types(
+            query="nature", media_types=["images", "audio"]
+        )
+        assert repeated["cache_statuses"] == {"images": "fresh"}
+
+    @pytest.mark.asyncio
+    async def test_search_local_answers_from_seen_results(self):
+        """Test that results seen in earlier responses can be searched locally."""
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.__aenter__.return_value = mock_response
+        mock_response.json = AsyncMock(return_value={
+            "results": [{"id": "1", "title": "Forest trail", "license": "by"}]
+        })
+        self.mock_session.get.return_value = mock_response
+        await self.search_service.search_media(query="forest")
+
+        result = self.search_service.search_local(query="trail", media_types=["images"])
+
+        assert result["degraded"] is True
+        assert [item["id"] for item in result["results"]] == ["1"]
+        assert self.search_service.search_local(query="trail", media_types=["audio"]) is None
+        assert self.search_service.search_local(query="trail", media_types=["images"], creator="x") is None
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self):
+        """Test that an open circuit rejects calls without contacting Openverse."""
+        self.search_service.circuit_breaker._open()
+
+        with pytest.raises(UpstreamUnavailableError):
+            await self.search_service.search_media(query="test")
+
+        self.mock_session.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_retryable_error_is_retried(self):
+        """Test that a 5xx response is retried within the deadline."""
+        error_response = AsyncMock()
+        error_response.status = 503
+        error_response.__aenter__.return_value = error_response
+        error_response.json = AsyncMock(return_value={"detail": "Unavailable"})
+
+        ok_response = AsyncMock()
+        ok_response.status = 200
+        ok_response.__aenter__.return_value = ok_response
+        ok_response.json = AsyncMock(return_value={"id": "123"})
+
+        self.mock_session.get.side_effect = [error_response, ok_response]
+
+        result = await self.search_service.get_media_details(media_id="123", deadline=Deadline(5))
+
+        assert result == {"id": "123"}
+        assert self.mock_session.get.call_count == 2
+        assert self.search_service.upstream_counts["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_throttled_request_pauses_rate_limiter(self):
+        """Test that a 429 pauses the rate limiter for Retry-After and is retried."""
+        throttled_response = AsyncMock()
+        throttled_response.status = 429
+        throttled_response.headers = {"Retry-After": "0.05"}
+        throttled_response.__aenter__.return_value = throttled_response
+        throttled_response.json = AsyncMock(return_value={"detail": "Request was throttled"})
+
+        ok_response = AsyncMock()
+        ok_response.status = 200
+        ok_response.__aenter__.return_value = ok_response
+        ok_response.json = AsyncMock(return_value={"id": "123"})
+
+        self.mock_session.get.side_effect = [throttled_response, ok_response]
+
+        result = await self.search_service.get_media_details(media_id="123", deadline=Deadline(5))
+
+        assert result == {"id": "123"}
+        assert self.mock_session.get.call_count == 2
+        assert self.search_service.rate_limiter.pauses == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_rate_limit_rejects_without_calling_upstream(self):
+        """Test that no request is sent while the rate limiter is paused."""
+        self.search_service.rate_limiter.pause(60)
+
+        with pytest.raises(UpstreamUnavailableError):
+            await self.search_service.search_media(query="test")
+
+        self.mock_session.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_client_error_is_not_retried(self):
+        """Test that a 4xx response fails without retrying."""
+        error_response = AsyncMock()
+        error_response.status = 404
+        error_response.__aenter__.return_value = error_response
+        error_response.json = AsyncMock(return_value={"detail": "Not found"})
+        self.mock_session.get.return_value = error_response
+
+        with pytest.raises(Exception) as exc_info:
+            await self.search_service.get_media_details(media_id="missing")
+
+        assert "Openverse API error: 404" in str(exc_info.value)
+        assert self.mock_session.get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        """Test that a request slower than p95 is hedged and the faster answer wins."""
+        for _ in range(20):
+            self.search_service.latency_tracker.record(0.01)
+
+        slow_response = AsyncMock()
+        slow_response.status = 200
+        slow_response.__aenter__.return_value = slow_response
+
+        async def slow_json():
+            await asyncio.sleep(1)
+            return {"id": "slow"}
+
+        slow_response.json = slow_json
+
+        fast_response = AsyncMock()
+        fast_response.status = 200
+        fast_response.__aenter__.return_value = fast_response
+        fast_response.json = AsyncMock(return_value={"id": "fast"})
+
+        self.mock_session.get.side_effect = [slow_response, fast_response]
+
+        result = await self.search_service.get_media_details(media_id="123", deadline=Deadline(5))
+
+        assert result == {"id": "fast"}
+        assert self.search_service.upstream_counts["hedges"] == 1
+        assert self.search_service.concurrency_limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_search_yields_in_order_without_duplicates(self):
+        """Test that streamed pages are emitted in order, de-duplicated and capped."""
+        pages = {
+            1: ["a", "b"],
+            2: ["b", "c"],
+            3: ["d", "e"]
+        }
+
+        def get(url, params=None, **kwargs):
+            response = AsyncMock()
+            response.status = 200
+            response.__aenter__.return_value = response
+
+            async def page_json(page=params["page"]):
+                await asyncio.sleep(0.01 * (4 - page))
+                return {"page_count": 3, "results": [{"id": item_id} for item_id in pages[page]]}
+
+            response.json = page_json
+            return response
+
+        self.mock_session.get.side_effect = get
+
+        items = [
+            item async for item in self.search_service.stream_search(query="nature", max_results=4)
+        ]
+
+        assert [item["id"] for item in items] == ["a", "b", "c", "d"]
+        assert len(self.search_service.search_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_search_leaves_reserved_tokens(self):
+        """Test that an export waits for spare tokens instead of draining the shared bucket."""
+        self.search_service.rate_limiter = TokenBucket(rate=200, burst=4)
+        for _ in range(4):
+            assert await self.search_service.rate_limiter.acquire()
+        available = []
+
+        def get(url, params=None, **kwargs):
+            available.append(self.search_service.rate_limiter.available())
+            response = AsyncMock()
+            response.status = 200
+            response.__aenter__.return_value = response
+            response.json = AsyncMock(return_value={
+                "page_count": 6, "results": [{"id": f"{params['page']}"}]
+            })
+            return response
+
+        self.mock_session.get.side_effect = get
+
+        with patch("services.search_service.STREAM_RESERVED_TOKENS", 2):
+            items = [item async for item in self.search_service.stream_search(query="nature", max_results=6)]
+
+        assert len(items) == 6
+        assert self.search_service.rate_limiter.deferred > 0
+        assert min(available) >= 1.9
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from services.singleflight import SingleFlight
+
+class TestSingleFlight:
+    """Tests for the SingleFlight class."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test that concurrent callers for a key run the work once."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        assert results == ["value"] * 5
+        assert calls == 1
+        assert flight.coalesced == 4
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        """Test that a failure is raised to all waiters and not remembered."""
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        async def succeeding():
+            return "ok"
+
+        assert await flight.do("key", succeeding) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_work(self):
+        """Test that cancelling one waiter leaves the shared call running."""
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "done"
+        assert first.cancelled()
@@ -0,0 +1,102 @@
+from services.suggestion_index import PrefixIndex, SortedPrefixIndex, SuggestionIndex
+
+def queries(suggestions):
+    return [suggestion["query"] for suggestion in suggestions]
+
+class TestPrefixIndex:
+    """Tests for the PrefixIndex class."""
+
+    def test_returns_matches_by_weight(self):
+        index = PrefixIndex()
+        index.add("forest")
+        index.add("fox", weight=3)
+        index.add("ocean", weight=5)
+
+        assert index.top("fo") == [("fox", 3.0), ("forest", 1.0)]
+        assert index.top("x") == []
+
+    def test_increments_reorder_top_lists(self):
+        """Test that a query rising in frequency displaces lighter ones from a full node."""
+        index = PrefixIndex(top_k=2)
+        index.add("cat", weight=3)
+        index.add("car", weight=2)
+        index.add("cab")
+
+        assert [term for term, _ in index.top("ca")] == ["cat", "car"]
+
+        index.add("cab", weight=5)
+
+        assert [term for term, _ in index.top("ca")] == ["cab", "cat"]
+        assert [term for term, _ in index.top("cab")] == ["cab"]
+
+    def test_ignores_new_terms_when_full(self):
+        index = PrefixIndex(max_terms=1)
+
+        assert index.add("one")
+        assert not index.add("two")
+        assert index.add("one")
+        assert len(index) == 1
+
+class TestSortedPrefixIndex:
+    """Tests for the SortedPrefixIndex class used for personal history."""
+
+    def test_matches_prefix_index(self):
+        """Test that lookups agree with the trie on the same queries."""
+        trie, small = PrefixIndex(), SortedPrefixIndex()
+        for term, weight in (("forest", 1), ("fox", 3), ("for", 2), ("fo", 1), ("ocean", 5), ("fox", 1)):
+            trie.add(term, weight)
+            small.add(term, weight)
+
+        for prefix in ("", "f", "fo", "for", "fox", "x", "oceans"):
+            assert small.top(prefix) == trie.top(prefix)
+        assert small.top("fo", limit=2) == [("fox", 4.0), ("for", 2.0)]
+
+    def test_ignores_new_terms_when_full(self):
+        index = SortedPrefixIndex(max_terms=1)
+
+        assert index.add("one")
+        assert not index.add("two")
+        assert index.add("one")
+        assert len(index) == 1
+
+class TestSuggestionIndex:
+    """Tests for the SuggestionIndex class."""
+
+    def test_personal_suggestions_come_first(self):
+        index = SuggestionIndex(min_users=1)
+        for _ in range(5):
+            index.record("sunset beach", user_id="other")
+        index.record("Sunflower ", user_id="me")
+
+        assert index.suggest("SUN", user_id="me") == [
+            {"query": "sunflower", "personal": True},
+            {"query": "sunset beach", "personal": False}
+        ]
+
+    def test_query_needs_several_users_to_become_popular(self):
+        """Test that one user's searches are not suggested to others."""
+        index = SuggestionIndex(min_users=2)
+        index.record("private thing", user_id="a")
+        index.record("private thing", user_id="a")
+
+        assert index.suggest("priv", user_id="b") == []
+
+        index.record("private thing", user_id="c")
+
+        assert queries(index.suggest("priv", user_id="b")) == ["private thing"]
+        assert index.popular.weights["private thing"] == 3.0
+
+    def test_least_recent_users_are_dropped(self):
+        index = SuggestionIndex(max_users=1, min_users=1)
+        index.record("alpha", user_id="a")
+        index.record("beta", user_id="b")
+
+        assert index.suggest("al", user_id="a") == [{"query": "alpha", "personal": False}]
+
+    def test_limit_and_empty_prefix(self):
+        index = SuggestionIndex(min_users=1)
+        for term in ("tree", "trees", "treehouse"):
+            index.record(term, user_id="a")
+
+        assert len(index.suggest("tr", limit=2)) == 2
+        assert index.suggest("   ") == []
@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import patch
+from services.token_cache import VerifiedTokenCache
+
+class TestVerifiedTokenCache:
+    """Tests for the VerifiedTokenCache class."""
+
+    def test_payload_cached_until_exp(self):
+        """Test that a payload is served until the token's exp claim."""
+        cache = VerifiedTokenCache()
+        with patch("services.token_cache.time.time", return_value=1000.0), \
+                patch("services.cache.time.monotonic", return_value=50.0):
+            cache.set("token", {"sub": "user_1", "exp": 1060})
+            assert cache.get("token") == {"sub": "user_1", "exp": 1060}
+
+        with patch("services.cache.time.monotonic", return_value=111.0):
+            assert cache.get("token") is None
+
+    def test_ttl_is_capped(self):
+        """Test that max_ttl bounds how long a long-lived token is cached."""
+        cache = VerifiedTokenCache(max_ttl=10)
+        with patch("services.token_cache.time.time", return_value=1000.0), \
+                patch("services.cache.time.monotonic", return_value=50.0):
+            cache.set("token", {"sub": "user_1", "exp": 5000})
+
+        with patch("services.cache.time.monotonic", return_value=61.0):
+            assert cache.get("token") is None
+
+    def test_tokens_without_valid_exp_are_not_cached(self):
+        """Test that tokens without exp, or already expired, are skipped."""
+        cache = VerifiedTokenCache()
+        cache.set("no-exp", {"sub": "user_1"})
+        cache.set("expired", {"sub": "user_1", "exp": 1})
+
+        assert len(cache.cache) == 0
+
+    def test_keys_are_digests(self):
+        """Test that raw tokens are not kept and hits return copies."""
+        cache = VerifiedTokenCache()
+        cache.set("secret-token", {"sub": "user_1", "exp": 2**40})
+
+        payload = cache.get("secret-token")
+        payload["sub"] = "someone_else"
+
+        assert "secret-token" not in cache.cache
+        assert cache.get("secret-token")["sub"] == "user_1"
+        assert cache.get("other-token") is None
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, AsyncMock
 from datetime import datetime
 from bson import ObjectId
 from services.user_service import UserService
+from services.suggestion_index import SuggestionIndex
 
 class TestUserService:
     """Tests for the UserService class."""
@@ -172,6 +173,19 @@ class TestUserService:
         
         self.mock_repository.create_search_history.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_save_search_history_updates_suggestions(self):
+        """Test that saved searches are added to the autocomplete index."""
+        suggestion_index = SuggestionIndex(min_users=1)
+        user_service = UserService(self.mock_repository, suggestion_index=suggestion_index)
+        self.mock_repository.create_search_history = AsyncMock(return_value=self.test_history)
+
+        await user_service.save_search_history(user_id="test_user_id", search_query="test query")
+
+        assert suggestion_index.suggest("te", user_id="test_user_id") == [
+            {"query": "test query", "personal": True}
+        ]
+    
     @pytest.mark.asyncio
     async def test_get_search_history(self):
         """Test get_search_history with valid user."""